@@ -0,0 +1,119 @@
+"""
+Benchmark: many concurrent registrations against a slow Investease stand-in
+(benchmarks/standins.py), thread-per-registration (sync client) vs one event
+loop (async client)
+Run from backend/: python -m benchmarks.bench_investease_async [--registrations N]
+
+The stand-in runs in its own process so its threads don't compete with the
+clients for the GIL, and counts how many upstream requests were in flight at
+once. Each registration uses its own email, as real sign-ups would.
+--max-connections sets INVESTEASE_ASYNC_MAX_CONNECTIONS for the async run.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.standins import InvesteaseStandinHandler, StandinProfile, StandinServer
+from src.config import Config
+from src.services.async_investease_client import AsyncInvesteaseClient
+from src.services.investease_client import InvesteaseClient, create_session
+
+
+class CountingStandinHandler(InvesteaseStandinHandler):
+    """Stand-in that tracks current and peak in-flight requests in shared memory"""
+    in_flight = None
+    peak = None
+
+    def _begin(self):
+        with self.in_flight.get_lock():
+            self.in_flight.value += 1
+            self.peak.value = max(self.peak.value, self.in_flight.value)
+        try:
+            return super()._begin()
+        finally:
+            with self.in_flight.get_lock():
+                self.in_flight.value -= 1
+
+
+def serve_standin(latency_ms, in_flight, peak, urls):
+    CountingStandinHandler.in_flight = in_flight
+    CountingStandinHandler.peak = peak
+    server = StandinServer(('127.0.0.1', 0), CountingStandinHandler,
+                           StandinProfile(latency=f'fixed:{latency_ms}'))
+    urls.put(server.base_url)
+    server.serve_forever()
+
+
+def client_data(i):
+    return {'name': f'Bench Kid {i}', 'email': f'bench{i}@example.com', 'cash': 1000}
+
+
+def run_threads(base_url, registrations, threads):
+    client = InvesteaseClient(session=create_session(pool_size=threads), base_url=base_url,
+                              jwt_token='bench-token')
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(
+            lambda i: client.create_complete_client_with_portfolios(client_data(i)),
+            range(registrations)))
+    return results, threads
+
+
+async def run_async(base_url, registrations):
+    client = AsyncInvesteaseClient(base_url=base_url, jwt_token='bench-token')
+    try:
+        results = await asyncio.gather(*(client.create_complete_client_with_portfolios(client_data(i))
+                                         for i in range(registrations)))
+    finally:
+        await client.aclose()
+    return list(results), threading.active_count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--registrations', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=32, help='pool size for the sync client')
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='stand-in latency per call')
+    parser.add_argument('--max-connections', type=int, default=Config.INVESTEASE_ASYNC_MAX_CONNECTIONS,
+                        help='upstream requests the async client keeps in flight')
+    args = parser.parse_args()
+    Config.INVESTEASE_ASYNC_MAX_CONNECTIONS = args.max_connections
+
+    in_flight = multiprocessing.Value('i', 0)
+    peak = multiprocessing.Value('i', 0)
+    urls = multiprocessing.Queue()
+    standin = multiprocessing.Process(target=serve_standin, daemon=True,
+                                      args=(args.latency_ms, in_flight, peak, urls))
+    standin.start()
+    base_url = urls.get(timeout=30)
+
+    timings = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results, threads = run_threads(base_url, args.registrations, args.threads)
+            timings['sync threads'] = (time.perf_counter() - start, threads, results, peak.value)
+
+            peak.value = 0
+            start = time.perf_counter()
+            results, threads = asyncio.run(run_async(base_url, args.registrations))
+            timings['async loop'] = (time.perf_counter() - start, threads, results, peak.value)
+    finally:
+        standin.terminate()
+
+    print(f"Investease async benchmark: {args.registrations} registrations, "
+          f"{args.latency_ms:g} ms per upstream call, async cap {args.max_connections} connections")
+    for label, (elapsed, threads, results, peak_requests) in timings.items():
+        ok = sum(1 for result in results if result['success'])
+        print(f"{label:<13} {elapsed:7.2f} s  {args.registrations / elapsed:8.1f} registrations/s  "
+              f"{ok}/{len(results)} ok  {threads} client threads  "
+              f"{peak_requests} peak upstream requests in flight")
+
+
+if __name__ == '__main__':
+    main()
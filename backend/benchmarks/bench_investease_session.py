@@ -0,0 +1,84 @@
+"""
+Benchmark: per-registration latency of InvesteaseClient with and without
+the pooled keep-alive session, against the Investease stand-in
+(benchmarks/standins.py)
+Run from backend/: python -m benchmarks.bench_investease_session [--registrations N]
+
+--handshake-ms adds a delay to every new connection on the stand-in to model
+the TCP+TLS setup cost of the real (remote, HTTPS) API.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.standins import StandinProfile, start_investease_standin
+from src.services.investease_client import InvesteaseClient, create_session
+
+
+class UnpooledSession:
+    """The old behaviour: a fresh connection for every call"""
+
+    def request(self, method, url, **kwargs):
+        return requests.request(method, url, **kwargs)
+
+
+def register(client):
+    """The HTTP calls one new-client registration makes"""
+    client.list_clients()
+    client_id = client.create_client({'name': 'Bench Kid', 'email': 'bench@example.com', 'cash': 1000})['data']['id']
+    for portfolio_type in ('conservative', 'balanced', 'growth'):
+        client.create_portfolio(client_id, portfolio_type, 100)
+    client.simulate_client_portfolios(client_id)
+    client.get_client(client_id)
+
+
+def run(client, registrations, threads):
+    """Per-registration latencies in ms"""
+    def timed(_):
+        start = time.perf_counter()
+        register(client)
+        return (time.perf_counter() - start) * 1000
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(timed, range(registrations)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--registrations', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8, help='concurrent registrations')
+    parser.add_argument('--handshake-ms', type=float, default=0.0,
+                        help='simulated connection setup cost on the stand-in')
+    args = parser.parse_args()
+
+    server = start_investease_standin(StandinProfile(handshake_ms=args.handshake_ms))
+
+    results = {}
+    for label, session in (('unpooled', UnpooledSession()),
+                           ('pooled', create_session(pool_size=args.threads))):
+        client = InvesteaseClient(session=session, base_url=server.base_url,
+                                  jwt_token='bench-token')
+        run(client, min(args.threads, args.registrations), args.threads)  # warm-up
+        results[label] = run(client, args.registrations, args.threads)
+
+    server.shutdown()
+    server.server_close()
+    print(f"Investease session benchmark: {args.registrations} registrations (7 calls each), "
+          f"{args.threads} threads, {args.handshake_ms:g} ms simulated handshake")
+    for label, latencies in results.items():
+        latencies.sort()
+        print(f"{label:<9} mean {statistics.mean(latencies):8.2f} ms  "
+              f"p50 {latencies[len(latencies) // 2]:8.2f} ms  "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:8.2f} ms")
+    saved = statistics.mean(results['unpooled']) - statistics.mean(results['pooled'])
+    print(f"saved per registration: {saved:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: scalar simulate_timeline vs batch simulate_timelines
+Run from backend/: python -m benchmarks.bench_market_simulator [--count N]
+"""
+import argparse
+import time
+import uuid
+
+from src.services.market_simulator import (
+    simulate_timeline,
+    simulate_timeline_arrays,
+    simulate_timelines
+)
+
+SAMPLE_CHOICES = [
+    [],
+    ['Save my allowance'],
+    ['Invest in the lemonade stand', 'Spend on pokemon cards'],
+    ['Save for a bike', 'Invest birthday money', 'Start a side project', 'Spend on snacks']
+]
+
+
+def _time(fn, repeat):
+    """Best wall-clock time of `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000, help='timelines per run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    seeds = [str(uuid.uuid4()) for _ in range(args.count)]
+    choices_list = [SAMPLE_CHOICES[i % len(SAMPLE_CHOICES)] for i in range(args.count)]
+
+    # Results must be identical before timings mean anything
+    scalar = [simulate_timeline(s, c) for s, c in zip(seeds, choices_list)]
+    if scalar != simulate_timelines(seeds, choices_list):
+        raise SystemExit('❌ batch results differ from simulate_timeline')
+
+    timings = {
+        'simulate_timeline (loop)': _time(
+            lambda: [simulate_timeline(s, c) for s, c in zip(seeds, choices_list)], args.repeat),
+        'simulate_timelines (dicts)': _time(
+            lambda: simulate_timelines(seeds, choices_list), args.repeat),
+        'simulate_timeline_arrays': _time(
+            lambda: simulate_timeline_arrays(seeds, choices_list), args.repeat)
+    }
+
+    baseline = timings['simulate_timeline (loop)']
+    print(f"✅ Batch results match scalar results for {args.count} timelines")
+    for name, elapsed in timings.items():
+        per_call = elapsed / args.count * 1e6
+        print(f"{name:<28} {elapsed * 1000:9.1f} ms  {per_call:7.2f} us/timeline  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark: bytes per stored timeline, legacy dict vs TimelineRecord
+Run from backend/: python -m benchmarks.bench_timeline_memory [--count N]
+
+Reports:
+- heap bytes per timeline as built in-process (pipeline sub-objects are shared)
+- heap bytes per timeline after a JSON round trip, i.e. what a persistent
+  store or another worker holds once duplicates become real copies
+- JSON bytes per timeline for the default and legacy API views
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from src.services.market_simulator import simulate_timeline
+from src.services.timeline_record import TimelineRecord
+
+
+def pipeline_outputs(i):
+    """Cohere + Investease results shaped like a real registration"""
+    name = f'Learner {i}'
+    enhanced = {
+        'name': name,
+        'email': f'parent{i}@example.com',
+        'cash': 100,
+        'portfolios': ['conservative', 'balanced', 'growth'],
+        'kid_portfolios': ['Safe & Slow (like a piggy bank)', 'Medium Risk (like a lemonade stand)'],
+        'age': 11,
+        'parentPhone': '+1-555-123-4567',
+        'address': '123 Maple St, Hometown, State 12345',
+        'gradeLevel': '6th Grade',
+        'learningStyle': 'visual',
+        'financialGoals': ['save for bike', 'college fund'],
+        'timeHorizon': 5
+    }
+    portfolios = [
+        {'id': str(uuid.uuid4()), 'type': kind, 'initialAmount': amount,
+         'currentValue': amount, 'createdAt': '2025-09-13T12:00:00Z'}
+        for kind, amount in (('conservative', 50), ('balanced', 30), ('growth', 20))
+    ]
+    client = {'id': str(uuid.uuid4()), 'name': name, 'email': enhanced['email'],
+              'cash': 0, 'portfolios': portfolios}
+    results = {'results': [
+        {'portfolioId': p['id'], 'strategy': p['type'], 'initialValue': p['initialAmount'],
+         'projectedValue': round(p['initialAmount'] * 1.07, 2),
+         'growth_trend': [round(p['initialAmount'] * (1 + m / 150), 2) for m in range(12)]}
+        for p in portfolios
+    ]}
+    adventures = {
+        'adventures': [
+            {'adventure_name': f"{name}'s Turtle Savings Adventure", 'character': 'Steady the Turtle',
+             'emoji': '🐢', 'story': 'Your turtle friend Steady used real bank calculations ' * 4,
+             'learning_point': 'Safe investments grow slowly but surely',
+             'excitement_level': 'calm_and_happy'}
+        ] * 2,
+        'overall_story': f'{name} learned about different ways to grow money!'
+    }
+    return {
+        'id': str(uuid.uuid4()),
+        'name': name,
+        'enhanced': enhanced,
+        'analysis': {'tags': ['curious', 'creative'], 'summary': 'A curious young learner ' * 3},
+        'investease': {'client': client, 'portfolios_created': portfolios,
+                       'rbc_simulation_results': results,
+                       'rbc_api_metadata': {'provider': 'RBC Investease', 'simulation_months': 12},
+                       'kid_adventures': adventures, 'client_id': client['id']}
+    }
+
+
+def legacy_timeline(out, simulated):
+    """The record create_complete_timeline used to store"""
+    data = out['investease']
+    return {
+        'id': out['id'], 'owner': out['name'], 'name': f"{out['name']}'s Financial Learning Journey",
+        'choices': ['save'], 'profileText': 'Loves drawing',
+        'createdAt': datetime(2025, 9, 13).isoformat(),
+        'simulated': simulated,
+        'analysis': out['analysis'],
+        'enhancedProfile': out['enhanced'],
+        'profileAnalysis': out['analysis'],
+        'rbc_investease': {
+            'client': data['client'], 'portfolios': data['portfolios_created'],
+            'simulation_results': data['rbc_simulation_results'],
+            'api_metadata': data['rbc_api_metadata'], 'client_id': data['client_id']
+        },
+        'kid_adventures': data['kid_adventures'],
+        'investeaseClient': data['client'],
+        'investeasePortfolios': data['portfolios_created'],
+        'investeaseSimulation': data['rbc_simulation_results'],
+        'investeaseClientId': data['client_id'],
+        'learningStyle': out['enhanced']['learningStyle'],
+        'financialGoals': out['enhanced']['financialGoals'],
+        'gradeLevel': out['enhanced']['gradeLevel'],
+        'totalPortfoliosCreated': len(data['portfolios_created']),
+        'simulationMonths': 12
+    }
+
+
+def timeline_record(out, simulated):
+    """The record create_complete_timeline stores now"""
+    data = out['investease']
+    return TimelineRecord.from_pipeline(
+        id=out['id'], owner=out['name'], name=f"{out['name']}'s Financial Learning Journey",
+        choices=['save'], profile_text='Loves drawing',
+        created_at=datetime(2025, 9, 13).isoformat(),
+        simulated=simulated, analysis=out['analysis'],
+        investease={
+            'client': data['client'], 'portfolios': data['portfolios_created'],
+            'simulation_results': data['rbc_simulation_results'],
+            'api_metadata': data['rbc_api_metadata'], 'client_id': data['client_id']
+        },
+        kid_adventures=data['kid_adventures'],
+        enhanced_profile=out['enhanced'],
+        learning_style=out['enhanced']['learningStyle'],
+        financial_goals=out['enhanced']['financialGoals'],
+        grade_level=out['enhanced']['gradeLevel'])
+
+
+def heap_bytes_per_item(build, count):
+    """Bytes retained per item by the objects `build(i)` returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000, help='timelines per measurement')
+    args = parser.parse_args()
+
+    outputs = [pipeline_outputs(i) for i in range(args.count)]
+    simulated = [simulate_timeline(out['id'], ['save']) for out in outputs]
+    legacy = [legacy_timeline(out, sim) for out, sim in zip(outputs, simulated)]
+    records = [timeline_record(out, sim) for out, sim in zip(outputs, simulated)]
+    legacy_json = [json.dumps(timeline) for timeline in legacy]
+    record_json = [json.dumps(record.to_storage()) for record in records]
+
+    # Sanity check: the legacy view rebuilds exactly what used to be stored
+    for timeline, record in zip(legacy, records):
+        view = record.to_dict(legacy=True)
+        view.pop('stepsPerMonth')
+        if view != timeline:
+            raise SystemExit('❌ legacy view differs from the old timeline dict')
+
+    rows = [
+        ('in-process, legacy dict', heap_bytes_per_item(
+            lambda i: legacy_timeline(outputs[i], simulated[i]), args.count)),
+        ('in-process, TimelineRecord', heap_bytes_per_item(
+            lambda i: timeline_record(outputs[i], simulated[i]), args.count)),
+        ('loaded from JSON, legacy dict', heap_bytes_per_item(
+            lambda i: json.loads(legacy_json[i]), args.count)),
+        ('loaded from JSON, TimelineRecord', heap_bytes_per_item(
+            lambda i: TimelineRecord.from_storage(json.loads(record_json[i])), args.count))
+    ]
+
+    json_sizes = [
+        ('legacy dict', sum(len(j) for j in legacy_json)),
+        ('record storage', sum(len(j) for j in record_json)),
+        ('API view (default)', sum(len(json.dumps(r.to_dict())) for r in records)),
+        ('API view (legacy=1)', sum(len(json.dumps(r.to_dict(legacy=True))) for r in records))
+    ]
+
+    print(f"✅ Legacy view matches the old record for {args.count} timelines")
+    print("Heap bytes per timeline (in-process counts only the record, not the shared pipeline objects)")
+    for label, size in rows:
+        print(f"  {label:<34} {size:>10,.0f}")
+    print("JSON bytes per timeline")
+    for label, total in json_sizes:
+        print(f"  {label:<34} {total / args.count:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
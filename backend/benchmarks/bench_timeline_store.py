@@ -0,0 +1,108 @@
+"""
+Benchmark: read/write/page throughput of the timeline storage backends
+Run from backend/: python -m benchmarks.bench_timeline_store [--count N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.services.market_simulator import simulate_timeline
+from src.services.timeline_record import TimelineRecord
+from src.services.timeline_store import InMemoryTimelineStore, SQLiteTimelineStore
+
+GRADE_LEVELS = ['3rd Grade', '5th Grade', '7th Grade', '9th Grade']
+LEARNING_STYLES = ['visual', 'hands-on', 'analytical']
+
+
+def make_timelines(count):
+    """Records shaped like create_complete_timeline output"""
+    start = datetime(2025, 1, 1)
+    timelines = []
+    for i in range(count):
+        timeline_id = str(uuid.uuid4())
+        choices = ['Save my allowance', 'Invest in the lemonade stand']
+        owner = f'Learner {i % 500}'
+        timelines.append(TimelineRecord.from_pipeline(
+            id=timeline_id,
+            owner=owner,
+            name=f"{owner}'s Learning Timeline",
+            choices=choices,
+            profile_text='Loves drawing and building things',
+            created_at=(start + timedelta(seconds=i)).isoformat(),
+            simulated=simulate_timeline(timeline_id, choices),
+            analysis={'tags': ['curious', 'creative'], 'summary': 'A curious young learner.'},
+            investease={
+                'client': {'id': f'client-{i}', 'name': owner, 'cash': 50},
+                'portfolios': [{'id': f'portfolio-{i}', 'type': 'balanced', 'initialAmount': 25}],
+                'simulation_results': {'results': [{'portfolioId': f'portfolio-{i}', 'finalValue': 27.1}]},
+                'api_metadata': {'provider': 'RBC Investease', 'simulation_months': 12},
+                'client_id': f'client-{i}'
+            },
+            kid_adventures=None,
+            enhanced_profile={},
+            learning_style=LEARNING_STYLES[i % len(LEARNING_STYLES)],
+            financial_goals=None,
+            grade_level=GRADE_LEVELS[i % len(GRADE_LEVELS)]))
+    return timelines
+
+
+def run(store, timelines, reads):
+    """Ops/sec for writes, random point reads and one full listing"""
+    start = time.perf_counter()
+    for timeline in timelines:
+        store.save(timeline)
+    write_elapsed = time.perf_counter() - start
+
+    ids = [random.choice(timelines).id for _ in range(reads)]
+    start = time.perf_counter()
+    for timeline_id in ids:
+        store.get(timeline_id)
+    read_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    listed = store.list()
+    list_elapsed = time.perf_counter() - start
+    assert len(listed) == len(timelines)
+
+    # Filtered 50-item pages from random cursor positions
+    cursors = [(t.created_at, t.id) for t in random.sample(timelines, min(1000, len(timelines)))]
+    start = time.perf_counter()
+    for cursor in cursors:
+        store.query(after=cursor, limit=50, learning_style='visual')
+    page_elapsed = time.perf_counter() - start
+
+    return {
+        'writes/s': len(timelines) / write_elapsed,
+        'reads/s': reads / read_elapsed,
+        'pages/s': len(cursors) / page_elapsed,
+        'list ms': list_elapsed * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000, help='timelines to write')
+    parser.add_argument('--reads', type=int, default=20000, help='random point reads')
+    args = parser.parse_args()
+
+    timelines = make_timelines(args.count)
+    results = {'memory': run(InMemoryTimelineStore(), timelines, args.reads)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteTimelineStore(os.path.join(tmp, 'timelines.db'))
+        results['sqlite'] = run(store, timelines, args.reads)
+        store.close()
+
+    print(f"Timeline store benchmark: {args.count} timelines, {args.reads} reads")
+    for backend, stats in results.items():
+        print(f"{backend:<8} {stats['writes/s']:>12,.0f} writes/s  "
+              f"{stats['reads/s']:>12,.0f} reads/s  {stats['pages/s']:>10,.0f} pages/s  "
+              f"{stats['list ms']:>9.1f} ms list")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""
+Load harness: timeline creations/sec through the Flask routes and Socket.IO
+broadcast latency as connected clients grow, against one run.py process
+Run from backend/: python -m benchmarks.load_harness [--duration 20] [--concurrency 8] [--clients 10,50,100]
+
+By default the app from run.py is started in a subprocess on --port with
+Cohere unset (mock transformer) and the caches memory-only, so the run is
+fully offline; --registration also drives /create-with-registration against
+the local Investease stand-in (benchmarks.standins). --url targets a server
+that is already running instead.
+
+Phases:
+- http: closed loop of --concurrency workers POSTing /api/timelines/ (and
+  /create-with-registration) for --duration seconds
+- socketio: for each --clients level, connect that many Socket.IO clients,
+  send --broadcasts spawn-timeline/update-timeline events and time every
+  delivery of the resulting broadcast
+Latencies go into log-bucketed (HDR-style) histograms; the report with
+p50/p99/p99.9 and throughput is printed and written as JSON to --output.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+import socketio
+
+from benchmarks.standins import StandinProfile, start_investease_standin, standin_env
+
+# websocket-client enables the websocket transport in python-socketio
+if importlib.util.find_spec('websocket'):
+    TRANSPORTS = ['polling', 'websocket']
+else:
+    TRANSPORTS = ['polling']
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHOICES = [
+    ['Save my allowance'],
+    ['Invest in the lemonade stand', 'Spend on pokemon cards'],
+    ['Save for a bike', 'Invest birthday money', 'Start a side project']
+]
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram: bucket boundaries grow by (1 + precision),
+    so every recorded value is reported within `precision` relative error
+    whatever its magnitude. Values are microseconds.
+    """
+
+    def __init__(self, lowest_us=1.0, highest_us=3.6e9, precision=0.01):
+        self.lowest = lowest_us
+        self.highest = highest_us
+        self.ratio = 1 + precision
+        self.log_ratio = math.log(self.ratio)
+        self.counts = [0] * (self._index(highest_us) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def _index(self, value):
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self.log_ratio)
+
+    def record(self, value_us):
+        value_us = min(max(value_us, 0.0), self.highest)
+        index = self._index(value_us)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value_us
+            self.min = value_us if self.min is None else min(self.min, value_us)
+            self.max = value_us if self.max is None else max(self.max, value_us)
+
+    def merge(self, other):
+        with self._lock:
+            for index, count in enumerate(other.counts):
+                self.counts[index] += count
+            self.count += other.count
+            self.total += other.total
+            for value in (other.min, other.max):
+                if value is not None:
+                    self.min = value if self.min is None else min(self.min, value)
+                    self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (q in 0..100)"""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.lowest * self.ratio ** (index + 1), self.max)
+        return self.max
+
+    def summary(self):
+        """Milliseconds, rounded for the report"""
+        def ms(value_us):
+            return round(value_us / 1000, 3) if value_us is not None else None
+
+        return {
+            'count': self.count,
+            'meanMs': ms(self.total / self.count) if self.count else None,
+            'minMs': ms(self.min),
+            'p50Ms': ms(self.percentile(50)),
+            'p90Ms': ms(self.percentile(90)),
+            'p99Ms': ms(self.percentile(99)),
+            'p999Ms': ms(self.percentile(99.9)),
+            'maxMs': ms(self.max)
+        }
+
+
+def start_server(port, extra_env):
+    """run.py's app in a subprocess (Werkzeug, threading mode); returns (process, base_url)"""
+    env = dict(os.environ, PORT=str(port), COHERE_API_KEY='', COHERE_CACHE_PATH='',
+               INVESTEASE_INDEX_PATH='', FLASK_DEBUG='false')
+    env.update(extra_env)
+    code = ('import run; run.socketio.run(run.app, host="127.0.0.1", port=%d, '
+            'allow_unsafe_werkzeug=True, log_output=False)' % port)
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'❌ Server exited with status {process.returncode}')
+        try:
+            requests.get(f'{base_url}/health', timeout=1)
+            return process, base_url
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('❌ Server did not start within 30s')
+
+
+def run_http(base_url, routes, concurrency, duration):
+    """Closed-loop POSTs for `duration` seconds; per-route histograms and counts"""
+    results = {route: {'histogram': LatencyHistogram(), 'ok': 0, 'errors': 0} for route in routes}
+    lock = threading.Lock()
+    sequence = itertools.count()
+    stop_at = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            n = next(sequence)
+            route = routes[n % len(routes)]
+            body = {
+                'name': f'Load Kid {n % 1000}',
+                'email': f'load{n % 1000}@example.com',
+                'cashAmount': 1000,
+                'profileText': 'Loves drawing and saving for a bike',
+                'choices': CHOICES[n % len(CHOICES)]
+            }
+            start = time.perf_counter()
+            try:
+                response = session.post(f'{base_url}{route}', json=body, timeout=60)
+                ok = response.status_code == 200
+            except requests.exceptions.RequestException:
+                ok = False
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            result = results[route]
+            if ok:
+                result['histogram'].record(elapsed_us)
+            with lock:
+                result['ok' if ok else 'errors'] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for route, result in results.items():
+        report[route] = {
+            'ok': result['ok'],
+            'errors': result['errors'],
+            'throughputPerSec': round(result['ok'] / elapsed, 2),
+            'latency': result['histogram'].summary()
+        }
+    return report
+
+
+def run_socketio_level(base_url, clients, broadcasts, rate, timeout):
+    """
+    Connect `clients` Socket.IO clients, emit `broadcasts` events alternating
+    spawn-timeline/update-timeline from the first one, and time each delivery
+    """
+    histograms = {'timeline-spawned': LatencyHistogram(), 'timeline-updated': LatencyHistogram()}
+    delivered = [0]
+    lock = threading.Lock()
+
+    def on_event(event):
+        def handler(data):
+            histograms[event].record((time.perf_counter() - data['sentAt']) * 1e6)
+            with lock:
+                delivered[0] += 1
+        return handler
+
+    connected = []
+    connect_histogram = LatencyHistogram()
+    try:
+        for _ in range(clients):
+            client = socketio.Client(reconnection=False)
+            for event in histograms:
+                client.on(event, on_event(event))
+            start = time.perf_counter()
+            client.connect(base_url, transports=TRANSPORTS, wait_timeout=timeout)
+            connect_histogram.record((time.perf_counter() - start) * 1e6)
+            connected.append(client)
+
+        sender = connected[0]
+        expected = broadcasts * clients
+        interval = 1 / rate if rate else 0
+        started = time.perf_counter()
+        for n in range(broadcasts):
+            event = 'spawn-timeline' if n % 2 == 0 else 'update-timeline'
+            sender.emit(event, {'seq': n, 'sentAt': time.perf_counter(), 'timelineId': f'load-{n}'})
+            if interval:
+                time.sleep(max(0.0, started + (n + 1) * interval - time.perf_counter()))
+
+        wait_until = time.perf_counter() + timeout
+        while delivered[0] < expected and time.perf_counter() < wait_until:
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in connected:
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+
+    total = LatencyHistogram()
+    for histogram in histograms.values():
+        total.merge(histogram)
+    return {
+        'clients': clients,
+        'broadcasts': broadcasts,
+        'expectedDeliveries': expected,
+        'delivered': delivered[0],
+        'deliveryRatio': round(delivered[0] / expected, 4) if expected else None,
+        'deliveriesPerSec': round(delivered[0] / elapsed, 2),
+        'connect': connect_histogram.summary(),
+        'latency': total.summary(),
+        'byEvent': {event: histogram.summary() for event, histogram in histograms.items()}
+    }
+
+
+def print_report(report):
+    def row(label, latency, extra=''):
+        print(f"  {label:<42} n={latency['count']:<7} p50 {latency['p50Ms']} ms  "
+              f"p99 {latency['p99Ms']} ms  p99.9 {latency['p999Ms']} ms  max {latency['maxMs']} ms{extra}")
+
+    print(f"\n📊 Load report ({report['meta']['target']})")
+    if report.get('http'):
+        print(f"HTTP, {report['meta']['concurrency']} workers for {report['meta']['duration']}s:")
+        for route, result in report['http'].items():
+            row(route, result['latency'],
+                f"  {result['throughputPerSec']}/s  errors {result['errors']}")
+    if report.get('socketio'):
+        print(f"Socket.IO broadcasts ({report['meta']['broadcasts']} per level):")
+        for level in report['socketio']:
+            row(f"{level['clients']} clients", level['latency'],
+                f"  {level['deliveriesPerSec']}/s  delivered {level['deliveryRatio']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='existing server to target instead of starting run.py')
+    parser.add_argument('--port', type=int, default=4100, help='port for the started server')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of HTTP load')
+    parser.add_argument('--concurrency', type=int, default=8, help='HTTP workers')
+    parser.add_argument('--registration', action='store_true',
+                        help='also drive /create-with-registration (Investease stand-in)')
+    parser.add_argument('--investease-latency', default='lognormal:120:0.5',
+                        help='stand-in latency spec, see benchmarks.standins')
+    parser.add_argument('--clients', default='10,50,100',
+                        help='comma-separated Socket.IO client counts')
+    parser.add_argument('--broadcasts', type=int, default=200, help='events sent per client level')
+    parser.add_argument('--broadcast-rate', type=float, default=50, help='events/sec (0 = as fast as possible)')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for connects/deliveries')
+    parser.add_argument('--skip-http', action='store_true')
+    parser.add_argument('--skip-socketio', action='store_true')
+    parser.add_argument('--output', default='load_report.json', help='JSON report path')
+    args = parser.parse_args()
+
+    routes = ['/api/timelines/']
+    if args.registration:
+        routes.append('/api/timelines/create-with-registration')
+
+    process = None
+    standin = None
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            extra_env = {}
+            if args.registration:
+                standin = start_investease_standin(StandinProfile(args.investease_latency))
+                # Investease only: Cohere stays on the mock transformer
+                extra_env = standin_env(standin.base_url, '')
+                extra_env.update(COHERE_API_KEY='', COHERE_BASE_URL='')
+            process, base_url = start_server(args.port, extra_env)
+        print(f"🎯 Target: {base_url}", file=sys.stderr)
+
+        report = {
+            'meta': {
+                'createdAt': datetime.now().isoformat(),
+                'target': base_url,
+                'python': platform.python_version(),
+                'cpus': os.cpu_count(),
+                'duration': args.duration,
+                'concurrency': args.concurrency,
+                'broadcasts': args.broadcasts,
+                'broadcastRate': args.broadcast_rate,
+                'socketioTransports': TRANSPORTS
+            }
+        }
+        if not args.skip_http:
+            print(f"🚀 HTTP phase: {args.concurrency} workers, {args.duration}s", file=sys.stderr)
+            report['http'] = run_http(base_url, routes, args.concurrency, args.duration)
+        if not args.skip_socketio:
+            report['socketio'] = []
+            for clients in (int(level) for level in args.clients.split(',')):
+                print(f"📡 Socket.IO phase: {clients} clients", file=sys.stderr)
+                report['socketio'].append(run_socketio_level(
+                    base_url, clients, args.broadcasts, args.broadcast_rate, args.timeout))
+        if standin is not None:
+            report['meta']['investeaseStandin'] = standin.stats()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if standin is not None:
+            standin.shutdown()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,407 @@
+"""
+Local stand-ins for the Investease API and Cohere generate, so the whole
+create_complete_timeline pipeline can be exercised and benchmarked offline
+Run from backend/: python -m benchmarks.standins [--investease-latency lognormal:120:0.5] [--error-rate 0.01]
+and start the backend with the environment it prints.
+
+Latency specs (milliseconds):
+    fixed:MS   uniform:LO:HI   normal:MEAN:SD   lognormal:MEDIAN:SIGMA   exponential:MEAN
+The Investease stand-in keeps clients and portfolios in memory and serves
+GET/POST /clients, GET/PUT /clients/{id}, POST /clients/{id}/portfolios and
+POST /client/{id}/simulate. The Cohere stand-in answers POST /v1/generate
+(plain and stream=true) with JSON shaped like what DataTransformer asks for.
+Both can inject errors at a given rate and pad responses to a payload size.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyModel:
+    """Samples a delay in seconds from a distribution spec like 'lognormal:80:0.5'"""
+
+    KINDS = {
+        'fixed': 1,
+        'uniform': 2,
+        'normal': 2,
+        'lognormal': 2,
+        'exponential': 1
+    }
+
+    def __init__(self, spec='fixed:0', seed=None):
+        kind, *params = spec.split(':')
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f'Bad latency spec {spec!r}, expected one of '
+                             f'fixed:MS uniform:LO:HI normal:MEAN:SD lognormal:MEDIAN:SIGMA exponential:MEAN')
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.kind == 'fixed':
+                ms = self.params[0]
+            elif self.kind == 'uniform':
+                ms = self._random.uniform(*self.params)
+            elif self.kind == 'normal':
+                ms = self._random.gauss(*self.params)
+            elif self.kind == 'lognormal':
+                ms = self._random.lognormvariate(math.log(max(self.params[0], 1e-3)), self.params[1])
+            else:
+                ms = self._random.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0
+        return max(ms, 0) / 1000
+
+
+class StandinProfile:
+    """
+    How a stand-in behaves: per-request latency, connection setup cost,
+    injected error rate/status and the padding added to each response
+    """
+
+    def __init__(self, latency='fixed:0', handshake_ms=0.0, error_rate=0.0,
+                 error_status=503, payload_bytes=0, seed=None):
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel(latency, seed)
+        self.handshake_delay = handshake_ms / 1000
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.payload_bytes = payload_bytes
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, handler, profile):
+        super().__init__(address, handler)
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        # Investease state and Cohere stream pacing
+        self.clients = {}
+        self.token_delay = 0.0
+
+    @property
+    def base_url(self):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+    def stats(self):
+        with self.lock:
+            return {'requests': self.requests, 'injectedErrors': self.errors}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Runs once per TCP connection: models TCP+TLS setup to a remote host
+        time.sleep(self.server.profile.handshake_delay)
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _begin(self):
+        """Count the request, wait out its latency; False if an error was injected"""
+        profile = self.server.profile
+        failed = profile.should_fail()
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.errors += failed
+        time.sleep(profile.latency.sample())
+        if failed:
+            self._reply(profile.error_status, {'message': 'Injected stand-in failure'})
+        return not failed
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        return json.loads(body) if body else {}
+
+    def _padding(self):
+        return 'x' * self.server.profile.payload_bytes
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class InvesteaseStandinHandler(StandinHandler):
+    def do_GET(self):
+        self._read_json()
+        if not self._begin():
+            return
+        if self.path.rstrip('/').endswith('/clients'):
+            with self.server.lock:
+                clients = [dict(client) for client in self.server.clients.values()]
+            self._reply(200, {'clients': clients})
+            return
+        match = re.search(r'/clients/([^/]+)$', self.path)
+        client = self._client(match)
+        if client is None:
+            self._reply(404, {'message': 'Client not found'})
+        else:
+            self._reply(200, client)
+
+    def do_POST(self):
+        body = self._read_json()
+        if not self._begin():
+            return
+        simulate = re.search(r'/client/([^/]+)/simulate$', self.path)
+        portfolios = re.search(r'/clients/([^/]+)/portfolios$', self.path)
+        if simulate:
+            self._simulate(simulate.group(1), body)
+        elif portfolios:
+            self._create_portfolio(portfolios.group(1), body)
+        elif self.path.rstrip('/').endswith('/clients'):
+            self._create_client(body)
+        else:
+            self._reply(404, {'message': 'Not found'})
+
+    def do_PUT(self):
+        body = self._read_json()
+        if not self._begin():
+            return
+        match = re.search(r'/clients/([^/]+)$', self.path)
+        with self.server.lock:
+            client = self.server.clients.get(match.group(1)) if match else None
+            if client is not None and 'cash' in body:
+                client['cash'] = body['cash']
+            client = dict(client) if client is not None else None
+        if client is None:
+            self._reply(404, {'message': 'Client not found'})
+        else:
+            self._reply(200, client)
+
+    def _client(self, match):
+        with self.server.lock:
+            client = self.server.clients.get(match.group(1)) if match else None
+            return dict(client) if client is not None else None
+
+    def _create_client(self, body):
+        client = {
+            'id': str(uuid.uuid4()),
+            'name': body.get('name', 'Unknown'),
+            'email': body.get('email'),
+            'cash': body.get('cash', 0),
+            'portfolios': [],
+            'notes': self._padding()
+        }
+        with self.server.lock:
+            self.server.clients[client['id']] = client
+        self._reply(201, client)
+
+    def _create_portfolio(self, client_id, body):
+        amount = body.get('initialAmount', 0)
+        with self.server.lock:
+            client = self.server.clients.get(client_id)
+            if client is None:
+                status, reply = 404, {'message': 'Client not found'}
+            elif amount > client['cash']:
+                status, reply = 400, {'message': 'Insufficient cash'}
+            else:
+                portfolio = {
+                    'id': str(uuid.uuid4()),
+                    'type': body.get('type', 'balanced'),
+                    'initialAmount': amount,
+                    'currentValue': amount
+                }
+                client['cash'] -= amount
+                client['portfolios'] = client['portfolios'] + [portfolio]
+                status, reply = 201, portfolio
+        self._reply(status, reply)
+
+    def _simulate(self, client_id, body):
+        months = body.get('months', 12)
+        with self.server.lock:
+            client = self.server.clients.get(client_id)
+            portfolios = list(client['portfolios']) if client is not None else None
+        if portfolios is None:
+            self._reply(404, {'message': 'Client not found'})
+            return
+        rng = random.Random(client_id)
+        results = []
+        for portfolio in portfolios:
+            value = portfolio['initialAmount']
+            trend = []
+            for _ in range(months):
+                value *= 1 + rng.gauss(0.005, 0.03)
+                trend.append(round(value, 2))
+            results.append({
+                'portfolioId': portfolio['id'],
+                'strategy': portfolio['type'],
+                'monthsSimulated': months,
+                'initialValue': portfolio['initialAmount'],
+                'projectedValue': trend[-1] if trend else value,
+                'growthTrend': trend
+            })
+        self._reply(200, {'message': 'Simulation complete', 'results': results,
+                          'notes': self._padding()})
+
+
+class CohereStandinHandler(StandinHandler):
+    def do_POST(self):
+        body = self._read_json()
+        if not self._begin():
+            return
+        if not self.path.rstrip('/').endswith('/v1/generate'):
+            self._reply(404, {'message': 'Not found'})
+            return
+        text = self._generation(body.get('prompt', ''))
+        if body.get('stream'):
+            self._stream(body, text)
+        else:
+            self._reply(200, self._generate_response(body, text))
+
+    def _generation(self, prompt):
+        """JSON text in the shape the prompt asks for, padded to payload_bytes"""
+        padding = self._padding()
+        if 'Analyze this child' in prompt:
+            result = {'tags': ['curious', 'creative'],
+                      'summary': f'Curious learner who likes hands-on examples. {padding}'.strip()}
+        elif 'adventure stories' in prompt:
+            name = re.search(r'for a child named (.+?)\.', prompt)
+            name = name.group(1) if name else 'Young Investor'
+            result = {
+                'adventures': [{
+                    'adventure_name': f"{name}'s Piggy Bank Quest",
+                    'character': 'Penny the Pig',
+                    'emoji': '🐷',
+                    'story': f'Penny saved coins every month and the pile kept growing! {padding}'.strip(),
+                    'learning_point': 'Saving a little often adds up',
+                    'real_data': 'Stand-in simulation data',
+                    'excitement_level': 'calm_and_happy'
+                }],
+                'overall_story': f'{name} learned that patience helps money grow.'
+            }
+        else:
+            result = {
+                'age': 12,
+                'parentPhone': '+1-555-123-4567',
+                'address': f'123 Maple St, Hometown, State 12345 {padding}'.strip(),
+                'gradeLevel': '7th Grade',
+                'learningStyle': 'visual',
+                'financialGoals': ['save for bike', 'college fund'],
+                'timeHorizon': 5
+            }
+        return json.dumps(result, ensure_ascii=False)
+
+    def _generate_response(self, body, text):
+        return {
+            'id': str(uuid.uuid4()),
+            'prompt': body.get('prompt'),
+            'generations': [{'id': str(uuid.uuid4()), 'text': text, 'index': 0}],
+            'meta': {'api_version': {'version': '1'}}
+        }
+
+    def _stream(self, body, text):
+        """Newline-delimited JSON events, one chunk per ~token, like the real stream"""
+        tokens = re.findall(r'\S+\s*|\s+', text)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/stream+json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index, token in enumerate(tokens):
+            time.sleep(self.server.token_delay)
+            self._chunk({'event_type': 'text-generation', 'text': token,
+                         'index': index, 'is_finished': False})
+        self._chunk({'event_type': 'stream-end', 'is_finished': True, 'finish_reason': 'COMPLETE',
+                     'response': self._generate_response(body, text)})
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _chunk(self, event):
+        data = (json.dumps(event, ensure_ascii=False) + '\n').encode()
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+
+def start_investease_standin(profile=None, host='127.0.0.1', port=0):
+    """Serve the Investease stand-in in a daemon thread; returns the server (see .base_url)"""
+    server = StandinServer((host, port), InvesteaseStandinHandler, profile or StandinProfile())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_cohere_standin(profile=None, host='127.0.0.1', port=0, token_ms=0.0):
+    """Serve the Cohere stand-in in a daemon thread; token_ms paces streamed chunks"""
+    server = StandinServer((host, port), CohereStandinHandler, profile or StandinProfile())
+    server.token_delay = token_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def standin_env(investease_url, cohere_url):
+    """Environment that points Config (and so the backend) at the stand-ins"""
+    return {
+        'INVESTEASE_API_ENDPOINT': f'{investease_url}/clients',
+        'AWS_JWT_TOKEN': 'standin-token',
+        'COHERE_BASE_URL': cohere_url,
+        'COHERE_API_KEY': 'standin-key'
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--investease-port', type=int, default=8101)
+    parser.add_argument('--cohere-port', type=int, default=8102)
+    parser.add_argument('--investease-latency', default='lognormal:120:0.5',
+                        help='Investease per-request latency spec (ms)')
+    parser.add_argument('--cohere-latency', default='lognormal:800:0.4',
+                        help='Cohere time-to-first-token latency spec (ms)')
+    parser.add_argument('--token-ms', type=float, default=10.0,
+                        help='delay between streamed Cohere chunks')
+    parser.add_argument('--handshake-ms', type=float, default=0.0,
+                        help='connection setup cost on both stand-ins')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--payload-bytes', type=int, default=0,
+                        help='padding added to each response')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    def profile(latency):
+        return StandinProfile(latency=latency, handshake_ms=args.handshake_ms,
+                              error_rate=args.error_rate, error_status=args.error_status,
+                              payload_bytes=args.payload_bytes, seed=args.seed)
+
+    investease = start_investease_standin(profile(args.investease_latency), args.host, args.investease_port)
+    cohere = start_cohere_standin(profile(args.cohere_latency), args.host, args.cohere_port, args.token_ms)
+
+    print(f"🧪 Investease stand-in on {investease.base_url} ({args.investease_latency})")
+    print(f"🧪 Cohere stand-in on {cohere.base_url} ({args.cohere_latency})")
+    print("Start the backend with:")
+    for key, value in standin_env(investease.base_url, cohere.base_url).items():
+        print(f"  export {key}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"Investease: {investease.stats()}  Cohere: {cohere.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+"""
+Micro-benchmark suite for the backend hot paths, with baseline comparison
+Run from backend/: python -m benchmarks.suite [--quick] [--filter REGEX] [--output results.json]
+
+Every case reports the best and median time per operation over --repeat
+samples; each sample runs enough operations to take at least --min-time.
+Results are written as JSON (stdout, or --output); progress and the
+comparison go to stderr. Each case's best time is compared against the
+baseline (default benchmarks/baseline.json) and the run exits with status 1
+if any case got slower than --threshold, or if there is no baseline at all.
+Record a baseline on the reference machine with --save-baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.services.data_transformer import DataTransformer
+from src.services.market_simulator import simulate_timeline, simulate_timelines
+from src.services.timeline_record import TimelineRecord
+from src.services.timeline_service import TimelineService
+from src.services.timeline_store import InMemoryTimelineStore
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+CHOICES = [
+    'Save my allowance',
+    'Invest in the lemonade stand',
+    'Spend on pokemon cards',
+    'Save for a bike',
+    'Invest birthday money',
+    'Start a side project',
+    'Spend on snacks',
+    'Buy a video game'
+]
+GRADE_LEVELS = ['3rd Grade', '5th Grade', '7th Grade', '9th Grade']
+LEARNING_STYLES = ['visual', 'hands-on', 'analytical']
+
+KID_PORTFOLIOS = [
+    'Safe & Slow (like a piggy bank)',
+    'Medium Risk (like a lemonade stand)',
+    'High Risk (like a rocket ship)',
+    'Super Safe Turtle Fund',
+    'Lemonade Stand',
+    'Dragon Treasure Hunt'
+]
+
+# Cohere output cut off by max_tokens, as seen in the profile analysis logs
+TRUNCATED_OUTPUTS = {
+    'unterminated_summary': '{"tags": ["curious", "creative", "builder"], "summary": "Loves building '
+                            'Lego cities and drawing maps; learns best with hands-on examples and '
+                            'likes to count coins in',
+    'missing_brace': '{"tags": ["curious", "artistic"], "summary": "A thoughtful learner who enjoys '
+                     'stories about saving."',
+    'cut_in_tags': '{"tags": ["adventurous", "sporty", "compet',
+    'prose_with_json': 'Sure! Here is the analysis:\n{"tags": ["curious", "patient"], "summary": '
+                       '"Enjoys science projects',
+    'prose_only': 'This child seems curious and creative, enjoys sports and music, and is a '
+                  'careful saver who is patient with long projects.'
+}
+
+SIMPLE_TIMELINE_REQUEST = {
+    'name': 'Bench Kid',
+    'profileText': 'Loves drawing, soccer and saving for a new bike',
+    'choices': CHOICES[:3]
+}
+
+
+class Case:
+    def __init__(self, name, setup, group):
+        self.name = name
+        self.setup = setup
+        self.group = group
+
+
+def cases(max_timelines):
+    """All benchmark cases; setup() returns the zero-argument function to time"""
+    found = []
+
+    def add(name, group):
+        def register(setup):
+            found.append(Case(name, setup, group))
+            return setup
+        return register
+
+    for count in (0, 1, 4, 16, 64):
+        choices = [CHOICES[i % len(CHOICES)] for i in range(count)]
+        seeds = [str(uuid.uuid4()) for _ in range(64)]
+
+        @add(f'simulate_timeline[choices={count}]', 'simulate')
+        def setup_simulate(choices=choices, seeds=seeds):
+            position = iter(range(10 ** 12))
+            return lambda: simulate_timeline(seeds[next(position) % len(seeds)], choices)
+
+    sizes = [10 ** exponent for exponent in range(3, 7) if 10 ** exponent <= max_timelines]
+    for size in sizes:
+        @add(f'list_timelines[n={size}]', 'timelines')
+        def setup_list(size=size):
+            service = timeline_service_with(size)
+            return lambda: service.list_timelines(limit=50)
+
+        @add(f'list_timelines_filtered[n={size}]', 'timelines')
+        def setup_list_filtered(size=size):
+            service = timeline_service_with(size)
+            return lambda: service.list_timelines(limit=50, grade_level='7th Grade',
+                                                  learning_style='visual')
+
+        @add(f'list_timelines_deep_page[n={size}]', 'timelines')
+        def setup_deep_page(size=size):
+            service = timeline_service_with(size)
+            # Cursor into the middle of the store: bisect, not a scan from the newest
+            newest = service.list_timelines(limit=1)
+            summary = newest['timelines'][0]
+            created_at = datetime.fromisoformat(summary['createdAt']) - timedelta(seconds=size // 2)
+            cursor = service._encode_cursor(created_at.isoformat(), '')
+            return lambda: service.list_timelines(cursor=cursor, limit=50)
+
+        @add(f'get_timeline[n={size}]', 'timelines')
+        def setup_get(size=size):
+            service = timeline_service_with(size)
+            ids = [record.id for record in service.store.list()[::max(1, size // 256)]]
+            position = iter(range(10 ** 12))
+            return lambda: service.get_timeline(ids[next(position) % len(ids)])
+
+    transformer = DataTransformer(cache=None)
+    transformer.cohere_client = None
+    for count in (1, 3, 6):
+        portfolios = KID_PORTFOLIOS[:count]
+
+        @add(f'translate_kid_portfolios_to_technical[n={count}]', 'transformer')
+        def setup_translate(portfolios=portfolios):
+            return lambda: transformer.translate_kid_portfolios_to_technical(portfolios)
+
+    for label, text in TRUNCATED_OUTPUTS.items():
+        @add(f'fix_incomplete_json[{label}]', 'transformer')
+        def setup_fix_json(text=text):
+            return lambda: quiet(transformer._fix_incomplete_json, text)
+
+        @add(f'extract_tags_from_text[{label}]', 'transformer')
+        def setup_extract_tags(text=text):
+            return lambda: quiet(transformer._extract_tags_from_text, text)
+
+    @add('create_simple_timeline[mock transformer]', 'end_to_end')
+    def setup_create_simple():
+        service = TimelineService(store=InMemoryTimelineStore())
+        service.data_transformer.cohere_client = None
+        return lambda: quiet(service.create_simple_timeline, SIMPLE_TIMELINE_REQUEST)
+
+    return found
+
+
+_services = {}
+
+
+def timeline_service_with(size):
+    """TimelineService over an in-memory store holding `size` timelines (built once per size)"""
+    if size not in _services:
+        _services.clear()
+        service = TimelineService(store=InMemoryTimelineStore())
+        for record in make_records(size):
+            service.store.save(record)
+        _services[size] = service
+    return _services[size]
+
+
+def make_records(count):
+    """
+    Lean records for large stores: ids, names and timestamps are unique,
+    simulation payloads come from a small shared pool to keep memory flat
+    """
+    choices = CHOICES[:2]
+    pool_seeds = [str(uuid.uuid4()) for _ in range(64)]
+    pool = simulate_timelines(pool_seeds, [choices] * len(pool_seeds))
+    analysis = {'tags': ['curious', 'creative'], 'summary': 'A curious young learner.'}
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        owner = f'Learner {i % 500}'
+        yield TimelineRecord(
+            id=str(uuid.uuid4()),
+            owner=owner,
+            name=f"{owner}'s Learning Timeline",
+            choices=choices,
+            profile_text='Loves drawing and building things',
+            created_at=(start + timedelta(seconds=i)).isoformat(),
+            simulated=pool[i % len(pool)],
+            analysis=analysis,
+            learning_style=LEARNING_STYLES[i % len(LEARNING_STYLES)],
+            grade_level=GRADE_LEVELS[i % len(GRADE_LEVELS)])
+
+
+def quiet(fn, *args):
+    """Call fn with its progress prints discarded"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def measure(fn, repeat, min_time):
+    """Best and median seconds per call, over `repeat` samples of >= min_time each"""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        'bestUs': round(min(samples) * 1e6, 3),
+        'medianUs': round(statistics.median(samples) * 1e6, 3),
+        'loops': loops,
+        'samples': len(samples)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Per-case ratio of best time vs baseline; returns (rows, regressions)"""
+    rows = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, result['bestUs'], None, None))
+            continue
+        ratio = result['bestUs'] / base['bestUs'] if base['bestUs'] else 1.0
+        rows.append((name, result['bestUs'], base['bestUs'], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', help='only run cases whose name matches this regex')
+    parser.add_argument('--quick', action='store_true',
+                        help='fewer samples and stores up to 10^4 timelines (smoke run)')
+    parser.add_argument('--max-timelines', type=int, default=10 ** 6,
+                        help='largest store size for the list/get cases')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per case')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per sample')
+    parser.add_argument('--output', help='write results JSON here instead of stdout')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline JSON to compare against, if it exists')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write these results to --baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown vs baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.repeat = min(args.repeat, 3)
+        args.min_time = min(args.min_time, 0.02)
+        args.max_timelines = min(args.max_timelines, 10 ** 4)
+
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    for case in cases(args.max_timelines):
+        if pattern and not pattern.search(case.name):
+            continue
+        result = measure(case.setup(), args.repeat, args.min_time)
+        result['group'] = case.group
+        results[case.name] = result
+        print(f"{case.name:<52} best {result['bestUs']:12.3f} us  median {result['medianUs']:12.3f} us",
+              file=sys.stderr)
+
+    report = {
+        'meta': {
+            'createdAt': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'minTime': args.min_time
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; run with --save-baseline to record one",
+              file=sys.stderr)
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    rows, regressions = compare(results, baseline, args.threshold)
+    print(f"\nvs baseline {args.baseline} (threshold +{args.threshold:.0%})", file=sys.stderr)
+    for name, best, base, ratio in rows:
+        if ratio is None:
+            print(f"  {name:<52} {best:12.3f} us  (new)", file=sys.stderr)
+        else:
+            flag = '❌' if name in regressions else '✅'
+            print(f"{flag} {name:<52} {best:12.3f} us  vs {base:12.3f} us  {ratio:5.2f}x",
+                  file=sys.stderr)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    print("\n✅ No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,14 +4,22 @@ Parallel Lives Backend - Educational Financial App for Kids
 Single Flask application entry point with proper security configuration
 """
 
+from src.routes.jobs import jobs_bp
 from src.routes.social import social_bp
 from src.routes.timelines import timelines_bp
 from src.config import Config
+from src.services.data_transformer import generation_cache, generation_flight
+from src.services.job_queue import job_queue
+from src.services.metrics import registry
+from src.services.investease_client import client_email_index, client_state_cache, investease_client
+from src.services.realtime import init_realtime
+from src.services.resilience import breaker_stats
+from src.services.timeline_service import timeline_service
 import os
 import sys
-from flask import Flask
+from flask import Flask, Response
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -29,23 +37,63 @@ if missing_config:
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 
-# Configure CORS for kids' app security
-CORS(app, origins=Config.CORS_ORIGINS)
+# Configure CORS for kids' app security; the list endpoint's page cursor
+# travels in a response header the browser must be allowed to read
+CORS(app, origins=Config.CORS_ORIGINS, expose_headers=['X-Next-Cursor'])
 
 # Configure SocketIO with restricted origins
 socketio = SocketIO(app, cors_allowed_origins=Config.CORS_ORIGINS)
+init_realtime(socketio)
 
 # Import routes with absolute imports
 
 # Register blueprints
 app.register_blueprint(timelines_bp, url_prefix='/api/timelines')
 app.register_blueprint(social_bp, url_prefix='/api/social')
+app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
 
 
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return {'ok': True, 'service': 'Educational Financial App for Kids'}
+    """Health check endpoint with storage and cache counters"""
+    return {
+        'ok': True,
+        'service': 'Educational Financial App for Kids',
+        'timelineStore': timeline_service.store.stats(),
+        'investeaseIndex': client_email_index.stats(),
+        'investeaseClientState': client_state_cache.stats(),
+        'cohereCache': generation_cache.stats(),
+        'jobQueue': job_queue.stats(),
+        'circuitBreakers': breaker_stats(),
+        'singleFlight': {
+            'cohere': generation_flight.stats(),
+            'investease': investease_client.client_flight.stats()
+        }
+    }
+
+
+# Point-in-time values, read when /metrics is scraped
+BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+registry.gauge('timeline_store_entries', 'Timelines in the store',
+               lambda: timeline_service.store.stats()['entries'])
+
+
+def job_queue_depths():
+    stats = job_queue.stats()
+    return {(state,): stats[state] for state in ('queued', 'running')}
+
+
+registry.gauge('job_queue_jobs', 'Background jobs by state', job_queue_depths, labels=('state',))
+registry.gauge('circuit_breaker_state', 'Upstream breaker state (0 closed, 1 half open, 2 open)',
+               lambda: {(name,): BREAKER_STATES[stats['state']]
+                        for name, stats in breaker_stats().items()},
+               labels=('upstream',))
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: stage/upstream latency histograms, counters and gauges"""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 @app.route('/')
@@ -73,6 +121,7 @@ def handle_disconnect():
 
 @socketio.on('join-room')
 def handle_join_room(room):
+    join_room(room)
     print(f'Client joined room: {room}')
 
 
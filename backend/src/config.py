@@ -19,6 +19,17 @@ class Config:
     # AI Service Configuration
     COHERE_API_KEY = os.getenv('COHERE_API_KEY')
     COHERE_MODEL = os.getenv('COHERE_MODEL', 'command-light')
+    # Optional API base URL, e.g. a local stand-in (python -m benchmarks.standins)
+    COHERE_BASE_URL = os.getenv('COHERE_BASE_URL')
+    # Per-call timeout in seconds (capped by the request deadline)
+    COHERE_TIMEOUT = float(os.getenv('COHERE_TIMEOUT', 20))
+
+    # Generation cache: memory LRU entries (0 disables), TTL in seconds, disk file
+    # (empty = memory only); calls above the max temperature are never cached
+    COHERE_CACHE_SIZE = int(os.getenv('COHERE_CACHE_SIZE', 1024))
+    COHERE_CACHE_TTL = int(os.getenv('COHERE_CACHE_TTL', 86400))
+    COHERE_CACHE_PATH = os.getenv('COHERE_CACHE_PATH', 'cohere_cache.db')
+    COHERE_CACHE_MAX_TEMPERATURE = float(os.getenv('COHERE_CACHE_MAX_TEMPERATURE', 0.5))
 
     # External API Configuration
     AWS_JWT_TOKEN = os.getenv('AWS_JWT_TOKEN')
@@ -27,6 +38,85 @@ class Config:
         'https://2dcq63co40.execute-api.us-east-1.amazonaws.com/dev/clients'
     )
 
+    # Investease HTTP connection pool (keep-alive) and connect timeout in seconds
+    INVESTEASE_POOL_SIZE = int(os.getenv('INVESTEASE_POOL_SIZE', 20))
+    INVESTEASE_CONNECT_TIMEOUT = float(os.getenv('INVESTEASE_CONNECT_TIMEOUT', 5))
+
+    # Investease read timeouts per endpoint in seconds; simulations are the slowest calls
+    INVESTEASE_ENDPOINT_TIMEOUTS = {
+        'create_client': float(os.getenv('INVESTEASE_TIMEOUT_CREATE_CLIENT', 30)),
+        'create_portfolio': float(os.getenv('INVESTEASE_TIMEOUT_CREATE_PORTFOLIO', 30)),
+        'simulate': float(os.getenv('INVESTEASE_TIMEOUT_SIMULATE', 60)),
+        'get_client': float(os.getenv('INVESTEASE_TIMEOUT_GET_CLIENT', 15)),
+        'list_clients': float(os.getenv('INVESTEASE_TIMEOUT_LIST_CLIENTS', 15)),
+        'update_client': float(os.getenv('INVESTEASE_TIMEOUT_UPDATE_CLIENT', 15))
+    }
+
+    # Portfolio creations in flight per registration
+    INVESTEASE_PORTFOLIO_CONCURRENCY = int(os.getenv('INVESTEASE_PORTFOLIO_CONCURRENCY', 4))
+
+    # Local email -> client id index (empty path = memory only) and max age of a full sync
+    INVESTEASE_INDEX_PATH = os.getenv('INVESTEASE_INDEX_PATH', 'investease_clients.db')
+    INVESTEASE_INDEX_SYNC_INTERVAL = int(os.getenv('INVESTEASE_INDEX_SYNC_INTERVAL', 3600))
+
+    # Client state cache fed by write responses: entries (0 disables) and staleness window in seconds
+    INVESTEASE_CLIENT_CACHE_SIZE = int(os.getenv('INVESTEASE_CLIENT_CACHE_SIZE', 1024))
+    INVESTEASE_CLIENT_CACHE_TTL = int(os.getenv('INVESTEASE_CLIENT_CACHE_TTL', 30))
+
+    # Run Investease registrations on the asyncio client (one event loop, no thread per call)
+    INVESTEASE_ASYNC = os.getenv('INVESTEASE_ASYNC', 'False').lower() == 'true'
+    INVESTEASE_ASYNC_MAX_CONNECTIONS = int(os.getenv('INVESTEASE_ASYNC_MAX_CONNECTIONS', 100))
+    # Threads for the blocking Cohere adventure step of async registrations
+    INVESTEASE_ASYNC_TRANSLATE_WORKERS = int(os.getenv('INVESTEASE_ASYNC_TRANSLATE_WORKERS', 32))
+
+    # Simulation worker pool: 'none', 'thread' or 'process'
+    SIMULATION_EXECUTOR = os.getenv('SIMULATION_EXECUTOR', 'none').lower()
+    SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', os.cpu_count() or 1))
+
+    # Thread pool for concurrent stages of the registration pipeline
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 16))
+
+    # Background jobs for ?async=1 registrations: worker threads, max waiting
+    # jobs (beyond that the route answers 503) and finished jobs kept for polling
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_QUEUE_DEPTH = int(os.getenv('JOB_QUEUE_DEPTH', 100))
+    JOB_RETENTION = int(os.getenv('JOB_RETENTION', 1000))
+
+    # End-to-end budget in seconds for create-with-registration (0 = none);
+    # every Cohere/Investease call gets what is left of it as its timeout
+    REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', 45))
+
+    # Per-upstream circuit breakers: consecutive failures that open one, and
+    # seconds before a trial call is let through again
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 30))
+
+    # Simulation result cache: size 0 disables it, TTL in seconds (0 = no expiry)
+    SIMULATION_CACHE_SIZE = int(os.getenv('SIMULATION_CACHE_SIZE', 4096))
+    SIMULATION_CACHE_TTL = int(os.getenv('SIMULATION_CACHE_TTL', 3600))
+
+    # Default horizon for month-by-month wealth curves
+    SIMULATION_MONTHS = int(os.getenv('SIMULATION_MONTHS', 12))
+
+    # Choice bias rule table (JSON); defaults to src/services/bias_rules.json
+    BIAS_RULES_PATH = os.getenv('BIAS_RULES_PATH')
+
+    # Timeline storage: 'memory' (default) or 'sqlite'
+    TIMELINE_STORE = os.getenv('TIMELINE_STORE', 'memory')
+    TIMELINE_DB_PATH = os.getenv('TIMELINE_DB_PATH', 'timelines.db')
+    # SQLite connections shared by all request threads (timeline and spill stores)
+    TIMELINE_DB_POOL_SIZE = int(os.getenv('TIMELINE_DB_POOL_SIZE', 4))
+
+    # Memory budget for the in-memory store (0 = unbounded); cold timelines spill to disk.
+    # MAX_ENTRIES limits full records, MAX_BYTES also covers the list summaries
+    TIMELINE_MEMORY_MAX_ENTRIES = int(os.getenv('TIMELINE_MEMORY_MAX_ENTRIES', 0))
+    TIMELINE_MEMORY_MAX_BYTES = int(os.getenv('TIMELINE_MEMORY_MAX_BYTES', 0))
+    TIMELINE_SPILL_PATH = os.getenv('TIMELINE_SPILL_PATH', 'timeline_spill.db')
+
+    # GET /api/timelines page size (default and hard cap)
+    TIMELINES_PAGE_SIZE = int(os.getenv('TIMELINES_PAGE_SIZE', 50))
+    TIMELINES_MAX_PAGE_SIZE = int(os.getenv('TIMELINES_MAX_PAGE_SIZE', 200))
+
     # Validation
     @classmethod
     def validate_config(cls):
@@ -0,0 +1,17 @@
+"""
+Background job routes
+- /api/jobs/:jobId -> status, step progress and (when finished) result
+"""
+
+from flask import Blueprint, jsonify
+from src.services.job_queue import job_queue
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job queued by an ?async=1 request"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
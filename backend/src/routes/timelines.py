@@ -4,10 +4,28 @@ HTTP layer only - business logic delegated to services
 """
 
 from flask import Blueprint, request, jsonify
+from src.services.market_simulator import (
+    DEFAULT_DISTRIBUTION_PATHS,
+    DEFAULT_HISTOGRAM_BINS,
+    DEFAULT_SERIES_POINTS,
+    MAX_SERIES_POINTS
+)
+from src.services.job_queue import JobQueueFull, job_queue
 from src.services.timeline_service import timeline_service
 
 timelines_bp = Blueprint('timelines', __name__)
 
+
+def _wants_legacy():
+    """?legacy=1 asks for the backward-compatible duplicate timeline fields"""
+    return request.args.get('legacy', 'false').lower() in ('1', 'true', 'yes')
+
+
+def _wants_job():
+    """?async=1 runs the request as a background job instead of blocking"""
+    return request.args.get('async', 'false').lower() in ('1', 'true', 'yes')
+
+
 @timelines_bp.route('/', methods=['POST'])
 def create_simple_timeline():
     """
@@ -19,7 +37,12 @@ def create_simple_timeline():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
 
-        timeline = timeline_service.create_simple_timeline(data)
+        try:
+            horizon = timeline_service.simulation_horizon(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        timeline = timeline_service.create_simple_timeline(data, horizon=horizon)
         return jsonify(timeline)
 
     except Exception as e:
@@ -27,9 +50,32 @@ def create_simple_timeline():
 
 @timelines_bp.route('/', methods=['GET'])
 def list_timelines():
-    """List all educational timelines"""
-    timeline_list = timeline_service.list_timelines()
-    return jsonify(timeline_list)
+    """
+    List educational timelines, one page at a time, newest first
+    Query: limit, cursor, owner, gradeLevel, learningStyle
+    The body is the page as a JSON list; X-Next-Cursor (exposed to CORS
+    clients) holds the cursor for the next, older page when there is one
+    """
+    try:
+        limit = request.args.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError('limit must be an integer')
+        page = timeline_service.list_timelines(
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            owner=request.args.get('owner'),
+            grade_level=request.args.get('gradeLevel'),
+            learning_style=request.args.get('learningStyle'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(page['timelines'])
+    if page['nextCursor']:
+        response.headers['X-Next-Cursor'] = page['nextCursor']
+    return response
 
 @timelines_bp.route('/create-with-registration', methods=['POST'])
 def create_timeline_with_registration():
@@ -37,6 +83,9 @@ def create_timeline_with_registration():
     Create complete educational timeline with Investease registration
     Full pipeline: Frontend → Cohere → Investease
     Body: { name, email, cashAmount, portfolios, profileText, choices }
+    Query: legacy=1 to include the backward-compatible duplicate fields,
+           async=1 to answer 202 with a job id and run the pipeline in the background
+           (progress over Socket.IO 'job-progress', result at GET /api/jobs/<id>)
     """
     try:
         data = request.get_json()
@@ -47,7 +96,31 @@ def create_timeline_with_registration():
         if not data.get('name'):
             return jsonify({'error': 'Child\'s name is required'}), 400
 
-        result = timeline_service.create_complete_timeline(data)
+        # Checked here so a bad horizon is a 400, not a failed background job
+        try:
+            horizon = timeline_service.simulation_horizon(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        legacy = _wants_legacy()
+        if _wants_job():
+            try:
+                job = job_queue.submit(
+                    lambda progress: timeline_service.create_complete_timeline(
+                        data, legacy=legacy, progress=progress, horizon=horizon),
+                    room=data.get('socketRoom'))
+            except JobQueueFull as e:
+                return jsonify({'error': str(e)}), 503
+            response = jsonify({
+                'jobId': job.id,
+                'status': job.status,
+                'statusUrl': f'/api/jobs/{job.id}'
+            })
+            response.status_code = 202
+            response.headers['Location'] = f'/api/jobs/{job.id}'
+            return response
+
+        result = timeline_service.create_complete_timeline(data, legacy=legacy, horizon=horizon)
         return jsonify(result)
 
     except Exception as e:
@@ -55,8 +128,51 @@ def create_timeline_with_registration():
 
 @timelines_bp.route('/<timeline_id>', methods=['GET'])
 def get_timeline(timeline_id):
-    """Get a specific educational timeline"""
-    timeline = timeline_service.get_timeline(timeline_id)
+    """
+    Get a specific educational timeline
+    Query: legacy=1 to include the backward-compatible duplicate fields
+    """
+    timeline = timeline_service.get_timeline(timeline_id, legacy=_wants_legacy())
     if not timeline:
         return jsonify({'error': 'Timeline not found'}), 404
-    return jsonify(timeline)
\ No newline at end of file
+    return jsonify(timeline)
+
+@timelines_bp.route('/<timeline_id>/distribution', methods=['GET'])
+def get_timeline_distribution(timeline_id):
+    """
+    Monte Carlo outcome distribution for a timeline
+    Query: paths (default 10000), bins (default 20)
+    """
+    try:
+        paths = int(request.args.get('paths', DEFAULT_DISTRIBUTION_PATHS))
+        bins = int(request.args.get('bins', DEFAULT_HISTOGRAM_BINS))
+    except ValueError:
+        return jsonify({'error': 'paths and bins must be integers'}), 400
+
+    try:
+        distribution = timeline_service.get_timeline_distribution(
+            timeline_id, paths=paths, bins=bins)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not distribution:
+        return jsonify({'error': 'Timeline not found'}), 404
+    return jsonify(distribution)
+
+@timelines_bp.route('/<timeline_id>/series', methods=['GET'])
+def get_timeline_series(timeline_id):
+    """
+    Month-by-month wealth curve for charts, downsampled on the server
+    Query: points (default 120, max 2000)
+    """
+    try:
+        points = int(request.args.get('points', DEFAULT_SERIES_POINTS))
+    except ValueError:
+        return jsonify({'error': 'points must be an integer'}), 400
+    if not 2 <= points <= MAX_SERIES_POINTS:
+        return jsonify({'error': f'points must be between 2 and {MAX_SERIES_POINTS}'}), 400
+
+    series = timeline_service.get_wealth_series(timeline_id, points=points)
+    if not series:
+        return jsonify({'error': 'Timeline not found'}), 404
+    return jsonify(series)
\ No newline at end of file
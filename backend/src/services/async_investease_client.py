@@ -0,0 +1,286 @@
+"""
+asyncio-native Investease API client
+Same surface and result dicts as InvesteaseClient (both build requests and
+handle responses through InvesteaseClientBase), on httpx.AsyncClient,
+so hundreds of registrations can wait on the upstream concurrently on one
+event loop instead of holding one blocked thread each.
+
+Everything runs on one long-lived background loop. The timeline pipeline
+schedules its registration stage there as a coroutine (register_client), so
+no pipeline worker waits on Investease; other sync callers block on run_sync.
+Each HTTP request (or ?async=1 job worker) still waits on its own thread for
+the whole pipeline, so in-server concurrency is bounded by those threads and
+INVESTEASE_ASYNC_MAX_CONNECTIONS, not by PIPELINE_WORKERS.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from http.cookiejar import DefaultCookiePolicy
+import threading
+import time
+
+import httpx
+
+from src.config import Config
+from src.services.investease_client import (InvesteaseClientBase, client_email_index,
+                                            client_state_cache)
+from src.services.metrics import REGISTRATION_STEP_SECONDS, observe_upstream, upstream_status
+from src.services.resilience import deadline_timeouts
+from src.services.single_flight import AsyncSingleFlight
+
+
+class AsyncInvesteaseClient(InvesteaseClientBase):
+    """
+    One instance per event loop: the underlying httpx.AsyncClient is created
+    lazily on first use and bound to the loop that made the call
+    """
+    timeout_errors = httpx.TimeoutException
+    connection_errors = httpx.TransportError
+
+    def __init__(self, base_url=None, jwt_token=None, email_index=None, client_state=None):
+        super().__init__(base_url=base_url, jwt_token=jwt_token, email_index=email_index,
+                         client_state=client_state)
+        self.client_flight = AsyncSingleFlight()
+        # The Cohere SDK blocks; adventure translations get their own pool so
+        # they don't queue behind asyncio's small default executor
+        self.translate_executor = ThreadPoolExecutor(
+            max_workers=Config.INVESTEASE_ASYNC_TRANSLATE_WORKERS,
+            thread_name_prefix='investease-adventures')
+        self._http = None
+        self._slots = None
+
+    def _client(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers=self.headers,
+                limits=httpx.Limits(
+                    max_connections=Config.INVESTEASE_ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.INVESTEASE_POOL_SIZE))
+            # Shared across every in-flight registration, so keep no cookies
+            self._http.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            # httpcore scans its whole wait queue per connection change, so keep
+            # excess requests waiting here rather than inside the pool
+            self._slots = asyncio.Semaphore(Config.INVESTEASE_ASYNC_MAX_CONNECTIONS)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._slots = None
+
+    async def create_client(self, client_data):
+        """POST /clients"""
+        api_payload = self._client_payload(client_data)
+        if not self.jwt_token:
+            return self._missing_token()
+        result = await self._call('POST', '/clients', 'create_client',
+                                  ok_statuses=(200, 201), json=api_payload)
+        return self._client_created(result, api_payload)
+
+    async def create_portfolio(self, client_id, portfolio_type="balanced", initial_amount=1000):
+        """POST /clients/{clientId}/portfolios"""
+        payload = self._portfolio_payload(client_id, portfolio_type, initial_amount)
+        result = await self._call('POST', f"/clients/{client_id}/portfolios", 'create_portfolio',
+                                  ok_statuses=(200, 201), json=payload)
+        return self._portfolio_created(client_id, result, portfolio_type, initial_amount)
+
+    async def simulate_client_portfolios(self, client_id, months=12):
+        """POST /client/{clientId}/simulate"""
+        payload = self._simulation_payload(client_id, months)
+        result = await self._call('POST', f"/client/{client_id}/simulate", 'simulate',
+                                  json=payload)
+        return self._simulated(client_id, months, result)
+
+    async def list_clients(self):
+        """GET /clients; a full listing is also a full index sync"""
+        return await self.client_flight.do('list_clients', self._list_clients)
+
+    async def _list_clients(self):
+        return self._clients_listed(await self._call('GET', '/clients', 'list_clients'))
+
+    async def find_client_by_email(self, email):
+        """Existing client with this email (indexed id, state from cache or API), or None"""
+        try:
+            client_id, needs_sync = self._indexed_client_id(email)
+            if needs_sync:
+                # Index is cold or stale: fall back to a full sync
+                client_id = self._client_id_after_sync(email, await self.list_clients())
+            client_result = await self.get_client(client_id) if client_id is not None else None
+            return self._found_client(email, client_result)
+        except Exception as e:
+            print(f"❌ Error searching for client by email: {str(e)}")
+            return None
+
+    async def get_client(self, client_id, use_cache=True):
+        """GET /clients/{clientId}, or the client state cache when a recent write filled it"""
+        cached = self._cached_client(client_id) if use_cache else None
+        if cached is not None:
+            return cached
+        result = await self._call('GET', f"/clients/{client_id}", 'get_client')
+        self._track_client(client_id, result)
+        return result
+
+    async def update_client_cash(self, client_id, new_cash_amount):
+        """PUT /clients/{clientId}"""
+        payload = self._cash_payload(client_id, new_cash_amount)
+        result = await self._call('PUT', f"/clients/{client_id}", 'update_client', json=payload)
+        self._track_client(client_id, result)
+        if not result['success']:
+            print(f"❌ Client cash update failed: {result['error']}")
+        return result
+
+    async def create_portfolios(self, client_id, portfolio_configs):
+        """Concurrent create_portfolio calls (bounded), results in config order"""
+        slots = asyncio.Semaphore(max(1, Config.INVESTEASE_PORTFOLIO_CONCURRENCY))
+
+        async def create(config):
+            async with slots:
+                return await self.create_portfolio(client_id, config['type'], config['amount'])
+
+        return await asyncio.gather(*(create(config) for config in portfolio_configs))
+
+    async def find_or_create_client(self, client_data):
+        """Reuse the existing client for this email (topping up cash) or create one"""
+        email = client_data.get('email')
+        client_info = await self.find_client_by_email(email) if email else None
+
+        if client_info:
+            new_cash = self._cash_top_up(client_info, client_data)
+            if new_cash is not None:
+                client_info = self._topped_up_client(
+                    client_info, await self.update_client_cash(client_info['id'], new_cash))
+
+        if not client_info:
+            print("➕ Creating new client...")
+            return self._client_ready(await self.create_client(client_data))
+
+        return {
+            'success': True,
+            'data': client_info,
+            'status_code': 200
+        }
+
+    async def create_complete_client_with_portfolios(self, client_data, portfolio_configs=None,
+                                                     room=None):
+        """
+        Find existing client OR create new + portfolios + simulate
+        Mirrors InvesteaseClient.create_complete_client_with_portfolios
+        """
+        try:
+            print("=== COMPLETE INVESTEASE CLIENT PIPELINE (async) ===")
+
+            # Step 1: Reuse or create the client; concurrent registrations
+            # for the same email share one lookup/creation
+            email = client_data.get('email')
+            with REGISTRATION_STEP_SECONDS.time('find_or_create'):
+                if email:
+                    client_result = await self.client_flight.do(
+                        ('client', email), lambda: self.find_or_create_client(client_data))
+                else:
+                    client_result = await self.find_or_create_client(client_data)
+            if not client_result['success']:
+                return client_result
+            client_info = client_result['data']
+            client_id = client_info['id']
+
+            # Step 2: Create portfolios based on user data or defaults
+            portfolio_configs = self._portfolio_plan(client_info, client_data, portfolio_configs)
+            with REGISTRATION_STEP_SECONDS.time('portfolios'):
+                portfolio_results = await self.create_portfolios(client_id, portfolio_configs)
+            portfolios_created = self._created_portfolios(portfolio_configs, portfolio_results)
+
+            # Step 3: Simulate portfolios using RBC Investease API
+            with REGISTRATION_STEP_SECONDS.time('simulate'):
+                simulation_result = await self.simulate_client_portfolios(client_id, months=12)
+            simulation_data, rbc_api_metadata = self._simulation_outcome(simulation_result)
+
+            # Step 4: Kid-friendly adventures (Cohere SDK is blocking, so run it off the loop)
+            with REGISTRATION_STEP_SECONDS.time('adventures'):
+                kid_adventures = await asyncio.get_running_loop().run_in_executor(
+                    self.translate_executor, contextvars.copy_context().run,
+                    self._kid_adventures, simulation_data, client_data, room)
+
+            # Step 5: Get updated client info with portfolios
+            with REGISTRATION_STEP_SECONDS.time('get_client'):
+                updated_client_result = await self.get_client(client_id)
+            final_client_data = updated_client_result['data'] if updated_client_result['success'] else client_info
+
+            return self._registration_result(client_data, client_id, final_client_data,
+                                             portfolios_created, simulation_data,
+                                             rbc_api_metadata, kid_adventures)
+
+        except Exception as e:
+            return self._handle_exception(e, "create_complete_client_with_portfolios")
+
+    async def _call(self, method, path, endpoint, ok_statuses=(200,), **kwargs):
+        """Send a request and wrap it in the usual {success, data|error, status_code} dict"""
+        try:
+            return self._result(await self._request(method, path, endpoint, **kwargs), ok_statuses)
+        except Exception as e:
+            return self._handle_exception(e, endpoint)
+
+    async def _request(self, method, path, endpoint, **kwargs):
+        http = self._client()
+        async with self._slots:
+            started = time.perf_counter()
+            try:
+                # Budget taken after waiting for a slot; the deadline travels in
+                # the task's context (run_coroutine_threadsafe and gather both copy it)
+                (read, connect), ignore = deadline_timeouts(
+                    httpx.TimeoutException,
+                    Config.INVESTEASE_ENDPOINT_TIMEOUTS[endpoint], Config.INVESTEASE_CONNECT_TIMEOUT)
+                response = await self.breaker.call_async(
+                    lambda: http.request(method, f"{self.base_url}{path}",
+                                         timeout=httpx.Timeout(read, connect=connect), **kwargs),
+                    is_failure=lambda response: response.status_code >= 500,
+                    ignore=ignore)
+            except Exception as e:
+                observe_upstream('investease', endpoint, upstream_status(e), started)
+                raise
+            observe_upstream('investease', endpoint, response.status_code, started)
+            return response
+
+
+class BackgroundLoop:
+    """Event loop on a daemon thread, so sync code can run coroutines on it"""
+
+    def __init__(self):
+        self.loop = None
+        self._lock = threading.Lock()
+
+    def get_loop(self):
+        """The loop, started on first use"""
+        with self._lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='investease-loop',
+                                 daemon=True).start()
+                self.loop = loop
+        return self.loop
+
+    def run(self, coro):
+        """Run a coroutine on the background loop and block for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop()).result()
+
+
+# Global instances; async_investease_client is only used from background_loop
+background_loop = BackgroundLoop()
+async_investease_client = AsyncInvesteaseClient(email_index=client_email_index,
+                                                client_state=client_state_cache)
+
+
+def run_sync(coro):
+    """Run an async client call from synchronous code"""
+    return background_loop.run(coro)
+
+
+async def register_client(client_data, room=None):
+    """Registration coroutine for stages scheduled on background_loop"""
+    return await async_investease_client.create_complete_client_with_portfolios(
+        client_data, room=room)
+
+
+def register_client_with_investease(client_data, room=None):
+    """Sync entry point matching investease_client.register_client_with_investease"""
+    return run_sync(register_client(client_data, room=room))
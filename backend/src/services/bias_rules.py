@@ -0,0 +1,134 @@
+"""
+Data-driven choice bias rules for the market simulator
+Rules live in a JSON file (see bias_rules.json) and are compiled once into a
+single regex that finds every keyword in a choice in one scan. Per-choice
+results are cached, and a new rule set can be swapped in while serving.
+
+Rule file format:
+{"rules": [{"name": "saving", "keywords": ["save"], "delta": 0.15}, ...]}
+A rule fires at most once per choice when any of its keywords appears in the
+lowercased choice text; deltas are applied in rule-file order.
+"""
+from functools import lru_cache
+import hashlib
+import json
+import os
+import re
+import threading
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), 'bias_rules.json')
+CHOICE_CACHE_SIZE = 8192
+
+
+def _validate_rules(rules):
+    """Normalize rule dicts, raising ValueError on malformed entries"""
+    normalized = []
+    for idx, rule in enumerate(rules):
+        keywords = rule.get('keywords') if isinstance(rule, dict) else None
+        if not keywords or not all(isinstance(k, str) and k for k in keywords):
+            raise ValueError(f'Bias rule {idx} needs a non-empty list of keywords')
+        try:
+            delta = float(rule['delta'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'Bias rule {idx} needs a numeric delta')
+        normalized.append({
+            'name': rule.get('name', f'rule-{idx}'),
+            'keywords': [k.lower() for k in keywords],
+            'delta': delta
+        })
+    return normalized
+
+
+class CompiledBiasRules:
+    """Immutable, compiled rule set; share freely between threads"""
+
+    def __init__(self, rules, cache_size=CHOICE_CACHE_SIZE):
+        self.rules = _validate_rules(rules)
+        self.cache_size = cache_size
+        canonical = json.dumps(self.rules, sort_keys=True)
+        self.version = hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+        keyword_rules = {}
+        for idx, rule in enumerate(self.rules):
+            for keyword in rule['keywords']:
+                keyword_rules.setdefault(keyword, set()).add(idx)
+
+        # The lookahead reports one keyword per position (longest first), so a
+        # match also implies every keyword contained inside it
+        self._implied = {
+            keyword: tuple(sorted(set().union(*(
+                keyword_rules[other] for other in keyword_rules if other in keyword))))
+            for keyword in keyword_rules
+        }
+        alternatives = sorted(keyword_rules, key=len, reverse=True)
+        self._pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(k) for k in alternatives) + '))') if alternatives else None
+
+        self.choice_deltas = lru_cache(maxsize=cache_size)(self._match_choice)
+
+    def _match_choice(self, choice):
+        """Deltas of the rules matched by one choice, in rule order"""
+        if self._pattern is None:
+            return ()
+        matched = set()
+        for match in self._pattern.finditer(choice.lower()):
+            matched.update(self._implied[match.group(1)])
+        return tuple(self.rules[idx]['delta'] for idx in sorted(matched))
+
+    def bias(self, choices):
+        """Multiplier bias for a list of choices"""
+        bias = 1.0
+        for choice in choices:
+            for delta in self.choice_deltas(choice):
+                bias += delta
+        return bias
+
+    def __reduce__(self):
+        # Rebuild from the rule table in worker processes (compiled state isn't picklable)
+        return (CompiledBiasRules, (self.rules, self.cache_size))
+
+
+def load_rules_file(path=DEFAULT_RULES_PATH):
+    """Read the rule table from a JSON file"""
+    with open(path) as f:
+        data = json.load(f)
+    rules = data.get('rules') if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise ValueError(f'Bias rule file {path} must contain a list of rules')
+    return rules
+
+
+class BiasRuleEngine:
+    """
+    Holds the active compiled rule set and swaps it atomically
+    Readers grab `current` once per simulation, so a swap never mixes rule sets
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_RULES_PATH
+        self._lock = threading.Lock()
+        self.current = CompiledBiasRules(load_rules_file(self.path))
+
+    @property
+    def version(self):
+        return self.current.version
+
+    def bias(self, choices):
+        return self.current.bias(choices)
+
+    def load(self, path=None):
+        """(Re)load rules from a file and swap them in"""
+        with self._lock:
+            path = path or self.path
+            compiled = CompiledBiasRules(load_rules_file(path))
+            self.path = path
+            self.current = compiled
+        print(f"🔁 Loaded {len(compiled.rules)} bias rules (version {compiled.version}) from {path}")
+        return compiled
+
+    def swap(self, rules):
+        """Swap in a rule table given as a list of rule dicts"""
+        compiled = CompiledBiasRules(rules)
+        with self._lock:
+            self.current = compiled
+        return compiled
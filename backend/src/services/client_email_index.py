@@ -0,0 +1,154 @@
+"""
+Local email -> Investease client id index
+find_client_by_email used to download the whole team's client list on every
+registration. The index answers the email -> id lookup from a dict instead,
+fed by create responses, and only falls back to a full GET /clients sync when
+its last sync is older than INVESTEASE_INDEX_SYNC_INTERVAL. Entries are
+persisted to SQLite so a restart doesn't force a full sync.
+Only ids are kept: a client's cash changes with every portfolio, so the
+client itself is read from the client state cache or the API.
+"""
+import sqlite3
+import threading
+import time
+
+from src.config import Config
+
+
+class ClientEmailIndex:
+    """
+    Thread-safe email -> client id map with optional SQLite persistence
+    path=None keeps the index in memory only
+    """
+
+    SCHEMA = [
+        '''CREATE TABLE IF NOT EXISTS clients (
+            email TEXT PRIMARY KEY,
+            clientId TEXT NOT NULL
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_clients_client_id ON clients (clientId)',
+        'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)'
+    ]
+
+    def __init__(self, path=None, sync_interval=3600):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._by_email = {}
+        self._email_by_id = {}
+        self._lock = threading.RLock()
+        self._conn = None
+        self.last_full_sync = None
+        self.hits = 0
+        self.misses = 0
+        self.full_syncs = 0
+        self.invalidations = 0
+
+        if path:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self._conn:
+                for statement in self.SCHEMA:
+                    self._conn.execute(statement)
+            for email, client_id in self._conn.execute('SELECT email, clientId FROM clients'):
+                self._index(email, client_id)
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'lastFullSync'").fetchone()
+            self.last_full_sync = float(row[0]) if row else None
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def get(self, email):
+        """Indexed client id for this email, or None"""
+        with self._lock:
+            client_id = self._by_email.get(email)
+            if client_id is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return client_id
+
+    def is_fresh(self):
+        """True while the last full sync is recent enough to trust a miss"""
+        if self.last_full_sync is None:
+            return False
+        return time.time() - self.last_full_sync < self.sync_interval
+
+    def put(self, email, client_id):
+        """Index a client, e.g. from a create response"""
+        if not email or client_id is None:
+            return
+        client_id = str(client_id)
+        with self._lock:
+            self._index(email, client_id)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO clients (email, clientId) VALUES (?, ?)',
+                        (email, client_id))
+
+    def invalidate(self, client_id):
+        """Drop a client the upstream no longer knows about"""
+        with self._lock:
+            email = self._email_by_id.pop(str(client_id), None)
+            if email is None:
+                return
+            self._by_email.pop(email, None)
+            self.invalidations += 1
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute('DELETE FROM clients WHERE email = ?', (email,))
+
+    def sync(self, clients):
+        """Replace the index with a full GET /clients listing"""
+        now = time.time()
+        with self._lock:
+            self._by_email = {}
+            self._email_by_id = {}
+            for client in clients:
+                if client.get('email') and client.get('id') is not None:
+                    self._index(client['email'], str(client['id']))
+            self.last_full_sync = now
+            self.full_syncs += 1
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute('DELETE FROM clients')
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO clients (email, clientId) VALUES (?, ?)',
+                        list(self._by_email.items()))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('lastFullSync', ?)",
+                        (str(now),))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._by_email),
+                'hits': self.hits,
+                'misses': self.misses,
+                'fullSyncs': self.full_syncs,
+                'invalidations': self.invalidations,
+                'lastFullSync': self.last_full_sync,
+                'persistent': self._conn is not None
+            }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _index(self, email, client_id):
+        old_email = self._email_by_id.get(client_id)
+        if old_email is not None and old_email != email:
+            self._by_email.pop(old_email, None)
+        previous = self._by_email.get(email)
+        if previous is not None and previous != client_id:
+            self._email_by_id.pop(previous, None)
+        self._by_email[email] = client_id
+        self._email_by_id[client_id] = email
+
+
+def create_client_email_index(path=None):
+    """Persistent index at INVESTEASE_INDEX_PATH (memory only when it's empty)"""
+    return ClientEmailIndex(
+        path=path if path is not None else (Config.INVESTEASE_INDEX_PATH or None),
+        sync_interval=Config.INVESTEASE_INDEX_SYNC_INTERVAL)
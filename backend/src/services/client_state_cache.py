@@ -0,0 +1,65 @@
+"""
+Write-through cache of Investease client state
+create/update/portfolio responses already describe the client, so the state
+they leave behind is kept here and get_client is answered locally for
+INVESTEASE_CLIENT_CACHE_TTL seconds instead of re-fetching it.
+"""
+import threading
+
+from src.config import Config
+from src.services.lru_cache import LRUCache
+
+
+class ClientStateCache:
+    """client_id -> latest known client dict, trusted for max_age seconds"""
+
+    def __init__(self, maxsize=1024, max_age=30):
+        self._cache = LRUCache(maxsize=maxsize, ttl=max_age)
+        # Portfolio creations for one client land concurrently
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.saved_calls = 0
+
+    @property
+    def enabled(self):
+        return self._cache.enabled
+
+    def get(self, client_id):
+        """Cached client state, counting the upstream read it saves"""
+        client = self._cache.get(str(client_id))
+        if client is not None:
+            with self._stats_lock:
+                self.saved_calls += 1
+        return client
+
+    def put(self, client_id, client):
+        """Store the client as returned by a create/get/update response"""
+        with self._write_lock:
+            self._cache.put(str(client_id), client)
+
+    def add_portfolio(self, client_id, portfolio, amount):
+        """
+        Apply a successful portfolio creation to the cached client
+        The portfolio is funded from the client's cash
+        """
+        with self._write_lock:
+            client = self._cache.get(str(client_id))
+            if client is None:
+                return
+            client['portfolios'] = list(client.get('portfolios') or []) + [portfolio]
+            if isinstance(client.get('cash'), (int, float)):
+                client['cash'] = client['cash'] - amount
+            self._cache.put(str(client_id), client)
+
+    def invalidate(self, client_id):
+        self._cache.discard(str(client_id))
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['savedCalls'] = self.saved_calls
+        return stats
+
+
+def create_client_state_cache():
+    return ClientStateCache(maxsize=Config.INVESTEASE_CLIENT_CACHE_SIZE,
+                            max_age=Config.INVESTEASE_CLIENT_CACHE_TTL)
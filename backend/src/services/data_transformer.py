@@ -4,15 +4,138 @@ Handles Frontend → Cohere pipeline transformation for children's profiles
 """
 import random
 import json
+import time
 import cohere
+import httpx
 from src.config import Config
+from src.services.generation_cache import create_generation_cache
+from src.services.json_text_stream import JSONTextStream
+from src.services.metrics import MOCK_FALLBACKS, observe_upstream, upstream_status
+from src.services.realtime import emit_to_room
+from src.services.resilience import deadline_timeouts, get_breaker
+from src.services.single_flight import SingleFlight
+
+# Shared by every DataTransformer (one is created per registration)
+generation_cache = create_generation_cache()
+generation_flight = SingleFlight()
+# While open, Cohere calls fail fast and callers use their mock fallbacks
+cohere_breaker = get_breaker('cohere')
+# Adventure JSON keys whose text is streamed as 'adventure-chunk' events
+ADVENTURE_STREAM_FIELDS = ('adventure_name', 'story', 'learning_point', 'overall_story')
+
+
+def _request_options():
+    """
+    Per-call timeout (COHERE_TIMEOUT capped by the request deadline) and the
+    timeout errors the breaker should not count when the deadline capped it
+    The SDK's own retries are off: each would get the full timeout again and
+    overrun the deadline, and the breaker should see every failed attempt
+    """
+    (timeout,), ignore = deadline_timeouts(
+        httpx.TimeoutException, Config.COHERE_TIMEOUT)
+    return {'timeout': timeout, 'max_retries': 0}, ignore
+
+
+def _is_json(text):
+    try:
+        json.loads(text)
+        return True
+    except json.JSONDecodeError:
+        return False
 
 
 class DataTransformer:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.cohere_client = None
         if Config.COHERE_API_KEY:
-            self.cohere_client = cohere.Client(Config.COHERE_API_KEY)
+            self.cohere_client = cohere.Client(Config.COHERE_API_KEY, base_url=Config.COHERE_BASE_URL)
+        self.cache = cache if cache is not None else generation_cache
+
+    def _generate(self, prompt, max_tokens, temperature, use_cache=True, validate=None):
+        """
+        cohere generate -> stripped text, through the generation cache
+        Calls above COHERE_CACHE_MAX_TEMPERATURE (or use_cache=False) always hit
+        the API; validate(text) decides whether a fresh generation is stored.
+        Concurrent misses for the same prompt share one API call. Raises
+        CircuitOpen / DeadlineExceeded instead of calling an unhealthy or
+        out-of-budget upstream; callers fall back to their mock data.
+        """
+        if not use_cache or not self.cache.cacheable(temperature):
+            self.cache.record_bypass()
+            return self._generate_uncached(prompt, max_tokens, temperature)
+
+        key = self.cache.key(Config.COHERE_MODEL, prompt, temperature, max_tokens)
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+
+        def generate():
+            text = self._generate_uncached(prompt, max_tokens, temperature)
+            if validate is None or validate(text):
+                self.cache.put(key, text)
+            return text
+
+        return generation_flight.do(key, generate)
+
+    def _generate_stream(self, prompt, max_tokens, temperature, on_text, validate=None):
+        """
+        Streaming generate: on_text(chunk) is called as tokens arrive and the
+        full stripped text is returned. A cached generation is replayed as a
+        single chunk; streams are never shared between callers.
+        """
+        cacheable = self.cache.cacheable(temperature)
+        key = self.cache.key(Config.COHERE_MODEL, prompt, temperature, max_tokens)
+        if cacheable:
+            text = self.cache.get(key)
+            if text is not None:
+                on_text(text)
+                return text
+        else:
+            self.cache.record_bypass()
+
+        def stream():
+            chunks = []
+            for event in self.cohere_client.generate_stream(
+                    model=Config.COHERE_MODEL,
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    request_options=request_options):
+                if event.event_type == 'text-generation':
+                    chunks.append(event.text)
+                    on_text(event.text)
+                elif event.event_type == 'stream-error':
+                    raise Exception(f"Cohere stream error: {event.err}")
+            return ''.join(chunks).strip()
+
+        started = time.perf_counter()
+        try:
+            request_options, ignore = _request_options()
+            text = cohere_breaker.call(stream, ignore=ignore)
+        except Exception as e:
+            observe_upstream('cohere', 'generate_stream', upstream_status(e), started)
+            raise
+        observe_upstream('cohere', 'generate_stream', 200, started)
+        if cacheable and (validate is None or validate(text)):
+            self.cache.put(key, text)
+        return text
+
+    def _generate_uncached(self, prompt, max_tokens, temperature):
+        started = time.perf_counter()
+        try:
+            request_options, ignore = _request_options()
+            response = cohere_breaker.call(lambda: self.cohere_client.generate(
+                model=Config.COHERE_MODEL,
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                request_options=request_options
+            ), ignore=ignore)
+        except Exception as e:
+            observe_upstream('cohere', 'generate', upstream_status(e), started)
+            raise
+        observe_upstream('cohere', 'generate', 200, started)
+        return response.generations[0].text.strip()
 
     def transform_user_to_client_data(self, user_data):
         """
@@ -57,14 +180,8 @@ Response format:
   "timeHorizon": 5
 }}"""
 
-            response = self.cohere_client.generate(
-                model=Config.COHERE_MODEL,
-                prompt=prompt,
-                max_tokens=200,
-                temperature=0.5
-            )
-
-            result_text = response.generations[0].text.strip()
+            result_text = self._generate(
+                prompt, max_tokens=200, temperature=0.5, validate=_is_json)
             generated_data = json.loads(result_text)
 
             # Translate kid-friendly portfolio choices to technical terms
@@ -107,14 +224,8 @@ Child Profile: {profile_text}
 Return exactly this format:
 {{"tags": ["curious", "creative"], "summary": "Brief description focusing on learning style and interests for financial education."}}"""
 
-            response = self.cohere_client.generate(
-                model=Config.COHERE_MODEL,
-                prompt=prompt,
-                max_tokens=200,  # Increased token limit
-                temperature=0.3
-            )
-
-            result_text = response.generations[0].text.strip()
+            result_text = self._generate(
+                prompt, max_tokens=200, temperature=0.3)  # Increased token limit
             print(f"🤖 AI Profile Analysis Response: {result_text}")
 
             # Try to parse the JSON response
@@ -145,6 +256,7 @@ Return exactly this format:
 
     def _generate_mock_kid_client_data(self, user_data):
         """Generate mock client data for kids when Cohere API is not available"""
+        MOCK_FALLBACKS.inc('client_data')
         name = user_data.get('name', 'Young Learner')
         parent_email = user_data.get('email', 'parent@example.com')
         allowance = user_data.get('cashAmount', 50)
@@ -224,6 +336,7 @@ Return exactly this format:
 
     def _mock_analyze_kid_profile(self, profile_text):
         """Return mock analysis for kids when Cohere API is not available"""
+        MOCK_FALLBACKS.inc('profile_analysis')
         kid_friendly_tags = [
             'curious', 'creative', 'artistic', 'sporty',
             'tech-savvy', 'animal-lover', 'science-minded', 'storyteller',
@@ -329,11 +442,19 @@ Return exactly this format:
 
         return unique_portfolios
 
-    def translate_rbc_simulation_to_kid_adventures(self, rbc_simulation_data, kid_profile):
+    def translate_rbc_simulation_to_kid_adventures(self, rbc_simulation_data, kid_profile, room=None):
         """
         Transform RBC Investease simulation results into kid-friendly adventure stories
         Uses Cohere AI to translate financial data into educational narratives
+        With a Socket.IO room, story text is streamed there as 'adventure-chunk'
+        events ({'field', 'text'}: decoded text of ADVENTURE_STREAM_FIELDS, not
+        raw JSON) and the parsed result follows as 'adventure-complete'
         """
+        kid_adventures = self._translate_to_kid_adventures(rbc_simulation_data, kid_profile, room)
+        emit_to_room('adventure-complete', {'kid_adventures': kid_adventures}, room)
+        return kid_adventures
+
+    def _translate_to_kid_adventures(self, rbc_simulation_data, kid_profile, room):
         if not self.cohere_client:
             return self._generate_mock_kid_adventures(rbc_simulation_data, kid_profile)
 
@@ -384,14 +505,20 @@ Return JSON format:
   "overall_story": "Summary of all adventures and what {kid_name} learned"
 }}"""
 
-            response = self.cohere_client.generate(
-                model=Config.COHERE_MODEL,
-                prompt=prompt,
-                max_tokens=500,
-                temperature=0.7
-            )
+            # Creative call: bypasses the cache unless COHERE_CACHE_MAX_TEMPERATURE >= 0.7
+            if room:
+                story_text = JSONTextStream(ADVENTURE_STREAM_FIELDS)
+
+                def on_text(chunk):
+                    for field, text in story_text.feed(chunk):
+                        emit_to_room('adventure-chunk', {'field': field, 'text': text}, room)
 
-            result_text = response.generations[0].text.strip()
+                result_text = self._generate_stream(
+                    prompt, max_tokens=500, temperature=0.7, validate=_is_json,
+                    on_text=on_text)
+            else:
+                result_text = self._generate(
+                    prompt, max_tokens=500, temperature=0.7, validate=_is_json)
             print(f"🤖 AI Adventure Translation Response: {result_text}")
 
             try:
@@ -410,6 +537,7 @@ Return JSON format:
 
     def _generate_mock_kid_adventures(self, rbc_simulation_data, kid_profile):
         """Generate mock adventure stories when Cohere AI is not available"""
+        MOCK_FALLBACKS.inc('adventures')
         kid_name = kid_profile.get('name', 'Young Investor')
         simulation_results = rbc_simulation_data.get('results', [])
 
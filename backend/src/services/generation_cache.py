@@ -0,0 +1,120 @@
+"""
+Content-addressed cache for Cohere generations
+Identical prompts (same model, prompt, temperature and max_tokens) are served
+from an in-memory LRU, then from an SQLite file that survives restarts,
+before paying for another generate call. Both tiers honour the same TTL.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from src.config import Config
+from src.services.lru_cache import LRUCache
+
+
+class GenerationCache:
+    """
+    Two-tier (memory LRU -> SQLite) cache of generation text
+    maxsize=0 disables the memory tier, path=None the disk tier; calls above
+    max_temperature are treated as creative and never cached
+    """
+
+    SCHEMA = '''CREATE TABLE IF NOT EXISTS generations (
+        key TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        createdAt REAL NOT NULL
+    )'''
+
+    def __init__(self, maxsize=1024, ttl=86400, path=None, max_temperature=0.5):
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        # _lock guards the SQLite connection, _stats_lock the bypass counter
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._conn = None
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.bypasses = 0
+
+        if path:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(self.SCHEMA)
+                if ttl:
+                    self._conn.execute('DELETE FROM generations WHERE createdAt <= ?',
+                                       (time.time() - ttl,))
+
+    @staticmethod
+    def key(model, prompt, temperature, max_tokens):
+        """sha256 over the parameters that determine a generation"""
+        payload = json.dumps([model, prompt, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def cacheable(self, temperature):
+        return temperature <= self.max_temperature
+
+    def record_bypass(self):
+        """Count a generation that skipped the cache (creative or use_cache=False)"""
+        with self._stats_lock:
+            self.bypasses += 1
+
+    def get(self, key):
+        """Cached text for key, or None"""
+        text = self.memory.get(key)
+        if text is not None or self._conn is None:
+            return text
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text, createdAt FROM generations WHERE key = ?', (key,)).fetchone()
+            if row is None or (self.ttl and row[1] <= time.time() - self.ttl):
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+        # Promote to the memory tier
+        self.memory.put(key, row[0])
+        return row[0]
+
+    def put(self, key, text):
+        self.memory.put(key, text)
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO generations (key, text, createdAt) VALUES (?, ?, ?)',
+                (key, text, time.time()))
+
+    def stats(self):
+        """Hit rates per tier; a request is a miss only if both tiers miss"""
+        memory = self.memory.stats()
+        hits = memory['hits'] + self.disk_hits
+        if self.memory.enabled:
+            lookups = memory['hits'] + memory['misses']
+        else:
+            lookups = self.disk_hits + self.disk_misses
+        return {
+            'memory': memory,
+            'diskHits': self.disk_hits,
+            'diskMisses': self.disk_misses,
+            'persistent': self._conn is not None,
+            'hitRate': hits / lookups if lookups else 0.0,
+            'bypasses': self.bypasses,
+            'maxTemperature': self.max_temperature
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def create_generation_cache():
+    """Cache configured by COHERE_CACHE_* (empty COHERE_CACHE_PATH = memory only)"""
+    return GenerationCache(
+        maxsize=Config.COHERE_CACHE_SIZE,
+        ttl=Config.COHERE_CACHE_TTL,
+        path=Config.COHERE_CACHE_PATH or None,
+        max_temperature=Config.COHERE_CACHE_MAX_TEMPERATURE)
@@ -7,532 +7,710 @@ Based on the API documentation:
 - POST /clients/{clientId}/portfolios - Create portfolios
 - POST /client/{clientId}/simulate - Simulate portfolios
 - GET /clients/{clientId} - Get client details
+
+InvesteaseClientBase holds everything except the transport (payloads,
+response parsing, error dicts, email index and client state bookkeeping);
+InvesteaseClient and AsyncInvesteaseClient only add the HTTP calls.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from http.cookiejar import DefaultCookiePolicy
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from src.config import Config
+from src.services.client_email_index import ClientEmailIndex, create_client_email_index
+from src.services.client_state_cache import ClientStateCache, create_client_state_cache
+from src.services.metrics import REGISTRATION_STEP_SECONDS, observe_upstream, upstream_status
+from src.services.resilience import CircuitOpen, DeadlineExceeded, deadline_timeouts, get_breaker
+from src.services.single_flight import SingleFlight
+
+
+def create_session(pool_size=None):
+    """
+    Keep-alive session shared by every request thread
+    Connections to the API host are reused from a pool of pool_size; cookies
+    are refused so no per-user state leaks into the shared session.
+    """
+    pool_size = pool_size or Config.INVESTEASE_POOL_SIZE
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def extract_client_list(clients):
+    """GET /clients payload as a list; handles both list and object formats"""
+    if isinstance(clients, dict) and 'clients' in clients:
+        return clients['clients']
+    if isinstance(clients, dict) and 'data' in clients:
+        return clients['data']
+    return clients
 
 
-class InvesteaseClient:
-    def __init__(self):
-        self.base_url = Config.INVESTEASE_API_ENDPOINT.replace('/clients', '')
-        self.jwt_token = Config.AWS_JWT_TOKEN
+def default_portfolio_configs(client_info, client_data):
+    """
+    Portfolio allocation for a new registration: split the requested cash
+    50/30/20, or fall back to small portfolios that fit a low cash balance
+    """
+    # Get available cash from the actual client (after potential update)
+    available_cash = client_info.get(
+        'cash', 5000)  # Higher default for demo
+    requested_cash = client_data.get(
+        'cash', client_data.get('cashAmount', 1000))
+
+    print(
+        f"💰 Available cash: ${available_cash}, Requested: ${requested_cash}")
+
+    # For demo purposes, use smaller amounts if cash update failed
+    if available_cash < 100:
+        print(
+            f"⚠️ Using minimal portfolio amounts due to low cash (${available_cash})")
+        # Create minimal portfolios that fit available cash
+        if available_cash >= 10:
+            return [
+                {'type': 'conservative', 'amount': max(
+                    1, int(available_cash * 0.6))},  # 60%
+                {'type': 'balanced', 'amount': max(
+                    1, int(available_cash * 0.4))}       # 40%
+            ]
+        else:
+            return [
+                {'type': 'conservative', 'amount': max(
+                    1, available_cash)}  # Use all available
+            ]
+    else:
+        # Use requested amounts
+        total_cash = requested_cash
+        return [
+            {'type': 'conservative', 'amount': int(
+                total_cash * 0.5)},  # 50% conservative
+            {'type': 'balanced', 'amount': int(
+                total_cash * 0.3)},     # 30% balanced
+            {'type': 'growth', 'amount': int(
+                total_cash * 0.2)}        # 20% growth
+        ]
+
+
+class InvesteaseClientBase:
+    """
+    Request payloads, response handling and client bookkeeping shared by the
+    sync and async clients. Subclasses provide _call (send a request, return
+    the result dict) and the operation methods, which only sequence the
+    helpers below around their transport calls.
+    """
+    # Transport exceptions reported as 408 / 503 by _handle_exception
+    timeout_errors = ()
+    connection_errors = ()
+
+    def __init__(self, base_url=None, jwt_token=None, email_index=None, client_state=None):
+        self.base_url = base_url or Config.INVESTEASE_API_ENDPOINT.replace('/clients', '')
+        self.jwt_token = jwt_token if jwt_token is not None else Config.AWS_JWT_TOKEN
         self.headers = {
             'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.jwt_token}' if self.jwt_token else None
+            'Accept': 'application/json'
+        }
+        if self.jwt_token:
+            self.headers['Authorization'] = f'Bearer {self.jwt_token}'
+        self.email_index = email_index if email_index is not None else ClientEmailIndex()
+        self.client_state = client_state if client_state is not None else ClientStateCache()
+        # Shared by both clients: they talk to the same upstream
+        self.breaker = get_breaker('investease')
+
+    # Request payloads
+
+    def _client_payload(self, client_data):
+        """POST /clients body for a registration"""
+        print(
+            f"Creating Investease client: {client_data.get('name', 'Unknown')}")
+        api_payload = {
+            'name': client_data.get('name', 'Unknown'),
+            'email': client_data.get('email', 'user@example.com'),
+            'cash': client_data.get('cash', client_data.get('cashAmount', 10000)),
+            'portfolios': client_data.get('portfolios', [])
+        }
+        print(f"Investease API Request: POST {self.base_url}/clients")
+        print(f"Payload: {json.dumps(api_payload, indent=2)}")
+        return api_payload
+
+    def _portfolio_payload(self, client_id, portfolio_type, initial_amount):
+        """POST /clients/{clientId}/portfolios body"""
+        print(
+            f"Creating {portfolio_type} portfolio for client {client_id} with ${initial_amount}")
+        return {
+            'type': portfolio_type,
+            'initialAmount': initial_amount
         }
 
-    def create_client(self, client_data):
-        """
-        Create a new client in Investease API
-        POST /clients
-        """
-        try:
-            print(
-                f"Creating Investease client: {client_data.get('name', 'Unknown')}")
-
-            if not self.jwt_token:
-                return {
-                    'success': False,
-                    'error': 'JWT token required but not configured',
-                    'status_code': 401
-                }
-
-            # Prepare client data for Investease API
-            api_payload = {
-                'name': client_data.get('name', 'Unknown'),
-                'email': client_data.get('email', 'user@example.com'),
-                'cash': client_data.get('cash', client_data.get('cashAmount', 10000)),
-                'portfolios': client_data.get('portfolios', [])
+    def _simulation_payload(self, client_id, months):
+        """POST /client/{clientId}/simulate body"""
+        # Enhanced logging for hackathon demo - show RBC API integration
+        print(f"\n🏦 ===== RBC INVESTEASE SIMULATION API CALL =====")
+        print(
+            f"🔗 Endpoint: POST {self.base_url}/client/{client_id}/simulate")
+        print(f"🏢 Provider: RBC Investease Financial Services")
+        print(
+            f"📊 Simulating portfolios for client {client_id} over {months} months")
+        print(f"⏰ Timestamp: {self._get_timestamp()}")
+
+        payload = {
+            'months': min(months, 12)  # API limit is 12 months
+        }
+        print(f"📤 Request payload: {payload}")
+        print(f"🔑 Using JWT authentication for RBC API")
+        return payload
+
+    def _cash_payload(self, client_id, new_cash_amount):
+        """PUT /clients/{clientId} body"""
+        print(f"💰 Updating client {client_id} cash to ${new_cash_amount}")
+        return {
+            'cash': new_cash_amount
+        }
+
+    # Responses
+
+    def _result(self, response, ok_statuses=(200,)):
+        """Wrap a response in the usual {success, data|error, status_code} dict"""
+        if response.status_code in ok_statuses:
+            return {
+                'success': True,
+                'data': response.json(),
+                'status_code': response.status_code
             }
+        return {
+            'success': False,
+            'error': self._parse_error(response),
+            'status_code': response.status_code
+        }
 
-            print(f"Investease API Request: POST {self.base_url}/clients")
-            print(f"Payload: {json.dumps(api_payload, indent=2)}")
+    def _missing_token(self):
+        return {
+            'success': False,
+            'error': 'JWT token required but not configured',
+            'status_code': 401
+        }
 
-            response = requests.post(
-                f"{self.base_url}/clients",
-                json=api_payload,
-                headers=self.headers,
-                timeout=30
-            )
+    def _client_created(self, result, api_payload):
+        """Index a newly created client"""
+        print(f"Create client response: {result['status_code']}")
+        if result['success']:
+            client = result['data']
+            print(
+                f"✅ Client created successfully: {client.get('id', 'unknown')}")
+            self.email_index.put(client.get('email') or api_payload['email'], client['id'])
+            self.client_state.put(client['id'], client)
+        else:
+            print(f"❌ Client creation failed: {result['error']}")
+        return result
+
+    def _portfolio_created(self, client_id, result, portfolio_type, initial_amount):
+        """Apply a portfolio creation to the cached client, or drop it on failure"""
+        print(f"Create portfolio response: {result['status_code']}")
+        if result['success']:
+            print(
+                f"✅ {portfolio_type} portfolio created: {result['data'].get('id', 'unknown')}")
+            self.client_state.add_portfolio(client_id, result['data'], initial_amount)
+        else:
+            # The upstream state is unknown now, so stop serving it locally
+            self._track_client(client_id, result)
+            print(f"❌ Portfolio creation failed: {result['error']}")
+        return result
+
+    def _simulated(self, client_id, months, result):
+        """Log a simulation response and attach the RBC API metadata"""
+        print(f"📥 RBC API Response: {result['status_code']}")
+        if not result['success']:
+            print(f"❌ RBC Portfolio simulation failed: {result['error']}")
+            print(f"🏦 ===============================================\n")
+            return result
+
+        results_count = len(result['data'].get('results', []))
+        print(f"✅ RBC INVESTEASE SIMULATION COMPLETED SUCCESSFULLY")
+        print(
+            f"📈 Retrieved simulation data for {results_count} portfolios")
+        print(f"💰 Real financial projections calculated by RBC systems")
+        print(f"🏦 ===============================================\n")
+        result['rbc_api_metadata'] = {
+            'endpoint': f"POST /client/{client_id}/simulate",
+            'provider': 'RBC Investease',
+            'timestamp': self._get_timestamp(),
+            'portfolios_simulated': results_count,
+            'simulation_months': months
+        }
+        return result
+
+    def _clients_listed(self, result):
+        """A full listing is also a full index sync"""
+        if result['success']:
+            client_list = extract_client_list(result['data'])
+            if isinstance(client_list, list):
+                self.email_index.sync(client_list)
+        return result
+
+    def _cached_client(self, client_id):
+        """get_client result from the state cache, or None"""
+        client = self.client_state.get(client_id)
+        if client is None:
+            return None
+        return {
+            'success': True,
+            'data': client,
+            'status_code': 200,
+            'cached': True
+        }
 
-            print(f"Create client response: {response.status_code}")
+    def _indexed_client_id(self, email):
+        """
+        (client_id, needs_sync) for an email lookup: needs_sync when the index
+        has no entry and is too old to trust the miss
+        """
+        print(f"🔍 Looking for existing client with email: {email}")
+        client_id = self.email_index.get(email)
+        return client_id, client_id is None and not self.email_index.is_fresh()
 
-            if response.status_code in [200, 201]:
-                client_result = response.json()
+    def _client_id_after_sync(self, email, clients_response):
+        """
+        Look the email up again after a list_clients sync; the listed client
+        is fresh, so it also primes the state cache for the get_client that follows
+        """
+        if not clients_response['success']:
+            print(
+                f"❌ Failed to list clients: {clients_response.get('error', 'Unknown error')}")
+            return None
+        client_id = self.email_index.get(email)
+        if client_id is not None:
+            for client in extract_client_list(clients_response['data']):
+                if str(client.get('id')) == client_id:
+                    self.client_state.put(client_id, client)
+                    break
+        return client_id
+
+    def _found_client(self, email, client_result):
+        """Client from a get_client result for an indexed id, or None"""
+        if client_result is None:
+            print(f"📭 No existing client found with email: {email}")
+            return None
+        if not client_result['success']:
+            # A 404 has already unindexed the client (see _track_client)
+            print(f"⚠️ Could not load client for {email}: {client_result['error']}")
+            return None
+        client = client_result['data']
+        print(
+            f"✅ Found existing client: {client.get('name', 'Unknown')} (ID: {client.get('id')})")
+        return client
+
+    def _cash_top_up(self, client_info, client_data):
+        """Cash to set on a reused client for demo purposes, or None if it has enough"""
+        print(f"🔄 Reusing existing client with ID: {client_info['id']}")
+        new_cash = client_data.get(
+            'cash', client_data.get('cashAmount', 1000))
+        current_cash = client_info.get('cash', 0)
+        if new_cash <= current_cash:
+            return None
+        print(
+            f"💰 Updating client cash from ${current_cash} to ${new_cash} for demo")
+        return new_cash
+
+    def _topped_up_client(self, client_info, update_result):
+        """Client after a cash top-up; None when the client is gone upstream"""
+        if update_result['success']:
+            print(f"✅ Client cash updated successfully")
+            return update_result['data']
+        if update_result['status_code'] == 404:
+            # Stale index entry: the client is gone upstream
+            print(f"⚠️ Client {client_info['id']} no longer exists, creating a new one")
+            return None
+        print(
+            f"⚠️ Failed to update client cash: {update_result['error']}")
+        return client_info
+
+    def _client_ready(self, client_result):
+        if client_result['success']:
+            print(f"✅ New client created with ID: {client_result['data']['id']}")
+            client_result['status_code'] = 200
+        return client_result
+
+    def _portfolio_plan(self, client_info, client_data, portfolio_configs):
+        """Portfolios to create: the given configs or the defaults, skipping empty ones"""
+        if portfolio_configs is None:
+            portfolio_configs = default_portfolio_configs(client_info, client_data)
+        return [config for config in portfolio_configs if config['amount'] > 0]
+
+    def _created_portfolios(self, portfolio_configs, portfolio_results):
+        portfolios_created = []
+        for config, portfolio_result in zip(portfolio_configs, portfolio_results):
+            if portfolio_result['success']:
+                portfolios_created.append(portfolio_result['data'])
                 print(
-                    f"✅ Client created successfully: {client_result.get('id', 'unknown')}")
-                return {
-                    'success': True,
-                    'data': client_result,
-                    'status_code': response.status_code
-                }
+                    f"✅ {config['type']} portfolio created: ${config['amount']}")
             else:
-                error_data = self._parse_error(response)
-                print(f"❌ Client creation failed: {error_data}")
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
+                print(
+                    f"❌ Failed to create {config['type']} portfolio: {portfolio_result['error']}")
+        return portfolios_created
 
-        except Exception as e:
-            return self._handle_exception(e, "create_client")
+    def _simulation_outcome(self, simulation_result):
+        """(simulation data, RBC API metadata), both None if the simulation failed"""
+        if not simulation_result['success']:
+            print(
+                f"❌ RBC Portfolio simulation failed: {simulation_result['error']}")
+            return None, None
+        print(f"✅ RBC Portfolio simulation completed successfully")
+        return simulation_result['data'], simulation_result.get('rbc_api_metadata')
 
-    def create_portfolio(self, client_id, portfolio_type="balanced", initial_amount=1000):
+    def _kid_adventures(self, simulation_data, client_data, room=None):
         """
-        Create a portfolio for a client
-        POST /clients/{clientId}/portfolios
-        Available types: aggressive_growth, growth, balanced, conservative, very_conservative
+        Translate RBC simulation data into kid-friendly adventures (blocking:
+        calls Cohere); None if there is nothing to translate or it fails
         """
+        if not (simulation_data and client_data):
+            return None
         try:
-            print(
-                f"Creating {portfolio_type} portfolio for client {client_id} with ${initial_amount}")
-
-            payload = {
-                'type': portfolio_type,
-                'initialAmount': initial_amount
-            }
-
-            response = requests.post(
-                f"{self.base_url}/clients/{client_id}/portfolios",
-                json=payload,
-                headers=self.headers,
-                timeout=30
+            from src.services.data_transformer import DataTransformer
+            translator = DataTransformer()
+            kid_adventures = translator.translate_rbc_simulation_to_kid_adventures(
+                simulation_data, client_data, room=room
             )
+            print(f"🎨 Successfully translated RBC data to kid adventures")
+            return kid_adventures
+        except Exception as e:
+            print(f"⚠️ Could not translate to kid adventures: {e}")
+            return None
 
-            print(f"Create portfolio response: {response.status_code}")
-
-            if response.status_code in [200, 201]:
-                portfolio_result = response.json()
-                print(
-                    f"✅ {portfolio_type} portfolio created: {portfolio_result.get('id', 'unknown')}")
-                return {
-                    'success': True,
-                    'data': portfolio_result,
-                    'status_code': response.status_code
-                }
-            else:
-                error_data = self._parse_error(response)
-                print(f"❌ Portfolio creation failed: {error_data}")
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
+    def _registration_result(self, client_data, client_id, client, portfolios_created,
+                             simulation_data, rbc_api_metadata, kid_adventures):
+        return {
+            'success': True,
+            'data': {
+                'client': client,
+                'portfolios_created': portfolios_created,
+
+                # RBC Technical Data (for judges/technical demo)
+                'rbc_simulation_results': simulation_data,
+                'rbc_api_metadata': rbc_api_metadata,
+
+                # Kid-Friendly Data (for educational demo)
+                'kid_adventures': kid_adventures,
+
+                'client_id': client_id
+            },
+            'status_code': 200,
+            'message': f'Complete Investease setup completed for {client_data.get("name", "Unknown")}'
+        }
 
-        except Exception as e:
-            return self._handle_exception(e, "create_portfolio")
+    # Client bookkeeping
 
-    def simulate_client_portfolios(self, client_id, months=12):
+    def _track_client(self, client_id, result):
         """
-        Simulate all portfolios for a client using RBC Investease API
-        POST /client/{clientId}/simulate
+        Keep the state cache and email index in step with a client response:
+        refresh the cached state on success, drop it on failure and unindex
+        the client when the upstream says it is gone
         """
+        if result['success']:
+            self.client_state.put(client_id, result['data'])
+            return
+        self.client_state.invalidate(client_id)
+        if result['status_code'] == 404:
+            self.email_index.invalidate(client_id)
+
+    def _get_timestamp(self):
+        """Get formatted timestamp for API logging"""
+        from datetime import datetime
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+    def _parse_error(self, response):
+        """Parse error response from API"""
         try:
-            # Enhanced logging for hackathon demo - show RBC API integration
-            print(f"\n🏦 ===== RBC INVESTEASE SIMULATION API CALL =====")
-            print(
-                f"🔗 Endpoint: POST {self.base_url}/client/{client_id}/simulate")
-            print(f"🏢 Provider: RBC Investease Financial Services")
-            print(
-                f"📊 Simulating portfolios for client {client_id} over {months} months")
-            print(f"⏰ Timestamp: {self._get_timestamp()}")
+            error_data = response.json()
+            return error_data.get('message', str(error_data))
+        except json.JSONDecodeError:
+            return response.text or f"HTTP {response.status_code}"
 
-            payload = {
-                'months': min(months, 12)  # API limit is 12 months
+    def _handle_exception(self, exception, method_name):
+        """Handle exceptions consistently"""
+        if isinstance(exception, DeadlineExceeded):
+            return {
+                'success': False,
+                'error': 'Request deadline exceeded before Investease call',
+                'status_code': 504
+            }
+        elif isinstance(exception, CircuitOpen):
+            return {
+                'success': False,
+                'error': 'Investease API is unavailable (circuit open)',
+                'status_code': 503
+            }
+        elif isinstance(exception, self.timeout_errors):
+            return {
+                'success': False,
+                'error': 'Investease API request timed out',
+                'status_code': 408
+            }
+        elif isinstance(exception, self.connection_errors):
+            return {
+                'success': False,
+                'error': 'Failed to connect to Investease API',
+                'status_code': 503
+            }
+        else:
+            return {
+                'success': False,
+                'error': f'Error in {method_name}: {str(exception)}',
+                'status_code': 500
             }
 
-            print(f"📤 Request payload: {payload}")
-            print(f"🔑 Using JWT authentication for RBC API")
 
-            response = requests.post(
-                f"{self.base_url}/client/{client_id}/simulate",
-                json=payload,
-                headers=self.headers,
-                timeout=30
-            )
+class InvesteaseClient(InvesteaseClientBase):
+    timeout_errors = requests.exceptions.Timeout
+    connection_errors = requests.exceptions.ConnectionError
 
-            print(f"📥 RBC API Response: {response.status_code}")
+    def __init__(self, session=None, email_index=None, client_state=None, base_url=None,
+                 jwt_token=None):
+        super().__init__(base_url=base_url, jwt_token=jwt_token, email_index=email_index,
+                         client_state=client_state)
+        self.session = session if session is not None else create_session()
+        # Deduplicates concurrent list_clients calls and find-or-create per email
+        self.client_flight = SingleFlight()
+        # Shared by all registrations; each one keeps at most
+        # INVESTEASE_PORTFOLIO_CONCURRENCY portfolio calls in flight
+        self.portfolio_executor = ThreadPoolExecutor(
+            max_workers=Config.INVESTEASE_POOL_SIZE, thread_name_prefix='investease-portfolio')
 
-            if response.status_code == 200:
-                simulation_result = response.json()
-                results_count = len(simulation_result.get('results', []))
-                print(f"✅ RBC INVESTEASE SIMULATION COMPLETED SUCCESSFULLY")
-                print(
-                    f"📈 Retrieved simulation data for {results_count} portfolios")
-                print(f"💰 Real financial projections calculated by RBC systems")
-                print(f"🏦 ===============================================\n")
-
-                return {
-                    'success': True,
-                    'data': simulation_result,
-                    'status_code': response.status_code,
-                    'rbc_api_metadata': {
-                        'endpoint': f"POST /client/{client_id}/simulate",
-                        'provider': 'RBC Investease',
-                        'timestamp': self._get_timestamp(),
-                        'portfolios_simulated': results_count,
-                        'simulation_months': months
-                    }
-                }
-            else:
-                error_data = self._parse_error(response)
-                print(f"❌ RBC Portfolio simulation failed: {error_data}")
-                print(f"🏦 ===============================================\n")
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
+    def create_client(self, client_data):
+        """
+        Create a new client in Investease API
+        POST /clients
+        """
+        api_payload = self._client_payload(client_data)
+        if not self.jwt_token:
+            return self._missing_token()
+        result = self._call('POST', '/clients', 'create_client',
+                            ok_statuses=(200, 201), json=api_payload)
+        return self._client_created(result, api_payload)
 
-        except Exception as e:
-            print(f"❌ Exception during RBC API simulation call: {str(e)}")
-            print(f"🏦 ===============================================\n")
-            return self._handle_exception(e, "simulate_client_portfolios")
+    def create_portfolio(self, client_id, portfolio_type="balanced", initial_amount=1000):
+        """
+        Create a portfolio for a client
+        POST /clients/{clientId}/portfolios
+        Available types: aggressive_growth, growth, balanced, conservative, very_conservative
+        """
+        payload = self._portfolio_payload(client_id, portfolio_type, initial_amount)
+        result = self._call('POST', f"/clients/{client_id}/portfolios", 'create_portfolio',
+                            ok_statuses=(200, 201), json=payload)
+        return self._portfolio_created(client_id, result, portfolio_type, initial_amount)
+
+    def simulate_client_portfolios(self, client_id, months=12):
+        """
+        Simulate all portfolios for a client using RBC Investease API
+        POST /client/{clientId}/simulate
+        """
+        payload = self._simulation_payload(client_id, months)
+        result = self._call('POST', f"/client/{client_id}/simulate", 'simulate', json=payload)
+        return self._simulated(client_id, months, result)
 
     def list_clients(self):
         """
         List all clients in the team
         GET /clients
         """
-        try:
-            response = requests.get(
-                f"{self.base_url}/clients",
-                headers=self.headers,
-                timeout=30
-            )
+        return self.client_flight.do('list_clients', self._list_clients)
 
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json(),
-                    'status_code': response.status_code
-                }
-            else:
-                error_data = self._parse_error(response)
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
-
-        except Exception as e:
-            return self._handle_exception(e, "list_clients")
+    def _list_clients(self):
+        return self._clients_listed(self._call('GET', '/clients', 'list_clients'))
 
     def find_client_by_email(self, email):
         """
         Find an existing client by email address
+        The index gives the id; the client itself (and its current cash) comes
+        from the state cache or GET /clients/{clientId}
         Returns the client data if found, None if not found
         """
         try:
-            print(f"🔍 Looking for existing client with email: {email}")
-
-            clients_response = self.list_clients()
-            if not clients_response['success']:
-                print(
-                    f"❌ Failed to list clients: {clients_response.get('error', 'Unknown error')}")
-                return None
-
-            clients = clients_response['data']
-
-            # Handle both list format and object format responses
-            if isinstance(clients, dict) and 'clients' in clients:
-                clients = clients['clients']
-            elif isinstance(clients, dict) and 'data' in clients:
-                clients = clients['data']
-
-            if not isinstance(clients, list):
-                print(
-                    f"⚠️ Unexpected clients response format: {type(clients)}")
-                return None
-
-            for client in clients:
-                if client.get('email') == email:
-                    print(
-                        f"✅ Found existing client: {client.get('name', 'Unknown')} (ID: {client.get('id')})")
-                    return client
-
-            print(f"📭 No existing client found with email: {email}")
-            return None
-
+            client_id, needs_sync = self._indexed_client_id(email)
+            if needs_sync:
+                # Index is cold or stale: fall back to a full sync
+                client_id = self._client_id_after_sync(email, self.list_clients())
+            client_result = self.get_client(client_id) if client_id is not None else None
+            return self._found_client(email, client_result)
         except Exception as e:
             print(f"❌ Error searching for client by email: {str(e)}")
             return None
 
-    def get_client(self, client_id):
+    def get_client(self, client_id, use_cache=True):
         """
         Get client details with portfolios
         GET /clients/{clientId}
+        Served from the client state cache when a recent write left it there
         """
-        try:
-            response = requests.get(
-                f"{self.base_url}/clients/{client_id}",
-                headers=self.headers,
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json(),
-                    'status_code': response.status_code
-                }
-            else:
-                error_data = self._parse_error(response)
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
-
-        except Exception as e:
-            return self._handle_exception(e, "get_client")
+        cached = self._cached_client(client_id) if use_cache else None
+        if cached is not None:
+            return cached
+        result = self._call('GET', f"/clients/{client_id}", 'get_client')
+        self._track_client(client_id, result)
+        return result
 
     def update_client_cash(self, client_id, new_cash_amount):
         """
         Update client's cash amount
         PUT /clients/{clientId}
         """
-        try:
-            print(f"💰 Updating client {client_id} cash to ${new_cash_amount}")
-
-            payload = {
-                'cash': new_cash_amount
-            }
-
-            response = requests.put(
-                f"{self.base_url}/clients/{client_id}",
-                json=payload,
-                headers=self.headers,
-                timeout=30
-            )
-
-            print(f"Update client cash response: {response.status_code}")
-
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json(),
-                    'status_code': response.status_code
-                }
-            else:
-                error_data = self._parse_error(response)
-                print(f"❌ Client cash update failed: {error_data}")
-                return {
-                    'success': False,
-                    'error': error_data,
-                    'status_code': response.status_code
-                }
-
-        except Exception as e:
-            return self._handle_exception(e, "update_client_cash")
+        payload = self._cash_payload(client_id, new_cash_amount)
+        result = self._call('PUT', f"/clients/{client_id}", 'update_client', json=payload)
+        self._track_client(client_id, result)
+        if not result['success']:
+            print(f"❌ Client cash update failed: {result['error']}")
+        return result
+
+    def create_portfolios(self, client_id, portfolio_configs):
+        """
+        Create several portfolios concurrently, at most
+        INVESTEASE_PORTFOLIO_CONCURRENCY at a time
+        Returns one create_portfolio result per config, in config order
+        """
+        slots = threading.BoundedSemaphore(max(1, Config.INVESTEASE_PORTFOLIO_CONCURRENCY))
+        futures = []
+        for config in portfolio_configs:
+            slots.acquire()
+            # Copy the context per call so the request deadline follows it
+            future = self.portfolio_executor.submit(
+                contextvars.copy_context().run,
+                self.create_portfolio, client_id, config['type'], config['amount'])
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def find_or_create_client(self, client_data):
+        """
+        Reuse the existing client for client_data's email (topping up its
+        cash if needed) or create a new one; returns the usual result dict
+        """
+        email = client_data.get('email')
+        client_info = self.find_client_by_email(email) if email else None
+
+        if client_info:
+            new_cash = self._cash_top_up(client_info, client_data)
+            if new_cash is not None:
+                client_info = self._topped_up_client(
+                    client_info, self.update_client_cash(client_info['id'], new_cash))
+
+        if not client_info:
+            print(f"➕ Creating new client...")
+            return self._client_ready(self.create_client(client_data))
+
+        return {
+            'success': True,
+            'data': client_info,
+            'status_code': 200
+        }
 
-    def create_complete_client_with_portfolios(self, client_data, portfolio_configs=None):
+    def create_complete_client_with_portfolios(self, client_data, portfolio_configs=None, room=None):
         """
         Complete pipeline: Find existing client OR create new + portfolios + simulate
         This method now checks for existing clients by email to avoid duplicates
+        room: Socket.IO room that receives the kid adventures as they stream
         """
         try:
             print(f"=== COMPLETE INVESTEASE CLIENT PIPELINE ===")
             print(
                 f"Processing client: {client_data.get('name', 'Unknown')} ({client_data.get('email', 'no-email')})")
 
-            # Step 1: Check for existing client by email
+            # Step 1: Reuse the client for this email or create one; concurrent
+            # registrations for the same email share a single lookup/creation
             email = client_data.get('email')
-            existing_client = None
-            client_id = None
-
-            if email:
-                existing_client = self.find_client_by_email(email)
-
-            if existing_client:
-                # Use existing client
-                client_id = existing_client['id']
-                client_info = existing_client
-                print(f"🔄 Reusing existing client with ID: {client_id}")
-
-                # Update client cash if needed for demo purposes
-                new_cash = client_data.get(
-                    'cash', client_data.get('cashAmount', 1000))
-                current_cash = client_info.get('cash', 0)
-                if new_cash > current_cash:
-                    print(
-                        f"💰 Updating client cash from ${current_cash} to ${new_cash} for demo")
-                    update_result = self.update_client_cash(
-                        client_id, new_cash)
-                    if update_result['success']:
-                        client_info = update_result['data']
-                        print(f"✅ Client cash updated successfully")
-                    else:
-                        print(
-                            f"⚠️ Failed to update client cash: {update_result['error']}")
-            else:
-                # Create new client
-                print(f"➕ Creating new client...")
-                client_result = self.create_client(client_data)
-                if not client_result['success']:
-                    return client_result
-
-                client_info = client_result['data']
-                client_id = client_info['id']
-                print(f"✅ New client created with ID: {client_id}")
+            with REGISTRATION_STEP_SECONDS.time('find_or_create'):
+                if email:
+                    client_result = self.client_flight.do(
+                        ('client', email), lambda: self.find_or_create_client(client_data))
+                else:
+                    client_result = self.find_or_create_client(client_data)
+            if not client_result['success']:
+                return client_result
+            client_info = client_result['data']
+            client_id = client_info['id']
 
             # Step 2: Create portfolios based on user data or defaults
-            if portfolio_configs is None:
-                # Get available cash from the actual client (after potential update)
-                available_cash = client_info.get(
-                    'cash', 5000)  # Higher default for demo
-                requested_cash = client_data.get(
-                    'cash', client_data.get('cashAmount', 1000))
-
-                print(
-                    f"💰 Available cash: ${available_cash}, Requested: ${requested_cash}")
-
-                # For demo purposes, use smaller amounts if cash update failed
-                if available_cash < 100:
-                    print(
-                        f"⚠️ Using minimal portfolio amounts due to low cash (${available_cash})")
-                    # Create minimal portfolios that fit available cash
-                    if available_cash >= 10:
-                        portfolio_configs = [
-                            {'type': 'conservative', 'amount': max(
-                                1, int(available_cash * 0.6))},  # 60%
-                            {'type': 'balanced', 'amount': max(
-                                1, int(available_cash * 0.4))}       # 40%
-                        ]
-                    else:
-                        portfolio_configs = [
-                            {'type': 'conservative', 'amount': max(
-                                1, available_cash)}  # Use all available
-                        ]
-                else:
-                    # Use requested amounts
-                    total_cash = requested_cash
-                    portfolio_configs = [
-                        {'type': 'conservative', 'amount': int(
-                            total_cash * 0.5)},  # 50% conservative
-                        {'type': 'balanced', 'amount': int(
-                            total_cash * 0.3)},     # 30% balanced
-                        {'type': 'growth', 'amount': int(
-                            total_cash * 0.2)}        # 20% growth
-                    ]
-
-            portfolios_created = []
-            for config in portfolio_configs:
-                if config['amount'] > 0:  # Only create if amount > 0
-                    portfolio_result = self.create_portfolio(
-                        client_id,
-                        config['type'],
-                        config['amount']
-                    )
-                    if portfolio_result['success']:
-                        portfolios_created.append(portfolio_result['data'])
-                        print(
-                            f"✅ {config['type']} portfolio created: ${config['amount']}")
-                    else:
-                        print(
-                            f"❌ Failed to create {config['type']} portfolio: {portfolio_result['error']}")
+            portfolio_configs = self._portfolio_plan(client_info, client_data, portfolio_configs)
+            with REGISTRATION_STEP_SECONDS.time('portfolios'):
+                portfolio_results = self.create_portfolios(client_id, portfolio_configs)
+            portfolios_created = self._created_portfolios(portfolio_configs, portfolio_results)
 
             # Step 3: Simulate portfolios using RBC Investease API
-            simulation_result = self.simulate_client_portfolios(
-                client_id, months=12)
-            simulation_data = None
-            rbc_api_metadata = None
-            if simulation_result['success']:
-                simulation_data = simulation_result['data']
-                rbc_api_metadata = simulation_result.get('rbc_api_metadata')
-                print(f"✅ RBC Portfolio simulation completed successfully")
-            else:
-                print(
-                    f"❌ RBC Portfolio simulation failed: {simulation_result['error']}")
+            with REGISTRATION_STEP_SECONDS.time('simulate'):
+                simulation_result = self.simulate_client_portfolios(
+                    client_id, months=12)
+            simulation_data, rbc_api_metadata = self._simulation_outcome(simulation_result)
 
             # Step 4: Translate RBC simulation to kid-friendly adventures (if simulation succeeded)
-            kid_adventures = None
-            if simulation_data and client_data:
-                try:
-                    from src.services.data_transformer import DataTransformer
-                    translator = DataTransformer()
-                    kid_adventures = translator.translate_rbc_simulation_to_kid_adventures(
-                        simulation_data, client_data
-                    )
-                    print(f"🎨 Successfully translated RBC data to kid adventures")
-                except Exception as e:
-                    print(f"⚠️ Could not translate to kid adventures: {e}")
-                    kid_adventures = None
-
-            # Step 5: Get updated client info with portfolios
-            updated_client_result = self.get_client(client_id)
-            final_client_data = updated_client_result['data'] if updated_client_result['success'] else client_info
+            with REGISTRATION_STEP_SECONDS.time('adventures'):
+                kid_adventures = self._kid_adventures(simulation_data, client_data, room)
 
-            return {
-                'success': True,
-                'data': {
-                    'client': final_client_data,
-                    'portfolios_created': portfolios_created,
-
-                    # RBC Technical Data (for judges/technical demo)
-                    'rbc_simulation_results': simulation_data,
-                    'rbc_api_metadata': rbc_api_metadata,
-
-                    # Kid-Friendly Data (for educational demo)
-                    'kid_adventures': kid_adventures,
+            # Step 5: Get updated client info with portfolios (no upstream call
+            # when this registration's own writes already produced it)
+            with REGISTRATION_STEP_SECONDS.time('get_client'):
+                updated_client_result = self.get_client(client_id)
+            final_client_data = updated_client_result['data'] if updated_client_result['success'] else client_info
 
-                    'client_id': client_id
-                },
-                'status_code': 200,
-                'message': f'Complete Investease setup completed for {client_data.get("name", "Unknown")}'
-            }
+            return self._registration_result(client_data, client_id, final_client_data,
+                                             portfolios_created, simulation_data,
+                                             rbc_api_metadata, kid_adventures)
 
         except Exception as e:
             return self._handle_exception(e, "create_complete_client_with_portfolios")
 
-    def _get_timestamp(self):
-        """Get formatted timestamp for API logging"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-
-    def _parse_error(self, response):
-        """Parse error response from API"""
+    def _call(self, method, path, endpoint, ok_statuses=(200,), **kwargs):
+        """Send a request and wrap it in the usual {success, data|error, status_code} dict"""
         try:
-            error_data = response.json()
-            return error_data.get('message', str(error_data))
-        except json.JSONDecodeError:
-            return response.text or f"HTTP {response.status_code}"
+            return self._result(self._request(method, path, endpoint, **kwargs), ok_statuses)
+        except Exception as e:
+            return self._handle_exception(e, endpoint)
 
-    def _handle_exception(self, exception, method_name):
-        """Handle exceptions consistently"""
-        if isinstance(exception, requests.exceptions.Timeout):
-            return {
-                'success': False,
-                'error': 'Investease API request timed out',
-                'status_code': 408
-            }
-        elif isinstance(exception, requests.exceptions.ConnectionError):
-            return {
-                'success': False,
-                'error': 'Failed to connect to Investease API',
-                'status_code': 503
-            }
-        else:
-            return {
-                'success': False,
-                'error': f'Error in {method_name}: {str(exception)}',
-                'status_code': 500
-            }
+    def _request(self, method, path, endpoint, **kwargs):
+        """
+        Send a request over the pooled session with the endpoint's timeouts,
+        capped by the request deadline; 5xx answers and transport errors
+        count against the circuit breaker
+        """
+        started = time.perf_counter()
+        try:
+            timeout, ignore = deadline_timeouts(
+                requests.exceptions.Timeout,
+                Config.INVESTEASE_CONNECT_TIMEOUT, Config.INVESTEASE_ENDPOINT_TIMEOUTS[endpoint])
+            response = self.breaker.call(
+                lambda: self.session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    headers=self.headers,
+                    timeout=timeout,
+                    **kwargs
+                ),
+                is_failure=lambda response: response.status_code >= 500,
+                ignore=ignore)
+        except Exception as e:
+            observe_upstream('investease', endpoint, upstream_status(e), started)
+            raise
+        observe_upstream('investease', endpoint, response.status_code, started)
+        return response
 
 
-# Global instance
-investease_client = InvesteaseClient()
+# Global instances; the email index and state cache are shared with the async client
+client_email_index = create_client_email_index()
+client_state_cache = create_client_state_cache()
+investease_client = InvesteaseClient(email_index=client_email_index, client_state=client_state_cache)
 
 # Main function for timeline service integration
 
 
-def register_client_with_investease(client_data):
+def register_client_with_investease(client_data, room=None):
     """
     Complete Investease client creation with portfolios and simulation
     This matches the original function signature but now uses the full API
+    INVESTEASE_ASYNC=true routes it through the asyncio client instead
     """
-    return investease_client.create_complete_client_with_portfolios(client_data)
+    if Config.INVESTEASE_ASYNC:
+        from src.services import async_investease_client
+        return async_investease_client.register_client_with_investease(client_data, room=room)
+    return investease_client.create_complete_client_with_portfolios(client_data, room=room)
@@ -0,0 +1,155 @@
+"""
+Bounded background job queue for long-running requests
+POST handlers enqueue work and answer 202 right away; a fixed pool of worker
+threads drains the queue. When the queue is full, submit() raises
+JobQueueFull so the route can shed load instead of piling up threads.
+Finished jobs are kept (up to a retention limit) for polling.
+"""
+from collections import OrderedDict
+from datetime import datetime
+import queue
+import threading
+import uuid
+
+from src.config import Config
+from src.services.realtime import emit_to_room
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue is at JOB_QUEUE_DEPTH"""
+
+
+class Job:
+    def __init__(self, fn, room=None):
+        self.id = str(uuid.uuid4())
+        self.fn = fn
+        self.room = room
+        self.status = 'queued'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        data = {
+            'jobId': self.id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at
+        }
+        if self.status == 'succeeded':
+            data['result'] = self.result
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Usage:
+        job = job_queue.submit(lambda progress: ..., room=sid)
+    The job function receives progress(step, status); every call is emitted
+    as a 'job-progress' event to the job's id room and its optional room.
+    """
+
+    def __init__(self, workers=4, depth=100, retention=1000):
+        self.workers = workers
+        self.retention = retention
+        self._queue = queue.Queue(maxsize=depth)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, fn, room=None):
+        """Enqueue fn(progress); raises JobQueueFull when the queue is at capacity"""
+        self._ensure_workers()
+        job = Job(fn, room=room)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise JobQueueFull(f'Job queue is full ({self._queue.maxsize} waiting)')
+        self._emit(job, 'job-queued', {})
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'workers': self.workers,
+            'depth': self._queue.maxsize,
+            'queued': self._queue.qsize(),
+            'running': statuses.count('running'),
+            'tracked': len(statuses)
+        }
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        self._emit(job, 'job-progress', {'step': 'job', 'status': 'started'})
+
+        def progress(step, status):
+            job.progress[step] = status
+            self._emit(job, 'job-progress', {'step': step, 'status': status})
+
+        try:
+            job.result = job.fn(progress)
+            job.status = 'succeeded'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        job.fn = None
+        job.finished_at = datetime.now().isoformat()
+        self._emit(job, 'job-complete', job.to_dict())
+
+    def _emit(self, job, event, data):
+        payload = dict(data, jobId=job.id)
+        emit_to_room(event, payload, job.id)
+        if job.room:
+            emit_to_room(event, payload, job.room)
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond the retention limit"""
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+
+# Global instance
+job_queue = JobQueue(workers=Config.JOB_WORKERS, depth=Config.JOB_QUEUE_DEPTH,
+                     retention=Config.JOB_RETENTION)
@@ -0,0 +1,111 @@
+"""
+Readable text from a streamed JSON document
+Cohere streams the adventure JSON token by token ('{"adv', 'enture_name": "Em'),
+which a client can't show as a story. JSONTextStream follows the document as
+chunks arrive and hands back only the decoded string values of chosen keys,
+so 'adventure-chunk' events carry text a kid can read while it's generated.
+"""
+
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONTextStream:
+    """
+    Incremental extractor for string values in a JSON document
+    feed(chunk) returns [(key, text), ...] for the string values (including
+    strings inside arrays) under one of `fields`; fields=None keeps every
+    value. Text outside the document (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = set(fields) if fields is not None else None
+        # One frame per open container: {'object', 'key', 'expectKey'}
+        self._stack = []
+        self._in_string = False
+        self._is_key = False
+        self._key_chars = []
+        self._field = None
+        self._escape = None
+        self._high_surrogate = None
+
+    def feed(self, chunk):
+        """Decoded text from this chunk, merged per key"""
+        pieces = []
+        for char in chunk:
+            if self._in_string:
+                text = self._string_char(char)
+            else:
+                text = self._structure_char(char)
+            if text and self._field is not None:
+                if pieces and pieces[-1][0] == self._field:
+                    pieces[-1] = (self._field, pieces[-1][1] + text)
+                else:
+                    pieces.append((self._field, text))
+        return pieces
+
+    def _structure_char(self, char):
+        top = self._stack[-1] if self._stack else None
+        if char == '"':
+            self._in_string = True
+            self._is_key = top is not None and top['object'] and top['expectKey']
+            self._key_chars = []
+            key = top['key'] if top is not None and not self._is_key else None
+            wanted = self.fields is None or key in self.fields
+            self._field = key if key is not None and wanted else None
+        elif char == '{':
+            self._stack.append({'object': True, 'key': None, 'expectKey': True})
+        elif char == '[':
+            # Strings in an array belong to the key that holds the array
+            key = top['key'] if top is not None else None
+            self._stack.append({'object': False, 'key': key, 'expectKey': False})
+        elif char in '}]':
+            if self._stack:
+                self._stack.pop()
+        elif char == ':' and top is not None and top['object']:
+            top['expectKey'] = False
+        elif char == ',' and top is not None and top['object']:
+            top['expectKey'] = True
+        return ''
+
+    def _string_char(self, char):
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[0] != 'u':
+                text = ESCAPES.get(char, char)
+            elif len(self._escape) < 5:
+                return ''
+            else:
+                text = self._code_point(self._escape[1:])
+            self._escape = None
+        elif char == '\\':
+            self._escape = ''
+            return ''
+        elif char == '"':
+            self._in_string = False
+            if self._is_key:
+                self._stack[-1]['key'] = ''.join(self._key_chars)
+            self._field = None
+            return ''
+        else:
+            text = char
+
+        if self._is_key:
+            self._key_chars.append(text)
+            return ''
+        return text
+
+    def _code_point(self, digits):
+        """\\uXXXX escapes, joining surrogate pairs (emoji) into one character"""
+        try:
+            code = int(digits, 16)
+        except ValueError:
+            return ''
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return ''
+        high, self._high_surrogate = self._high_surrogate, None
+        if 0xDC00 <= code < 0xE000:
+            if high is None:
+                return ''
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return chr(code)
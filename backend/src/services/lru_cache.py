@@ -0,0 +1,110 @@
+"""
+Thread-safe LRU cache with optional TTL
+Shared by the simulation, Cohere generation and Investease client state
+caches. Values are copied on the way in and out, so callers can't mutate
+cached entries; every counter is updated under the cache's lock.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+_MISSING = object()
+
+
+def _clone(value):
+    """Copy JSON-like values so callers can't mutate cached entries"""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+class LRUCache:
+    """
+    LRU cache with optional TTL and hit/miss counters
+    maxsize=0 disables caching; ttl=0 keeps entries until evicted by size
+    """
+
+    def __init__(self, maxsize=4096, ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        value = self._lookup(key)
+        return None if value is _MISSING else _clone(value)
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (_clone(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return _clone(value)
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def discard(self, key):
+        """Drop one entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _lookup(self, key):
+        if not self.enabled:
+            return _MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
@@ -3,16 +3,154 @@ Simple seeded market divergence simulator.
 Input: baseSeed (string) and decision tags.
 Output: small state object containing `wealthMultiplier` and events.
 
+simulate_timelines / simulate_timeline_arrays run the same simulation for many
+seeds at once with NumPy and return results identical to simulate_timeline.
+simulate_distribution samples many possible paths for one timeline and
+summarizes the spread of outcomes. simulate_wealth_curve expands a timeline
+into a month-by-month wealth path stored as a NumPy array.
+
 This is a mock. Replace with real market data engine by calling a market API.
 """
 
 import hashlib
 import random
 
+import numpy as np
+
+from src.services.bias_rules import BiasRuleEngine
+
+# Event stream shape: 3-5 events, each drawing (chance, impact)
+MIN_EVENTS = 3
+MAX_EVENTS = 5
+DRAWS_PER_TIMELINE = 2 + 2 * MAX_EVENTS
+
+EVENT_TYPES = ('windfall', 'expense', 'growth')
+EVENT_TEXT = {
+    'windfall': 'Small windfall from side project',
+    'expense': 'Unexpected expense',
+    'growth': 'Long-term growth'
+}
+
+MIN_MULTIPLIER = 0.2
+MAX_MULTIPLIER = 3.0
+
+# Choice biases come from the data-driven rule table (bias_rules.json)
+default_bias_rules = BiasRuleEngine()
+
+# Seeds are processed in chunks to keep the (624 x chunk) MT state small
+BATCH_CHUNK_SIZE = 8192
+
 def seeded_random(seed):
-    """Deterministic pseudo-random generator based on seed"""
-    random.seed(seed)
-    return random.random
+    """Deterministic pseudo-random generator based on seed (private instance, global RNG untouched)"""
+    return random.Random(seed).random
+
+def _numeric_seed(seed, choices):
+    """Derive the 32-bit generator seed from the timeline seed and choices"""
+    combined_seed = seed + '|'.join(choices)
+    hash_object = hashlib.sha256(combined_seed.encode())
+    return int(hash_object.hexdigest()[:8], 16)
+
+class SimulatorEngine:
+    """
+    Timeline simulator that gives every call its own generator
+    Nothing touches the global `random` state, so one engine can be shared
+    by request threads and worker pools and still return reproducible results
+    """
+
+    def __init__(self, bias_rules=None):
+        self.bias_rules = bias_rules or default_bias_rules
+
+    def generator(self, numeric_seed):
+        """Private generator for a single simulation"""
+        return random.Random(numeric_seed)
+
+    def simulate(self, seed, choices=None):
+        """Scalar simulation for one seed (see simulate_timeline)"""
+        if choices is None:
+            choices = []
+
+        # Create a deterministic seed
+        numeric_seed = _numeric_seed(seed, choices)
+
+        rnd = self.generator(numeric_seed).random
+
+        # base multiplier between 0.6 and 1.6
+        base = 0.6 + rnd() * 1.0
+
+        # apply biases: certain choices increase/decrease multiplier
+        bias = self.bias_rules.bias(choices)
+
+        # create simple event stream
+        events = []
+        n = MIN_EVENTS + int(rnd() * 3)
+        for i in range(n):
+            chance = rnd()
+            if chance < 0.3:
+                events.append({
+                    'type': 'windfall',
+                    'text': EVENT_TEXT['windfall'],
+                    'impact': 0.1 * rnd()
+                })
+            elif chance < 0.6:
+                events.append({
+                    'type': 'expense',
+                    'text': EVENT_TEXT['expense'],
+                    'impact': -0.08 * rnd()
+                })
+            else:
+                events.append({
+                    'type': 'growth',
+                    'text': EVENT_TEXT['growth'],
+                    'impact': 0.05 * rnd()
+                })
+
+        # compute final multiplier
+        multiplier = base * bias
+        # apply events
+        for event in events:
+            multiplier += event['impact']
+
+        # clamp
+        if multiplier < MIN_MULTIPLIER:
+            multiplier = MIN_MULTIPLIER
+        if multiplier > MAX_MULTIPLIER:
+            multiplier = MAX_MULTIPLIER
+
+        # emotional score: lower multiplier -> worse outcome
+        emotional = max(0, min(1, (multiplier - MIN_MULTIPLIER) / (MAX_MULTIPLIER - MIN_MULTIPLIER)))
+
+        return {
+            'multiplier': round(multiplier, 3),
+            'events': events,
+            'emotional': emotional,
+            'seed': seed
+        }
+
+    def simulate_many(self, seeds, choices_list=None):
+        """Vectorized simulation for many seeds (see simulate_timelines)"""
+        return simulate_timelines(seeds, choices_list, rules=self.bias_rules.current)
+
+    def distribution(self, seed, choices=None, paths=None, bins=None):
+        """Monte Carlo outcome distribution (see simulate_distribution)"""
+        return simulate_distribution(
+            seed, choices,
+            paths=DEFAULT_DISTRIBUTION_PATHS if paths is None else paths,
+            bins=DEFAULT_HISTOGRAM_BINS if bins is None else bins,
+            rules=self.bias_rules.current)
+
+    def wealth_curve(self, seed, choices=None, months=None, steps_per_month=1, simulation=None):
+        """Month-by-month wealth path (see simulate_wealth_curve)"""
+        if simulation is None:
+            simulation = self.simulate(seed, choices)
+        return simulate_wealth_curve(
+            seed, choices,
+            months=DEFAULT_SIMULATION_MONTHS if months is None else months,
+            steps_per_month=steps_per_month,
+            simulation=simulation)
+
+
+default_engine = SimulatorEngine()
+
 
 def simulate_timeline(seed, choices=None):
     """
@@ -20,76 +158,362 @@ def simulate_timeline(seed, choices=None):
     @param {string} seed - unique timeline seed (id + choices)
     @param {list} choices - user decisions that bias divergence
     """
-    if choices is None:
-        choices = []
-    
-    # Create a deterministic seed
-    combined_seed = seed + '|'.join(choices)
-    hash_object = hashlib.sha256(combined_seed.encode())
-    numeric_seed = int(hash_object.hexdigest()[:8], 16)
-    
-    rnd = seeded_random(numeric_seed)
-    
-    # base multiplier between 0.6 and 1.6
-    base = 0.6 + rnd() * 1.0
-
-    # apply biases: certain choices increase/decrease multiplier
-    bias = 1.0
-    for choice in choices:
-        lc = choice.lower()
-        if 'save' in lc:
-            bias += 0.15
-        if 'invest' in lc:
-            bias += 0.2
-        if 'spend' in lc:
-            bias -= 0.2
-        if 'lemonade' in lc or 'side' in lc:
-            bias += 0.05
-        if 'pokemon' in lc:
-            bias -= 0.05
-
-    # create simple event stream
-    events = []
-    n = 3 + int(rnd() * 3)
-    for i in range(n):
-        chance = rnd()
-        if chance < 0.3:
-            events.append({
-                'type': 'windfall', 
-                'text': 'Small windfall from side project', 
-                'impact': 0.1 * rnd()
-            })
-        elif chance < 0.6:
-            events.append({
-                'type': 'expense', 
-                'text': 'Unexpected expense', 
-                'impact': -0.08 * rnd()
-            })
-        else:
+    return default_engine.simulate(seed, choices)
+
+
+# --- Vectorized batch engine -------------------------------------------------
+#
+# The scalar simulator seeds Python's Mersenne Twister with a 32-bit integer.
+# To reproduce those exact draws for many seeds at once we run MT19937's
+# init_by_array seeding and the first twist step across a whole column of
+# seeds with NumPy, then temper and combine words the same way random.random()
+# does. Every timeline needs at most DRAWS_PER_TIMELINE doubles, which only
+# touch the first few state words, so the full 624-word twist is never needed.
+
+_MT_N = 624
+_MT_M = 397
+
+
+def _mt19937_genrand_init():
+    """State after init_genrand(19650218); shared by every seed"""
+    state = np.empty(_MT_N, dtype=np.uint32)
+    state[0] = 19650218
+    for i in range(1, _MT_N):
+        prev = int(state[i - 1])
+        state[i] = (1812433253 * (prev ^ (prev >> 30)) + i) & 0xffffffff
+    return state
+
+
+_MT_GENRAND_INIT = _mt19937_genrand_init()
+
+
+def _mt19937_doubles(numeric_seeds, count):
+    """
+    First `count` random.random() values for each 32-bit seed
+    Returns an array of shape (len(numeric_seeds), count)
+    """
+    keys = np.asarray(numeric_seeds, dtype=np.uint32)
+    n = keys.shape[0]
+    mt = np.empty((_MT_N, n), dtype=np.uint32)
+    mt[:] = _MT_GENRAND_INIT[:, None]
+    tmp = np.empty(n, dtype=np.uint32)
+
+    # init_by_array(key=[seed]): two mixing passes over the state
+    i = 1
+    for _ in range(_MT_N):
+        prev = mt[i - 1]
+        np.right_shift(prev, 30, out=tmp)
+        np.bitwise_xor(tmp, prev, out=tmp)
+        np.multiply(tmp, np.uint32(1664525), out=tmp)
+        np.bitwise_xor(mt[i], tmp, out=mt[i])
+        np.add(mt[i], keys, out=mt[i])
+        i += 1
+        if i >= _MT_N:
+            mt[0] = mt[_MT_N - 1]
+            i = 1
+    for _ in range(_MT_N - 1):
+        prev = mt[i - 1]
+        np.right_shift(prev, 30, out=tmp)
+        np.bitwise_xor(tmp, prev, out=tmp)
+        np.multiply(tmp, np.uint32(1566083941), out=tmp)
+        np.bitwise_xor(mt[i], tmp, out=mt[i])
+        np.subtract(mt[i], np.uint32(i), out=mt[i])
+        i += 1
+        if i >= _MT_N:
+            mt[0] = mt[_MT_N - 1]
+            i = 1
+    mt[0] = 0x80000000
+
+    # First twist for the words we consume, then temper
+    words = 2 * count
+    y = (mt[:words] & np.uint32(0x80000000)) | (mt[1:words + 1] & np.uint32(0x7fffffff))
+    v = mt[_MT_M:_MT_M + words] ^ (y >> np.uint32(1))
+    v ^= (y & np.uint32(1)) * np.uint32(0x9908b0df)
+    v ^= v >> np.uint32(11)
+    v ^= (v << np.uint32(7)) & np.uint32(0x9d2c5680)
+    v ^= (v << np.uint32(15)) & np.uint32(0xefc60000)
+    v ^= v >> np.uint32(18)
+
+    # random.random(): 53-bit double from two 32-bit words
+    a = (v[0::2] >> np.uint32(5)).astype(np.float64)
+    b = (v[1::2] >> np.uint32(6)).astype(np.float64)
+    return ((a * 67108864.0 + b) * (1.0 / 9007199254740992.0)).T
+
+
+def _event_arrays(chance, value, event_count):
+    """Event types (-1 = no event) and impacts for (N, MAX_EVENTS) draws"""
+    active = np.arange(MAX_EVENTS) < event_count[:, None]
+    event_type = np.where(chance < 0.3, 0, np.where(chance < 0.6, 1, 2))
+    event_impact = np.where(chance < 0.3, 0.1 * value,
+                            np.where(chance < 0.6, -0.08 * value, 0.05 * value))
+    event_type = np.where(active, event_type, -1)
+    event_impact = np.where(active, event_impact, 0.0)
+    return event_type, event_impact
+
+
+def simulate_timeline_arrays(seeds, choices_list=None, rules=None):
+    """
+    Vectorized simulate_timeline for many seeds at once
+    @param {list} seeds - timeline seeds
+    @param {list} choices_list - one choices list per seed (defaults to no choices)
+    @param {CompiledBiasRules} rules - bias rule set (defaults to the active one)
+    Returns a dict of NumPy arrays:
+      multiplier (N,), emotional (N,), event_count (N,),
+      event_type (N, MAX_EVENTS) as indexes into EVENT_TYPES (-1 = no event),
+      event_impact (N, MAX_EVENTS)
+    """
+    seeds = list(seeds)
+    if choices_list is None:
+        choices_list = [[]] * len(seeds)
+    else:
+        choices_list = list(choices_list)
+        if len(choices_list) != len(seeds):
+            raise ValueError('choices_list must have one entry per seed')
+
+    if rules is None:
+        rules = default_bias_rules.current
+
+    n = len(seeds)
+    numeric_seeds = np.empty(n, dtype=np.uint32)
+    bias = np.empty(n, dtype=np.float64)
+    bias_by_choices = {}
+    for idx, (seed, choices) in enumerate(zip(seeds, choices_list)):
+        choices = choices or []
+        numeric_seeds[idx] = _numeric_seed(seed, choices)
+        key = tuple(choices)
+        value = bias_by_choices.get(key)
+        if value is None:
+            value = bias_by_choices[key] = rules.bias(choices)
+        bias[idx] = value
+
+    draws = np.empty((n, DRAWS_PER_TIMELINE), dtype=np.float64)
+    for start in range(0, n, BATCH_CHUNK_SIZE):
+        stop = min(start + BATCH_CHUNK_SIZE, n)
+        draws[start:stop] = _mt19937_doubles(numeric_seeds[start:stop], DRAWS_PER_TIMELINE)
+
+    base = 0.6 + draws[:, 0] * 1.0
+    event_count = MIN_EVENTS + (draws[:, 1] * 3).astype(np.int64)
+
+    event_type, event_impact = _event_arrays(draws[:, 2::2], draws[:, 3::2], event_count)
+
+    # Events are added one at a time so sums match the scalar loop bit for bit
+    multiplier = base * bias
+    for e in range(MAX_EVENTS):
+        multiplier = multiplier + event_impact[:, e]
+    multiplier = np.clip(multiplier, MIN_MULTIPLIER, MAX_MULTIPLIER)
+
+    emotional = np.clip((multiplier - MIN_MULTIPLIER) / (MAX_MULTIPLIER - MIN_MULTIPLIER), 0, 1)
+
+    return {
+        'multiplier': multiplier,
+        'emotional': emotional,
+        'event_count': event_count,
+        'event_type': event_type,
+        'event_impact': event_impact
+    }
+
+
+def simulate_timelines(seeds, choices_list=None, rules=None):
+    """
+    Batch simulateTimeline
+    Same output as calling simulate_timeline(seed, choices) for each pair
+    """
+    seeds = list(seeds)
+    arrays = simulate_timeline_arrays(seeds, choices_list, rules=rules)
+
+    multipliers = arrays['multiplier'].tolist()
+    emotionals = arrays['emotional'].tolist()
+    counts = arrays['event_count'].tolist()
+    types = arrays['event_type'].tolist()
+    impacts = arrays['event_impact'].tolist()
+
+    results = []
+    for idx, seed in enumerate(seeds):
+        events = []
+        for e in range(counts[idx]):
+            event_type = EVENT_TYPES[types[idx][e]]
             events.append({
-                'type': 'growth', 
-                'text': 'Long-term growth', 
-                'impact': 0.05 * rnd()
+                'type': event_type,
+                'text': EVENT_TEXT[event_type],
+                'impact': impacts[idx][e]
             })
+        results.append({
+            'multiplier': round(multipliers[idx], 3),
+            'events': events,
+            'emotional': emotionals[idx],
+            'seed': seed
+        })
+    return results
 
-    # compute final multiplier
-    multiplier = base * bias
-    # apply events
-    for event in events:
-        multiplier += event['impact']
 
-    # clamp
-    if multiplier < 0.2:
-        multiplier = 0.2
-    if multiplier > 3.0:
-        multiplier = 3.0
+# --- Monte Carlo outcome distribution ----------------------------------------
+
+DEFAULT_DISTRIBUTION_PATHS = 10000
+MAX_DISTRIBUTION_PATHS = 100000
+DEFAULT_HISTOGRAM_BINS = 20
+MAX_HISTOGRAM_BINS = 100
+DISTRIBUTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_distribution(seed, choices=None, paths=DEFAULT_DISTRIBUTION_PATHS,
+                          bins=DEFAULT_HISTOGRAM_BINS, rules=None):
+    """
+    Sample many parallel lives for one timeline under the same choice biases
+    @param {string} seed - timeline seed
+    @param {list} choices - user decisions that bias divergence
+    @param {int} paths - number of sampled paths
+    @param {int} bins - histogram bins between the multiplier clamps
+    @param {CompiledBiasRules} rules - bias rule set (defaults to the active one)
+    Returns percentile bands, a histogram and the chance of ending below 1.0
+    """
+    if choices is None:
+        choices = []
+    if not 1 <= paths <= MAX_DISTRIBUTION_PATHS:
+        raise ValueError(f'paths must be between 1 and {MAX_DISTRIBUTION_PATHS}')
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        raise ValueError(f'bins must be between 1 and {MAX_HISTOGRAM_BINS}')
+
+    # Same seed derivation as simulate_timeline so the distribution is reproducible
+    rng = np.random.default_rng(_numeric_seed(seed, choices))
+    bias = (rules or default_bias_rules.current).bias(choices)
 
-    # emotional score: lower multiplier -> worse outcome
-    emotional = max(0, min(1, (multiplier - 0.2) / (3.0 - 0.2)))
+    draws = rng.random((paths, DRAWS_PER_TIMELINE))
+    base = 0.6 + draws[:, 0] * 1.0
+    event_count = MIN_EVENTS + (draws[:, 1] * 3).astype(np.int64)
+    _, event_impact = _event_arrays(draws[:, 2::2], draws[:, 3::2], event_count)
+
+    multiplier = base * bias + event_impact.sum(axis=1)
+    np.clip(multiplier, MIN_MULTIPLIER, MAX_MULTIPLIER, out=multiplier)
+
+    bands = np.percentile(multiplier, DISTRIBUTION_PERCENTILES)
+    counts, edges = np.histogram(multiplier, bins=bins, range=(MIN_MULTIPLIER, MAX_MULTIPLIER))
 
     return {
-        'multiplier': round(multiplier, 3),
-        'events': events,
-        'emotional': emotional,
-        'seed': seed
-    }
\ No newline at end of file
+        'seed': seed,
+        'paths': paths,
+        'percentiles': {
+            f'p{p}': round(float(value), 3)
+            for p, value in zip(DISTRIBUTION_PERCENTILES, bands)
+        },
+        'histogram': {
+            'binEdges': [round(float(edge), 3) for edge in edges],
+            'counts': counts.tolist()
+        },
+        'probabilityBelowOne': float(np.count_nonzero(multiplier < 1.0)) / paths,
+        'mean': round(float(multiplier.mean()), 3)
+    }
+
+
+# --- Month-by-month wealth curve ---------------------------------------------
+
+DEFAULT_SIMULATION_MONTHS = 12
+MAX_SIMULATION_MONTHS = 1200
+MAX_STEPS_PER_MONTH = 31
+MONTHLY_VOLATILITY = 0.04
+DEFAULT_SERIES_POINTS = 120
+MAX_SERIES_POINTS = 2000
+
+# Separate stream id so curves don't reuse the distribution's draws
+_CURVE_STREAM = 1
+
+
+class WealthCurve:
+    """
+    Wealth multiplier over time, stored as one float64 array
+    values[i] is the multiplier after i steps (values[0] == 1.0)
+    """
+    __slots__ = ('seed', 'months', 'steps_per_month', 'values', 'event_steps', 'events')
+
+    def __init__(self, seed, months, steps_per_month, values, event_steps, events):
+        self.seed = seed
+        self.months = months
+        self.steps_per_month = steps_per_month
+        self.values = values
+        self.event_steps = event_steps
+        self.events = events
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.event_steps.nbytes
+
+    def downsample(self, points=DEFAULT_SERIES_POINTS):
+        """
+        Evenly spaced samples for charting, always including both ends
+        Only the selected points are copied out of the array
+        """
+        points = max(2, min(points, len(self.values)))
+        idx = np.unique(np.linspace(0, len(self.values) - 1, points).round().astype(np.int64))
+        return {
+            'month': (idx / self.steps_per_month).round(3).tolist(),
+            'wealth': self.values[idx].round(4).tolist()
+        }
+
+    def to_dict(self, points=DEFAULT_SERIES_POINTS):
+        series = self.downsample(points)
+        return {
+            'seed': self.seed,
+            'months': self.months,
+            'stepsPerMonth': self.steps_per_month,
+            'totalPoints': len(self.values),
+            'points': len(series['month']),
+            'month': series['month'],
+            'wealth': series['wealth'],
+            'events': [
+                {
+                    'month': round(int(step) / self.steps_per_month, 3),
+                    'type': event['type'],
+                    'text': event['text'],
+                    'impact': event['impact']
+                }
+                for step, event in zip(self.event_steps, self.events)
+            ]
+        }
+
+
+def simulate_wealth_curve(seed, choices=None, months=DEFAULT_SIMULATION_MONTHS,
+                          steps_per_month=1, simulation=None):
+    """
+    Month-by-month (or finer) wealth path for a timeline
+    The path starts at 1.0 and ends exactly at the timeline's multiplier;
+    its events land at random steps as jumps, with seeded noise in between
+    @param {string} seed - timeline seed
+    @param {list} choices - user decisions that bias divergence
+    @param {int} months - horizon in months (up to MAX_SIMULATION_MONTHS)
+    @param {int} steps_per_month - resolution (1 = monthly, 4 = weekly, ...)
+    @param {dict} simulation - simulate_timeline result to anchor to (computed if omitted)
+    """
+    if choices is None:
+        choices = []
+    if not 1 <= months <= MAX_SIMULATION_MONTHS:
+        raise ValueError(f'months must be between 1 and {MAX_SIMULATION_MONTHS}')
+    if not 1 <= steps_per_month <= MAX_STEPS_PER_MONTH:
+        raise ValueError(f'steps_per_month must be between 1 and {MAX_STEPS_PER_MONTH}')
+    if simulation is None:
+        simulation = default_engine.simulate(seed, choices)
+
+    steps = months * steps_per_month
+    rng = np.random.default_rng((_numeric_seed(seed, choices), _CURVE_STREAM))
+    t = np.arange(steps + 1) / steps
+
+    # Random walk pinned to zero at both ends (Brownian bridge in log space)
+    walk = np.empty(steps + 1)
+    walk[0] = 0.0
+    np.cumsum(rng.normal(0.0, MONTHLY_VOLATILITY / np.sqrt(steps_per_month), steps), out=walk[1:])
+    walk -= t * walk[-1]
+
+    # Events become jumps at random steps
+    events = simulation['events']
+    event_steps = np.sort(rng.integers(1, steps + 1, size=len(events)))
+    jumps = np.zeros(steps + 1)
+    for step, event in zip(event_steps, events):
+        jumps[step:] += np.log1p(event['impact'])
+
+    # Drift so the path lands on the simulated multiplier
+    drift = t * (np.log(simulation['multiplier']) - jumps[-1])
+    values = np.exp(walk + jumps + drift)
+
+    return WealthCurve(seed, months, steps_per_month, values, event_steps, events)
+
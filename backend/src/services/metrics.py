@@ -0,0 +1,226 @@
+"""
+In-process metrics in the Prometheus text format (served at /metrics)
+Counters and histograms keep one series per tuple of label values; an
+update is a dict lookup, a bisect and a few additions under a per-metric
+lock (a microsecond or two), negligible next to the stages it times. Gauges
+read their value from a callback at scrape time (store size, queue depth).
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+# Seconds; upstream calls and pipeline stages range from ~1 ms to the deadline
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _check(self, values):
+        if len(values) != len(self.labels):
+            raise ValueError(f'{self.name} expects labels {self.labels}, got {values}')
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic count per label set: counter.inc('cohere', 'generate', 200)"""
+    kind = 'counter'
+
+    def __init__(self, name, description, labels=()):
+        super().__init__(name, description, labels)
+        self._values = {}
+
+    def inc(self, *values, amount=1):
+        self._check(values)
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def value(self, *values):
+        with self._lock:
+            return self._values.get(values, 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+        return [f'{self.name}{_format_labels(self.labels, values)} {_format_value(count)}'
+                for values, count in items]
+
+
+class Histogram(Metric):
+    """Bucketed observations (seconds) per label set, rendered cumulatively"""
+    kind = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, *values):
+        self._check(values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum and count
+                series = self._series[values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *values):
+        """Observe the duration of the with-block, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *values)
+
+    def count(self, *values):
+        with self._lock:
+            series = self._series.get(values)
+            return series[-1] if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(((values, list(series)) for values, series in self._series.items()),
+                           key=lambda item: tuple(map(str, item[0])))
+        lines = []
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}')
+            labels = _format_labels(self.labels, values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class Gauge(Metric):
+    """
+    Value read at scrape time: fn() returns a number, or a dict of
+    label-value tuples -> number for a labelled gauge
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, description, fn, labels=()):
+        super().__init__(name, description, labels)
+        self.fn = fn
+
+    def _samples(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"⚠️ Gauge {self.name} failed: {e}")
+            return []
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        return [f'{self.name}{_format_labels(self.labels, values)} {_format_value(number)}'
+                for values, number in items]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, description, labels=()):
+        return self.register(Counter(name, description, labels))
+
+    def histogram(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, description, labels, buckets))
+
+    def gauge(self, name, description, fn, labels=()):
+        return self.register(Gauge(name, description, fn, labels))
+
+    def render(self):
+        """Prometheus text exposition format 0.0.4"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry and the metrics shared across services
+registry = Registry()
+
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    'pipeline_stage_duration_seconds',
+    'create_complete_timeline stage latency (transform, analyze, register, simulate)',
+    labels=('stage', 'status'))
+
+REGISTRATION_STEP_SECONDS = registry.histogram(
+    'investease_registration_step_duration_seconds',
+    'Investease registration step latency (find_or_create, portfolios, simulate, adventures, get_client)',
+    labels=('step',))
+
+UPSTREAM_REQUEST_SECONDS = registry.histogram(
+    'upstream_request_duration_seconds',
+    'Latency of individual Investease and Cohere calls',
+    labels=('upstream', 'endpoint'))
+
+UPSTREAM_RESPONSES = registry.counter(
+    'upstream_responses_total',
+    'Upstream calls by HTTP status code, or exception name when there was no response',
+    labels=('upstream', 'endpoint', 'status'))
+
+MOCK_FALLBACKS = registry.counter(
+    'mock_fallbacks_total',
+    'Times DataTransformer answered with mock data instead of Cohere',
+    labels=('kind',))
+
+
+def upstream_status(exception):
+    """Status label for a failed call: the HTTP status if the error carries one"""
+    status = getattr(exception, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exception, 'response', None), 'status_code', None)
+    return status if status is not None else type(exception).__name__
+
+
+def observe_upstream(upstream, endpoint, status, started):
+    """Record one upstream call that began at perf_counter() == started"""
+    UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream, endpoint)
+    UPSTREAM_RESPONSES.inc(upstream, endpoint, status)
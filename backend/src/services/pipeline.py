@@ -0,0 +1,132 @@
+"""
+Small dependency-graph runner for the timeline creation pipeline
+Stages whose dependencies are done run concurrently on a shared thread pool;
+the calling thread only schedules, so stages never block pool workers while
+waiting on each other. Coroutine function stages run on an event loop
+instead, so a stage that mostly waits on the network holds no pool worker.
+Per-stage start offsets and durations are recorded so the critical path can
+be checked from the response metadata. Stages run in a copy of the caller's
+context, so its request deadline applies to them.
+"""
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, wait
+import contextvars
+import time
+
+from src.services.metrics import PIPELINE_STAGE_SECONDS
+
+
+class PipelineStage:
+    def __init__(self, name, fn, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class Pipeline:
+    """
+    Usage:
+        pipeline = Pipeline(executor)
+        pipeline.add('transform', lambda: ...)
+        pipeline.add('register', lambda transform: ..., deps=['transform'])
+        results, timings = pipeline.run()
+    A stage function receives its dependencies' results as keyword arguments.
+    Stages added as coroutine functions are scheduled on loop, an event loop
+    running on another thread. listener(stage_name, status), if given, is
+    called from the worker thread (or the loop) with 'started', then
+    'finished' or 'failed'.
+    """
+
+    def __init__(self, executor, listener=None, loop=None):
+        self.executor = executor
+        self.listener = listener
+        self.loop = loop
+        self.stages = {}
+
+    def add(self, name, fn, deps=()):
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f'Stage {name} depends on unknown stage {dep}')
+        if asyncio.iscoroutinefunction(fn) and self.loop is None:
+            raise ValueError(f'Stage {name} is a coroutine function but the pipeline has no loop')
+        self.stages[name] = PipelineStage(name, fn, deps)
+        return self
+
+    def run(self):
+        """Run every stage; returns (results, timings). Re-raises the first stage error."""
+        started_at = time.perf_counter()
+        results = {}
+        timings = {}
+        pending = {}
+        waiting = dict(self.stages)
+
+        def notify(name, status):
+            # Progress reporting must never fail a stage
+            if self.listener is not None:
+                try:
+                    self.listener(name, status)
+                except Exception as e:
+                    print(f"⚠️ Pipeline listener failed for {name}: {e}")
+
+        def finish(stage, start, status):
+            end = time.perf_counter()
+            PIPELINE_STAGE_SECONDS.observe(end - start, stage.name, status)
+            timings[stage.name] = {
+                'startMs': round((start - started_at) * 1000, 1),
+                'durationMs': round((end - start) * 1000, 1)
+            }
+            notify(stage.name, status)
+
+        def timed(stage, kwargs):
+            notify(stage.name, 'started')
+            status = 'failed'
+            start = time.perf_counter()
+            try:
+                result = stage.fn(**kwargs)
+                status = 'finished'
+                return result
+            finally:
+                finish(stage, start, status)
+
+        async def timed_async(stage, kwargs):
+            notify(stage.name, 'started')
+            status = 'failed'
+            start = time.perf_counter()
+            try:
+                result = await stage.fn(**kwargs)
+                status = 'finished'
+                return result
+            finally:
+                finish(stage, start, status)
+
+        def submit_ready():
+            for name, stage in list(waiting.items()):
+                if all(dep in results for dep in stage.deps):
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+                    context = contextvars.copy_context()
+                    if asyncio.iscoroutinefunction(stage.fn):
+                        # The loop's task inherits the context current at scheduling
+                        future = context.run(asyncio.run_coroutine_threadsafe,
+                                             timed_async(stage, kwargs), self.loop)
+                    else:
+                        future = self.executor.submit(context.run, timed, stage, kwargs)
+                    pending[future] = name
+                    del waiting[name]
+
+        submit_ready()
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    results[name] = future.result()
+                submit_ready()
+        except Exception:
+            for future in pending:
+                future.cancel()
+            raise
+
+        return results, {
+            'stages': timings,
+            'totalMs': round((time.perf_counter() - started_at) * 1000, 1)
+        }
@@ -0,0 +1,25 @@
+"""
+Socket.IO access for services
+run.py registers the app's SocketIO instance here so background work
+(pipeline stages, jobs) can push events to a client's room without
+importing the Flask app.
+"""
+
+_socketio = None
+
+
+def init_realtime(socketio):
+    """Register the SocketIO server used by emit_to_room"""
+    global _socketio
+    _socketio = socketio
+
+
+def emit_to_room(event, data, room):
+    """
+    Emit an event to one room (a client's sid or a joined room name)
+    No-op without a room or before init_realtime; returns whether it was sent
+    """
+    if _socketio is None or not room:
+        return False
+    _socketio.emit(event, data, to=room)
+    return True
@@ -0,0 +1,218 @@
+"""
+Request deadlines and per-upstream circuit breakers
+A Deadline set around a request (see TimelineService) lives in a context
+variable, so every upstream call made on its behalf - including calls made
+from pool threads that run with a copy of the context - can ask for the
+remaining budget instead of using its own fixed timeout.
+A CircuitBreaker counts consecutive upstream failures; once open it rejects
+calls immediately (callers fall back to mock data or an error) until a
+single trial call after reset_timeout succeeds.
+"""
+from contextlib import contextmanager
+import contextvars
+import threading
+import time
+
+from src.config import Config
+
+_current_deadline = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before an upstream call"""
+
+
+class CircuitOpen(Exception):
+    """The upstream's breaker is open; the call was not attempted"""
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Run the block under a time budget of seconds (None or 0 = no budget)
+    A nested deadline can only shorten the outer one
+    """
+    if not seconds:
+        yield _current_deadline.get()
+        return
+    current = _current_deadline.get()
+    new = Deadline(seconds)
+    if current is not None and current.expires_at < new.expires_at:
+        new = current
+    token = _current_deadline.set(new)
+    try:
+        yield new
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time(default):
+    """
+    Timeout for the next upstream call: default, capped by what is left of
+    the current deadline (default None = no cap of its own). Raises
+    DeadlineExceeded once it has passed.
+    """
+    current = _current_deadline.get()
+    if current is None:
+        return default
+    remaining = current.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded('Request deadline exceeded')
+    return remaining if default is None else min(default, remaining)
+
+
+def deadline_timeouts(timeout_errors, *defaults):
+    """
+    remaining_time() for each default, plus the exception types to pass as
+    a breaker's ignore: a timeout cut short by the deadline says nothing
+    about the upstream's health
+    """
+    timeouts = tuple(remaining_time(default) for default in defaults)
+    clipped = any(timeout < default for timeout, default in zip(timeouts, defaults))
+    return timeouts, (timeout_errors if clipped else ())
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive failures
+    open -> half_open after reset_timeout seconds; one trial call is let through
+    half_open -> closed on success, back to open on failure
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self.trips = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now (claims the trial slot when half open)"""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def before_call(self):
+        if not self.allow():
+            raise CircuitOpen(f'{self.name} circuit is open')
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                    print(f"🔌 {self.name} circuit opened after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self):
+        """Neither success nor failure (e.g. our own deadline cut the call short)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def call(self, fn, is_failure=None, ignore=()):
+        """
+        Run fn() through the breaker; exceptions, and results for which
+        is_failure(result) is true, count as failures. Exceptions of the
+        types in ignore, and BaseExceptions such as CancelledError, are
+        re-raised without counting either way.
+        """
+        self.before_call()
+        try:
+            result = fn()
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or interrupted: no verdict, but free the trial slot
+            self.release()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    async def call_async(self, coro_fn, is_failure=None, ignore=()):
+        """call() for coroutines"""
+        self.before_call()
+        try:
+            result = await coro_fn()
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or interrupted: no verdict, but free the trial slot
+            self.release()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutiveFailures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Shared breaker for an upstream, created with the BREAKER_* settings"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=Config.BREAKER_RESET_TIMEOUT)
+        return breaker
+
+
+def breaker_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
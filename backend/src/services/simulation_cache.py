@@ -0,0 +1,18 @@
+"""
+Bounded memoization for deterministic simulations
+Simulation results are pure functions of (seed, choices, params), so shared
+timelines can be served from memory instead of re-running the simulator.
+"""
+from src.services.lru_cache import LRUCache
+
+
+class SimulationCache(LRUCache):
+    """
+    LRU cache of simulation results keyed by seed, choices and parameters
+    maxsize=0 disables caching; ttl=0 keeps entries until evicted by size
+    """
+
+    @staticmethod
+    def key(seed, choices=None, *params):
+        """Cache key: seed, choices normalized to a tuple, extra params"""
+        return (seed, tuple(choices or ()), params)
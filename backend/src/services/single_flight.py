@@ -0,0 +1,100 @@
+"""
+Single-flight deduplication of concurrent identical upstream calls
+When several threads ask for the same key at once, only the first (the
+leader) runs the call; the others wait for it and share its result or
+exception. Nothing is cached once the call finishes. A waiting caller
+still honours its own request deadline (see resilience.deadline).
+"""
+import asyncio
+import threading
+
+from src.services.resilience import DeadlineExceeded, remaining_time
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-based single flight; results are shared, not copied"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Run fn() once per key among concurrent callers and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.done.wait(remaining_time(None)):
+                raise DeadlineExceeded('Request deadline exceeded waiting for a shared call')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inFlight': len(self._calls),
+                'leaders': self.leaders,
+                'shared': self.shared
+            }
+
+
+class AsyncSingleFlight:
+    """asyncio version: concurrent coroutines with the same key await one task"""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key, coro_fn):
+        """Await coro_fn() once per key among concurrent callers"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        # shield: one caller being cancelled or timing out must not cancel
+        # the shared call
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), remaining_time(None))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded('Request deadline exceeded waiting for a shared call')
+
+    def stats(self):
+        return {
+            'inFlight': len(self._calls),
+            'leaders': self.leaders,
+            'shared': self.shared
+        }
@@ -0,0 +1,118 @@
+"""
+Canonical, compact timeline record
+Each piece of pipeline data is stored once; the backward-compatible fields
+(profileAnalysis, enhancedProfile, investeaseClient, ...) are rebuilt from it
+only when a client asks for the legacy view at serialization time.
+"""
+from dataclasses import dataclass, fields
+
+# Enhanced profile keys that are already stored on the record itself
+_SHARED_PROFILE_FIELDS = ('name', 'learningStyle', 'financialGoals', 'gradeLevel')
+
+
+@dataclass(slots=True)
+class TimelineRecord:
+    id: str
+    owner: str
+    name: str
+    choices: list
+    profile_text: str
+    created_at: str
+    simulated: dict
+    analysis: dict
+    simulation_months: int = 12
+    steps_per_month: int = 1
+
+    # Full pipeline only (None for simple timelines)
+    investease: dict = None
+    kid_adventures: dict = None
+    learning_style: str = None
+    financial_goals: list = None
+    grade_level: str = None
+    profile_extras: dict = None
+    profile_shared: tuple = ()
+
+    @property
+    def is_complete(self):
+        """True for timelines created through the full Investease pipeline"""
+        return self.investease is not None
+
+    @classmethod
+    def from_pipeline(cls, *, enhanced_profile, learning_style, financial_goals,
+                      grade_level, **kwargs):
+        """
+        Build a complete record, keeping only the enhanced-profile fields
+        that aren't already stored elsewhere on the record
+        """
+        shared_values = {
+            'name': kwargs['owner'],
+            'learningStyle': learning_style,
+            'financialGoals': financial_goals,
+            'gradeLevel': grade_level
+        }
+        shared = tuple(key for key in _SHARED_PROFILE_FIELDS
+                       if key in enhanced_profile and enhanced_profile[key] == shared_values[key])
+        extras = {key: value for key, value in enhanced_profile.items() if key not in shared}
+        return cls(learning_style=learning_style, financial_goals=financial_goals,
+                   grade_level=grade_level, profile_extras=extras, profile_shared=shared,
+                   **kwargs)
+
+    def enhanced_profile(self):
+        """Rebuild the Cohere-enhanced profile dict"""
+        shared_values = {
+            'name': self.owner,
+            'learningStyle': self.learning_style,
+            'financialGoals': self.financial_goals,
+            'gradeLevel': self.grade_level
+        }
+        profile = dict(self.profile_extras or {})
+        for key in self.profile_shared:
+            profile[key] = shared_values[key]
+        return profile
+
+    def to_dict(self, legacy=False):
+        """API view; legacy=True adds the duplicated backward-compatible fields"""
+        data = {
+            'id': self.id,
+            'owner': self.owner,
+            'name': self.name,
+            'choices': self.choices,
+            'profileText': self.profile_text,
+            'createdAt': self.created_at,
+            'simulated': self.simulated,
+            'analysis': self.analysis,
+            'simulationMonths': self.simulation_months,
+            'stepsPerMonth': self.steps_per_month
+        }
+        if not self.is_complete:
+            return data
+
+        data.update({
+            'rbc_investease': self.investease,
+            'kid_adventures': self.kid_adventures,
+            'learningStyle': self.learning_style,
+            'financialGoals': self.financial_goals,
+            'gradeLevel': self.grade_level,
+            'totalPortfoliosCreated': len(self.investease.get('portfolios') or [])
+        })
+        if legacy:
+            data.update({
+                'profileAnalysis': self.analysis,
+                'enhancedProfile': self.enhanced_profile(),
+                'investeaseClient': self.investease['client'],
+                'investeasePortfolios': self.investease['portfolios'],
+                'investeaseSimulation': self.investease.get('simulation_results'),
+                'investeaseClientId': self.investease['client_id']
+            })
+        return data
+
+    def to_storage(self):
+        """Compact dict for persistent stores (field name -> value)"""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    @classmethod
+    def from_storage(cls, data):
+        """Inverse of to_storage"""
+        data = dict(data)
+        data['profile_shared'] = tuple(data.get('profile_shared') or ())
+        return cls(**data)
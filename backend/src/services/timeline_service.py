@@ -2,76 +2,141 @@
 Timeline service - orchestrates the Frontend → Cohere → Investease pipeline
 Business logic for creating educational financial timelines for kids
 """
+import base64
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+import json
 import uuid
+from src.config import Config
+from src.services.async_investease_client import background_loop, register_client
 from src.services.data_transformer import DataTransformer
 from src.services.investease_client import register_client_with_investease
-from src.services.market_simulator import simulate_timeline
+from src.services.market_simulator import (
+    DEFAULT_DISTRIBUTION_PATHS,
+    DEFAULT_HISTOGRAM_BINS,
+    DEFAULT_SERIES_POINTS,
+    MAX_SIMULATION_MONTHS,
+    MAX_STEPS_PER_MONTH,
+    default_engine,
+    simulate_timelines
+)
+from src.services.pipeline import Pipeline
+from src.services.resilience import deadline
+from src.services.simulation_cache import SimulationCache
+from src.services.timeline_record import TimelineRecord
+from src.services.timeline_store import create_timeline_store
+
+# Bulk simulations smaller than this run inline; larger ones are split across workers
+BULK_CHUNK_SIZE = 2048
 
 
 class TimelineService:
-    def __init__(self):
+    def __init__(self, store=None):
         self.data_transformer = DataTransformer()
-        # In-memory storage for demo - replace with DB in production
-        self.timelines = {}
+        self.simulator = default_engine
+        if Config.BIAS_RULES_PATH:
+            self.simulator.bias_rules.load(Config.BIAS_RULES_PATH)
+        self.simulation_executor = self._create_simulation_executor()
+        # Runs independent stages of create_complete_timeline concurrently
+        self.pipeline_executor = ThreadPoolExecutor(
+            max_workers=Config.PIPELINE_WORKERS, thread_name_prefix='pipeline')
+        self.simulation_cache = SimulationCache(
+            maxsize=Config.SIMULATION_CACHE_SIZE, ttl=Config.SIMULATION_CACHE_TTL)
+        # In-memory dict by default; SQLite when TIMELINE_STORE=sqlite
+        self.store = store if store is not None else create_timeline_store()
+
+    def _create_simulation_executor(self):
+        """Optional worker pool for bulk simulations, configured in Config"""
+        if Config.SIMULATION_EXECUTOR == 'thread':
+            return ThreadPoolExecutor(max_workers=Config.SIMULATION_WORKERS,
+                                      thread_name_prefix='simulation')
+        if Config.SIMULATION_EXECUTOR == 'process':
+            return ProcessPoolExecutor(max_workers=Config.SIMULATION_WORKERS)
+        return None
 
-    def create_complete_timeline(self, frontend_data):
+    def create_complete_timeline(self, frontend_data, legacy=False, progress=None, horizon=None):
         """
         Complete pipeline: Frontend → Cohere → Investease → Timeline
         Creates an educational timeline for kids with AI-enhanced data
+        legacy=True includes the backward-compatible duplicate fields in the response
+        frontend_data['socketRoom'] (optional) receives streamed adventure events
+        progress(stage, status) is called as pipeline stages start and finish
+        Every upstream call runs within a REQUEST_DEADLINE budget for the whole request
+        horizon is (months, steps_per_month) from simulation_horizon(), when
+        the caller has validated it already
         """
         # Step 1: Extract frontend data
         name = frontend_data.get('name', 'Young Learner')
         email = frontend_data.get('email', 'parent@example.com')
         profile_text = frontend_data.get('profileText', f"Profile for {name}")
         choices = frontend_data.get('choices', [])
+        months, steps_per_month = horizon or self.simulation_horizon(frontend_data)
+        room = frontend_data.get('socketRoom')
 
         print(f"=== Creating Educational Timeline for {name} ===")
+        timeline_id = str(uuid.uuid4())
 
         # Step 2: Transform data through Cohere AI
-        print("Step 1: Transforming kid's data through Cohere AI...")
-        enhanced_client_data = self.data_transformer.transform_user_to_client_data(
-            frontend_data)
+        def transform():
+            print("Step 1: Transforming kid's data through Cohere AI...")
+            return self.data_transformer.transform_user_to_client_data(frontend_data)
 
-        print("Step 2: Analyzing kid's profile...")
-        profile_analysis = self.data_transformer.analyze_profile_text(
-            profile_text)
+        def analyze():
+            print("Step 2: Analyzing kid's profile...")
+            return self.data_transformer.analyze_profile_text(profile_text)
 
         # Step 3: Register with Investease API - complete portfolio creation and simulation
-        print("Step 3: Creating complete Investease profile with portfolios...")
-        investease_response = register_client_with_investease(
-            enhanced_client_data)
+        def register(transform):
+            print("Step 3: Creating complete Investease profile with portfolios...")
+            return self._registration_data(register_client_with_investease(transform, room=room))
 
-        if not investease_response['success']:
-            raise Exception(
-                f"Failed to register with Investease: {investease_response['error']}")
-
-        investease_data = investease_response['data']
+        # INVESTEASE_ASYNC: the registration runs as a coroutine on the shared
+        # event loop, so it holds no pipeline worker while Investease answers
+        async def register_async(transform):
+            print("Step 3: Creating complete Investease profile with portfolios (async)...")
+            return self._registration_data(await register_client(transform, room=room))
 
         # Step 4: Create additional educational simulation timeline (our own simulation)
-        print("Step 4: Creating educational timeline simulation...")
-        timeline_id = str(uuid.uuid4())
-        local_simulation = simulate_timeline(timeline_id, choices)
+        def simulate():
+            print("Step 4: Creating educational timeline simulation...")
+            return self.simulator.simulate(timeline_id, choices)
+
+        # Both Cohere calls and the local simulation start at once; only the
+        # Investease registration waits, and only for the transformed profile
+        loop = background_loop.get_loop() if Config.INVESTEASE_ASYNC else None
+        with deadline(Config.REQUEST_DEADLINE):
+            results, timings = (Pipeline(self.pipeline_executor, listener=progress, loop=loop)
+                                .add('transform', transform)
+                                .add('analyze', analyze)
+                                .add('register', register_async if loop else register,
+                                     deps=['transform'])
+                                .add('simulate', simulate)
+                                .run())
+
+        enhanced_client_data = results['transform']
+        profile_analysis = results['analyze']
+        investease_data = results['register']
+        local_simulation = results['simulate']
 
         # Step 5: Create complete timeline record with both simulations
-        timeline = {
-            'id': timeline_id,
-            'owner': name,
-            'name': f"{name}'s Financial Learning Journey",
-            'choices': choices,
-            'profileText': profile_text,
-            'createdAt': datetime.now().isoformat(),
+        # Stored once in canonical form; legacy duplicate fields are only
+        # rebuilt when a client asks for them (see TimelineRecord.to_dict)
+        record = TimelineRecord.from_pipeline(
+            id=timeline_id,
+            owner=name,
+            name=f"{name}'s Financial Learning Journey",
+            choices=choices,
+            profile_text=profile_text,
+            created_at=datetime.now().isoformat(),
 
             # Frontend expects 'simulated' for the main simulation data
-            'simulated': local_simulation,
-            'analysis': profile_analysis,
-
-            # Pipeline results - Enhanced data (for backend reference)
-            'enhancedProfile': enhanced_client_data,
-            'profileAnalysis': profile_analysis,
+            simulated=local_simulation,
+            analysis=profile_analysis,
+            simulation_months=months,
+            steps_per_month=steps_per_month,
 
             # RBC Investease API integration (for technical demo)
-            'rbc_investease': {
+            investease={
                 'client': investease_data['client'],
                 'portfolios': investease_data['portfolios_created'],
                 'simulation_results': investease_data.get('rbc_simulation_results'),
@@ -80,42 +145,44 @@ class TimelineService:
             },
 
             # Kid-friendly adventures (for educational demo)
-            'kid_adventures': investease_data.get('kid_adventures'),
+            kid_adventures=investease_data.get('kid_adventures'),
 
-            # Legacy format for backward compatibility
-            'investeaseClient': investease_data['client'],
-            'investeasePortfolios': investease_data['portfolios_created'],
-            'investeaseSimulation': investease_data.get('rbc_simulation_results'),
-            'investeaseClientId': investease_data['client_id'],
+            # Pipeline results - Enhanced data (for backend reference)
+            enhanced_profile=enhanced_client_data,
 
             # Educational metadata
-            'learningStyle': enhanced_client_data.get('learningStyle', 'visual'),
-            'financialGoals': enhanced_client_data.get('financialGoals', []),
-            'gradeLevel': enhanced_client_data.get('gradeLevel', 'Unknown'),
-
-            # Summary stats
-            'totalPortfoliosCreated': len(investease_data.get('portfolios_created', [])),
-            'simulationMonths': 12
-        }
+            learning_style=enhanced_client_data.get('learningStyle', 'visual'),
+            financial_goals=enhanced_client_data.get('financialGoals', []),
+            grade_level=enhanced_client_data.get('gradeLevel', 'Unknown')
+        )
 
         # Store timeline
-        self.timelines[timeline_id] = timeline
+        self.store.save(record)
         print(f"✅ Educational timeline created successfully: {timeline_id}")
 
         return {
             'success': True,
-            'timeline': timeline,
-            'message': f'Educational timeline created for {name}! Ready to start learning about money!'
+            'timeline': record.to_dict(legacy=legacy),
+            'message': f'Educational timeline created for {name}! Ready to start learning about money!',
+            'pipelineTimings': timings
         }
 
-    def create_simple_timeline(self, frontend_data):
+    @staticmethod
+    def _registration_data(investease_response):
+        if not investease_response['success']:
+            raise Exception(
+                f"Failed to register with Investease: {investease_response['error']}")
+        return investease_response['data']
+
+    def create_simple_timeline(self, frontend_data, horizon=None):
         """
         Simple timeline creation without Investease registration
-        For basic educational use
+        For basic educational use; horizon as in create_complete_timeline
         """
         name = frontend_data.get('name', 'Young Learner')
         profile_text = frontend_data.get('profileText', f"Profile for {name}")
         choices = frontend_data.get('choices', [])
+        months, steps_per_month = horizon or self.simulation_horizon(frontend_data)
 
         print(f"=== Creating Simple Educational Timeline for {name} ===")
 
@@ -124,40 +191,196 @@ class TimelineService:
             profile_text)
 
         timeline_id = str(uuid.uuid4())
-        simulation = simulate_timeline(timeline_id, choices)
-
-        timeline = {
-            'id': timeline_id,
-            'owner': name,
-            'name': f"{name}'s Learning Timeline",
-            'choices': choices,
-            'profileText': profile_text,
-            'createdAt': datetime.now().isoformat(),
-            'simulated': simulation,
-            'analysis': profile_analysis
-        }
+        simulation = self.simulator.simulate(timeline_id, choices)
+
+        record = TimelineRecord(
+            id=timeline_id,
+            owner=name,
+            name=f"{name}'s Learning Timeline",
+            choices=choices,
+            profile_text=profile_text,
+            created_at=datetime.now().isoformat(),
+            simulated=simulation,
+            analysis=profile_analysis,
+            simulation_months=months,
+            steps_per_month=steps_per_month
+        )
+
+        self.store.save(record)
+        return record.to_dict()
+
+    def get_timeline(self, timeline_id, legacy=False):
+        """
+        Get a specific timeline as an API dict
+        legacy=True adds the backward-compatible duplicate fields
+        """
+        record = self.store.get(timeline_id)
+        return record.to_dict(legacy=legacy) if record else None
+
+    def simulation_horizon(self, frontend_data):
+        """
+        Validated (simulationMonths, stepsPerMonth) from request data
+        Raises ValueError for non-integer or out-of-range values
+        """
+        try:
+            months = int(frontend_data.get('simulationMonths', Config.SIMULATION_MONTHS))
+            steps_per_month = int(frontend_data.get('stepsPerMonth', 1))
+        except (TypeError, ValueError):
+            raise ValueError('simulationMonths and stepsPerMonth must be integers')
+        if not 1 <= months <= MAX_SIMULATION_MONTHS:
+            raise ValueError(f'simulationMonths must be between 1 and {MAX_SIMULATION_MONTHS}')
+        if not 1 <= steps_per_month <= MAX_STEPS_PER_MONTH:
+            raise ValueError(f'stepsPerMonth must be between 1 and {MAX_STEPS_PER_MONTH}')
+        return months, steps_per_month
+
+    def get_wealth_series(self, timeline_id, points=DEFAULT_SERIES_POINTS):
+        """
+        Downsampled wealth curve for a stored timeline
+        Only the downsampled series is cached, keyed by points, so entries stay
+        at most MAX_SERIES_POINTS long; the full-resolution curve is rebuilt
+        deterministically on a miss and dropped once sampled
+        """
+        record = self.store.get(timeline_id)
+        if not record:
+            return None
+
+        seed = record.id
+        choices = record.choices
+        months = record.simulation_months
+        steps_per_month = record.steps_per_month
+        series = self.simulation_cache.get_or_compute(
+            self._cache_key(seed, choices, 'series', months, steps_per_month, points),
+            lambda: self.simulator.wealth_curve(
+                seed, choices, months=months, steps_per_month=steps_per_month,
+                simulation=record.simulated).to_dict(points))
+
+        series['timelineId'] = timeline_id
+        return series
+
+    def get_timeline_distribution(self, timeline_id, paths=DEFAULT_DISTRIBUTION_PATHS,
+                                  bins=DEFAULT_HISTOGRAM_BINS):
+        """
+        Monte Carlo outcome distribution for a stored timeline
+        Samples many parallel lives with the timeline's own seed and choices
+        """
+        record = self.store.get(timeline_id)
+        if not record:
+            return None
+
+        seed = record.id
+        choices = record.choices
+        distribution = self.simulation_cache.get_or_compute(
+            self._cache_key(seed, choices, 'distribution', paths, bins),
+            lambda: self.simulator.distribution(seed, choices, paths=paths, bins=bins))
+        distribution['timelineMultiplier'] = (record.simulated or {}).get('multiplier')
+        return distribution
+
+    def _cache_key(self, seed, choices, *params):
+        """Simulation cache key; includes the bias rule version so a rule swap invalidates it"""
+        return SimulationCache.key(seed, choices, self.simulator.bias_rules.version, *params)
+
+    def reload_bias_rules(self, path=None):
+        """Hot-swap the choice bias rule table from a JSON file"""
+        return self.simulator.bias_rules.load(path)
+
+    def simulate(self, seed, choices=None):
+        """
+        Simulate one timeline, served from the simulation cache when possible
+        For replaying known seeds: creation simulates its fresh timeline id
+        directly, as nothing could read that entry before it is evicted
+        """
+        return self.simulation_cache.get_or_compute(
+            self._cache_key(seed, choices),
+            lambda: self.simulator.simulate(seed, choices))
+
+    def simulate_bulk(self, seeds, choices_list=None):
+        """
+        Simulate many timelines at once
+        Cached results are reused; the rest are split into chunks and spread
+        over the simulation executor. Every seed gets its own generator and
+        results are joined in input order, so output does not depend on the
+        worker count
+        """
+        seeds = list(seeds)
+        if choices_list is None:
+            choices_list = [[]] * len(seeds)
+        choices_list = list(choices_list)
+
+        results = [None] * len(seeds)
+        missing = []
+        for idx, (seed, choices) in enumerate(zip(seeds, choices_list)):
+            cached = self.simulation_cache.get(self._cache_key(seed, choices))
+            if cached is None:
+                missing.append(idx)
+            else:
+                results[idx] = cached
+        if not missing:
+            return results
+
+        miss_seeds = [seeds[i] for i in missing]
+        miss_choices = [choices_list[i] for i in missing]
+        for idx, result in zip(missing, self._simulate_uncached(miss_seeds, miss_choices)):
+            self.simulation_cache.put(self._cache_key(seeds[idx], choices_list[idx]), result)
+            results[idx] = result
+        return results
+
+    def _simulate_uncached(self, seeds, choices_list):
+        """Run the batch simulator inline or across the executor"""
+        if not self.simulation_executor or len(seeds) <= BULK_CHUNK_SIZE:
+            return self.simulator.simulate_many(seeds, choices_list)
+
+        seed_chunks = [seeds[i:i + BULK_CHUNK_SIZE]
+                       for i in range(0, len(seeds), BULK_CHUNK_SIZE)]
+        choice_chunks = [choices_list[i:i + BULK_CHUNK_SIZE]
+                         for i in range(0, len(seeds), BULK_CHUNK_SIZE)]
+
+        rules = [self.simulator.bias_rules.current] * len(seed_chunks)
+
+        results = []
+        for chunk in self.simulation_executor.map(simulate_timelines, seed_chunks, choice_chunks, rules):
+            results.extend(chunk)
+        return results
+
+    def list_timelines(self, cursor=None, limit=None, owner=None, grade_level=None,
+                       learning_style=None):
+        """
+        One page of educational timeline summaries, newest first
+        Returns {'timelines': [...], 'nextCursor': str or None}; pass
+        nextCursor back to fetch the following page
+        """
+        if limit is None:
+            limit = Config.TIMELINES_PAGE_SIZE
+        limit = min(limit, Config.TIMELINES_MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError('limit must be at least 1')
+
+        summaries, has_more = self.store.query(
+            after=self._decode_cursor(cursor) if cursor else None,
+            limit=limit,
+            owner=owner,
+            grade_level=grade_level,
+            learning_style=learning_style)
+
+        next_cursor = None
+        if has_more and summaries:
+            last = summaries[-1]
+            next_cursor = self._encode_cursor(last['createdAt'], last['id'])
+        return {'timelines': summaries, 'nextCursor': next_cursor}
+
+    @staticmethod
+    def _encode_cursor(created_at, timeline_id):
+        """Opaque page cursor for the (createdAt, id) position"""
+        raw = json.dumps([created_at, timeline_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
 
-        self.timelines[timeline_id] = timeline
-        return timeline
-
-    def get_timeline(self, timeline_id):
-        """Get a specific timeline"""
-        return self.timelines.get(timeline_id)
-
-    def list_timelines(self):
-        """List all educational timelines"""
-        return [
-            {
-                'id': t['id'],
-                'name': t['name'],
-                'owner': t['owner'],
-                'createdAt': t['createdAt'],
-                'simulated': t.get('simulated', {'multiplier': 1, 'emotional': 0, 'events': []}),
-                'learningStyle': t.get('learningStyle', 'Unknown'),
-                'gradeLevel': t.get('gradeLevel', 'Unknown')
-            }
-            for t in self.timelines.values()
-        ]
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, timeline_id = json.loads(raw)
+            return str(created_at), str(timeline_id)
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
 
 
 # Global instance for the demo
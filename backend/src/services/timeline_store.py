@@ -0,0 +1,514 @@
+"""
+Pluggable storage backends for educational timelines
+- InMemoryTimelineStore: plain dict, the default for demos
+- BoundedTimelineStore: in-memory with a budget, spilling cold records to SQLite
+- SQLiteTimelineStore: persistent, shareable between worker processes
+
+Both expose save / get / list / query / __len__ and hold TimelineRecord
+objects (SQLite persists their compact storage form as JSON).
+query() returns summary projections newest (createdAt, id) first and
+resumes after a cursor key, using secondary indexes on owner, gradeLevel
+and learningStyle so a page costs O(page size) rather than O(all timelines).
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import queue
+import sqlite3
+import threading
+
+from src.config import Config
+from src.services.timeline_record import TimelineRecord
+
+
+# Filterable fields: query() keyword -> timeline field
+FILTER_FIELDS = {
+    'owner': 'owner',
+    'grade_level': 'gradeLevel',
+    'learning_style': 'learningStyle'
+}
+
+
+def timeline_summary(record):
+    """Projection served by the list endpoint"""
+    return {
+        'id': record.id,
+        'name': record.name,
+        'owner': record.owner,
+        'createdAt': record.created_at,
+        'simulated': record.simulated or {'multiplier': 1, 'emotional': 0, 'events': []},
+        'learningStyle': record.learning_style or 'Unknown',
+        'gradeLevel': record.grade_level or 'Unknown'
+    }
+
+
+def _sort_key(summary):
+    return (summary['createdAt'], summary['id'])
+
+
+class InMemoryTimelineStore:
+    """
+    In-process dict store; contents are lost on restart
+    Keeps summaries plus sorted (createdAt, id) key lists: one over all
+    timelines and one per owner / grade level / learning style value, each
+    with a key set so several filters can be intersected
+    """
+
+    def __init__(self):
+        self._timelines = {}
+        self._summaries = {}
+        self._order = []
+        self._indexes = {field: {} for field in FILTER_FIELDS.values()}
+        self._members = {field: {} for field in FILTER_FIELDS.values()}
+        self._lock = threading.RLock()
+
+    def save(self, record):
+        summary = timeline_summary(record)
+        key = _sort_key(summary)
+        with self._lock:
+            previous = self._summaries.get(record.id)
+            if previous is not None:
+                self._unindex(previous)
+            self._timelines[record.id] = record
+            self._summaries[record.id] = summary
+            insort(self._order, key)
+            for field, index in self._indexes.items():
+                insort(index.setdefault(summary[field], []), key)
+                self._members[field].setdefault(summary[field], set()).add(key)
+
+    def _unindex(self, summary):
+        key = _sort_key(summary)
+        self._remove_key(self._order, key)
+        for field, index in self._indexes.items():
+            keys = index.get(summary[field])
+            if keys is not None:
+                self._remove_key(keys, key)
+                if not keys:
+                    del index[summary[field]]
+            members = self._members[field].get(summary[field])
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._members[field][summary[field]]
+
+    @staticmethod
+    def _remove_key(keys, key):
+        pos = bisect_right(keys, key) - 1
+        if pos >= 0 and keys[pos] == key:
+            del keys[pos]
+
+    def get(self, timeline_id):
+        return self._timelines.get(timeline_id)
+
+    def query(self, after=None, limit=50, **filters):
+        """
+        Up to `limit` summaries, newest (createdAt, id) first, continuing
+        past the `after` key; returns (summaries, has_more)
+        """
+        wanted = {FILTER_FIELDS[name]: value for name, value in filters.items()
+                  if value is not None}
+        with self._lock:
+            # Intersect the filters' index sets, walking the smallest index in
+            # key order so only as much of the intersection as the page needs
+            # is computed
+            keys = self._order
+            others = []
+            if wanted:
+                fields = sorted(wanted, key=lambda field: len(
+                    self._indexes[field].get(wanted[field], ())))
+                keys = self._indexes[fields[0]].get(wanted[fields[0]], [])
+                others = [self._members[field].get(wanted[field], set())
+                          for field in fields[1:]]
+
+            # Walk backwards from just before the cursor key
+            end = bisect_left(keys, tuple(after)) if after else len(keys)
+            page = []
+            for pos in range(end - 1, -1, -1):
+                key = keys[pos]
+                if all(key in members for members in others):
+                    if len(page) == limit:
+                        return page, True
+                    page.append(self._summaries[key[1]])
+            return page, False
+
+    def list(self):
+        """All timelines in insertion order"""
+        return list(self._timelines.values())
+
+    def __len__(self):
+        return len(self._summaries)
+
+    def stats(self):
+        return {'backend': 'memory', 'entries': len(self)}
+
+    def close(self):
+        pass
+
+
+class BoundedTimelineStore(InMemoryTimelineStore):
+    """
+    In-memory store with a memory budget that spills to SQLite
+    Full records are kept in LRU order by read; when the budget (entries
+    and/or approximate bytes) is exceeded, the least recently read records
+    are written to the spill store and dropped from memory, and get()
+    transparently reloads them. max_entries limits full records; max_bytes
+    also covers summaries and their index entries. Once only summaries are
+    left over it, the oldest ones move to the spill store too: the listing
+    walks the in-memory index first and continues in SQLite, which then
+    holds every timeline older than the oldest summary still in memory.
+    """
+
+    # Dict, sort-key tuples, list slots and index set entries per summary on
+    # top of its JSON size
+    SUMMARY_OVERHEAD_BYTES = 512
+
+    def __init__(self, spill_store, max_entries=0, max_bytes=0):
+        super().__init__()
+        self._timelines = OrderedDict()
+        self._sizes = {}
+        # In-memory records whose latest version isn't in the spill store yet
+        self._dirty = set()
+        # Newest (createdAt, id) whose summary was moved to the spill store
+        self._spill_max = None
+        self.spill_store = spill_store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_bytes = 0
+        self.spilled_summaries = 0
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+
+    @staticmethod
+    def _approx_size(record):
+        return len(json.dumps(record.to_storage()))
+
+    @classmethod
+    def _summary_size(cls, summary):
+        return len(json.dumps(summary)) + cls.SUMMARY_OVERHEAD_BYTES
+
+    def save(self, record):
+        size = self._approx_size(record)
+        summary = timeline_summary(record)
+        with self._lock:
+            if (record.id not in self._summaries and self._spill_max is not None
+                    and _sort_key(summary) <= self._spill_max):
+                self._save_spilled(record)
+                return
+            previous = self._summaries.get(record.id)
+            if previous is not None:
+                self.memory_bytes -= self._summary_size(previous)
+            super().save(record)
+            self.memory_bytes += self._summary_size(summary)
+            self._timelines.move_to_end(record.id)
+            self.memory_bytes += size - self._sizes.get(record.id, 0)
+            self._sizes[record.id] = size
+            self._dirty.add(record.id)
+            self._enforce_budget()
+
+    def _save_spilled(self, record):
+        """Save a timeline older than the in-memory index straight to the spill store"""
+        if record.id not in self.spill_store:
+            self.spilled_summaries += 1
+        self.spill_store.save(record)
+        if record.id in self._timelines:
+            # Drop the stale cached copy of a reloaded record
+            del self._timelines[record.id]
+            self.memory_bytes -= self._sizes.pop(record.id)
+
+    def get(self, timeline_id):
+        with self._lock:
+            record = self._timelines.get(timeline_id)
+            if record is not None:
+                self._timelines.move_to_end(timeline_id)
+                return record
+            if not self.spills and not self.spilled_summaries:
+                return None
+
+            record = self.spill_store.get(timeline_id)
+            if record is None:
+                return None
+            self.reloads += 1
+            self._timelines[timeline_id] = record
+            self._sizes[timeline_id] = size = self._approx_size(record)
+            self.memory_bytes += size
+            self._enforce_budget(keep=timeline_id)
+            return record
+
+    def query(self, after=None, limit=50, **filters):
+        """
+        Up to `limit` summaries, newest (createdAt, id) first, continuing
+        past the `after` key; returns (summaries, has_more)
+        """
+        with self._lock:
+            page, has_more = super().query(after=after, limit=limit, **filters)
+            if has_more or not self.spilled_summaries:
+                return page, has_more
+            # Everything older than the oldest in-memory summary is in the spill store
+            bound = self._order[0] if self._order else None
+            if after and bound:
+                cursor = min(tuple(after), bound)
+            else:
+                cursor = tuple(after) if after else bound
+            rest, has_more = self.spill_store.query(after=cursor, limit=limit - len(page),
+                                                    **filters)
+            return page + rest, has_more
+
+    def _over_budget(self):
+        return ((self.max_entries and len(self._timelines) > self.max_entries) or
+                (self.max_bytes and self.memory_bytes > self.max_bytes))
+
+    def _enforce_budget(self, keep=None):
+        while self._over_budget():
+            timeline_id = next(iter(self._timelines), None)
+            if timeline_id is not None and timeline_id != keep:
+                self._evict(timeline_id)
+            elif self.max_bytes and self.memory_bytes > self.max_bytes and self._order:
+                self._spill_summary()
+            else:
+                break
+
+    def _evict(self, timeline_id):
+        record = self._timelines.pop(timeline_id)
+        if timeline_id in self._dirty:
+            self.spill_store.save(record)
+            self._dirty.discard(timeline_id)
+            self.spills += 1
+        self.memory_bytes -= self._sizes.pop(timeline_id)
+        self.evictions += 1
+
+    def _spill_summary(self):
+        """Move the oldest in-memory summary (and its record) to the spill store"""
+        key = self._order[0]
+        timeline_id = key[1]
+        if timeline_id in self._timelines:
+            self._evict(timeline_id)
+        summary = self._summaries.pop(timeline_id)
+        self._unindex(summary)
+        self.memory_bytes -= self._summary_size(summary)
+        self._spill_max = key if self._spill_max is None else max(self._spill_max, key)
+        self.spilled_summaries += 1
+
+    def list(self):
+        """All timelines: the spilled-summary ones, then the rest in insertion order"""
+        with self._lock:
+            older = [record for record in self.spill_store.list()
+                     if record.id not in self._summaries]
+            return older + [self._timelines.get(timeline_id) or self.spill_store.get(timeline_id)
+                            for timeline_id in self._summaries]
+
+    def __len__(self):
+        return len(self._summaries) + self.spilled_summaries
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'bounded',
+                'entries': len(self),
+                'inMemory': len(self._timelines),
+                'inMemorySummaries': len(self._summaries),
+                'spilledSummaries': self.spilled_summaries,
+                'approxMemoryBytes': self.memory_bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'reloads': self.reloads
+            }
+
+    def close(self):
+        self.spill_store.close()
+
+
+class SQLiteTimelineStore:
+    """
+    SQLite store in WAL mode so readers never block the writer
+    Connections come from a pool of at most pool_size, checked out per call,
+    so a thread-per-request server doesn't open (and leak) one per thread.
+    Statements are parameterized so each connection's statement cache reuses
+    the prepared plans. Filter columns are denormalized out of the JSON
+    document and indexed.
+    """
+
+    SCHEMA = [
+        '''CREATE TABLE IF NOT EXISTS timelines (
+            id TEXT PRIMARY KEY,
+            owner TEXT,
+            createdAt TEXT,
+            gradeLevel TEXT,
+            learningStyle TEXT,
+            data TEXT NOT NULL,
+            summary TEXT NOT NULL
+        )''',
+        # Composite indexes serve both the filter and the (createdAt, id) page order
+        'CREATE INDEX IF NOT EXISTS idx_timelines_created ON timelines (createdAt, id)',
+        'CREATE INDEX IF NOT EXISTS idx_timelines_owner_created ON timelines (owner, createdAt, id)',
+        'CREATE INDEX IF NOT EXISTS idx_timelines_grade_created ON timelines (gradeLevel, createdAt, id)',
+        'CREATE INDEX IF NOT EXISTS idx_timelines_style_created ON timelines (learningStyle, createdAt, id)',
+        # Row count kept by triggers, so len() and stats() don't run COUNT(*)
+        # on every /health and /metrics; upserts that update don't fire them
+        'CREATE TABLE IF NOT EXISTS timeline_count (id INTEGER PRIMARY KEY CHECK (id = 0), n INTEGER NOT NULL)',
+        '''CREATE TRIGGER IF NOT EXISTS timelines_count_insert AFTER INSERT ON timelines
+            BEGIN UPDATE timeline_count SET n = n + 1 WHERE id = 0; END''',
+        '''CREATE TRIGGER IF NOT EXISTS timelines_count_delete AFTER DELETE ON timelines
+            BEGIN UPDATE timeline_count SET n = n - 1 WHERE id = 0; END''',
+        # Counted once, when the table is created or first opened by this version
+        'INSERT OR IGNORE INTO timeline_count (id, n) SELECT 0, COUNT(*) FROM timelines'
+    ]
+
+    UPSERT = '''INSERT INTO timelines (id, owner, createdAt, gradeLevel, learningStyle, data, summary)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    owner = excluded.owner,
+                    createdAt = excluded.createdAt,
+                    gradeLevel = excluded.gradeLevel,
+                    learningStyle = excluded.learningStyle,
+                    data = excluded.data,
+                    summary = excluded.summary'''
+
+    def __init__(self, path, pool_size=None):
+        self.path = path
+        self.pool_size = max(1, pool_size or Config.TIMELINE_DB_POOL_SIZE)
+        # Idle connections, most recently used first
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+
+    @contextmanager
+    def _connection(self):
+        """Check a connection out of the pool for one call, waiting when all are busy"""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _checkout(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._pool.get()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30, cached_statements=256,
+                               check_same_thread=False)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def save(self, record):
+        # Filter columns come from the summary so both stores agree on defaults
+        summary = timeline_summary(record)
+        with self._connection() as conn, conn:
+            conn.execute(self.UPSERT, (
+                summary['id'],
+                summary['owner'],
+                summary['createdAt'],
+                summary['gradeLevel'],
+                summary['learningStyle'],
+                json.dumps(record.to_storage()),
+                json.dumps(summary)
+            ))
+
+    def __contains__(self, timeline_id):
+        with self._connection() as conn:
+            return conn.execute(
+                'SELECT 1 FROM timelines WHERE id = ?', (timeline_id,)).fetchone() is not None
+
+    def get(self, timeline_id):
+        with self._connection() as conn:
+            row = conn.execute(
+                'SELECT data FROM timelines WHERE id = ?', (timeline_id,)).fetchone()
+        return TimelineRecord.from_storage(json.loads(row[0])) if row else None
+
+    def list(self):
+        """All timelines in insertion order"""
+        with self._connection() as conn:
+            rows = conn.execute('SELECT data FROM timelines ORDER BY rowid').fetchall()
+        return [TimelineRecord.from_storage(json.loads(row[0])) for row in rows]
+
+    def query(self, after=None, limit=50, **filters):
+        """
+        Up to `limit` summaries, newest (createdAt, id) first, continuing
+        past the `after` key; returns (summaries, has_more)
+        """
+        clauses = []
+        params = []
+        for name, value in sorted(filters.items()):
+            if value is not None:
+                clauses.append(f'{FILTER_FIELDS[name]} = ?')
+                params.append(value)
+        if after:
+            clauses.append('(createdAt, id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(limit + 1)
+
+        with self._connection() as conn:
+            rows = conn.execute(
+                f'SELECT summary FROM timelines {where} ORDER BY createdAt DESC, id DESC LIMIT ?',
+                params).fetchall()
+        return [json.loads(row[0]) for row in rows[:limit]], len(rows) > limit
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute('SELECT n FROM timeline_count WHERE id = 0').fetchone()[0]
+
+    def stats(self):
+        return {
+            'backend': 'sqlite',
+            'entries': len(self),
+            'connections': self._opened,
+            'poolSize': self.pool_size
+        }
+
+    def clear(self):
+        with self._connection() as conn, conn:
+            conn.execute('DELETE FROM timelines')
+
+    def close(self):
+        """Close the idle connections; the pool reopens on next use"""
+        with self._pool_lock:
+            while True:
+                try:
+                    self._pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._opened -= 1
+
+
+def create_timeline_store(backend=None, path=None):
+    """
+    Build the store selected in Config (TIMELINE_STORE / TIMELINE_DB_PATH)
+    The memory store becomes a BoundedTimelineStore when a memory budget
+    (TIMELINE_MEMORY_MAX_ENTRIES / TIMELINE_MEMORY_MAX_BYTES) is set
+    """
+    backend = (backend or Config.TIMELINE_STORE).lower()
+    if backend == 'sqlite':
+        return SQLiteTimelineStore(path or Config.TIMELINE_DB_PATH)
+    if backend == 'memory':
+        if Config.TIMELINE_MEMORY_MAX_ENTRIES or Config.TIMELINE_MEMORY_MAX_BYTES:
+            # The spill file only extends memory; it starts empty on every boot
+            spill_store = SQLiteTimelineStore(Config.TIMELINE_SPILL_PATH)
+            spill_store.clear()
+            return BoundedTimelineStore(
+                spill_store,
+                max_entries=Config.TIMELINE_MEMORY_MAX_ENTRIES,
+                max_bytes=Config.TIMELINE_MEMORY_MAX_BYTES)
+        return InMemoryTimelineStore()
+    raise ValueError(f'Unknown timeline store: {backend}')
@@ -0,0 +1,28 @@
+"""
+Shared pytest setup
+Run from backend/: python -m pytest
+Upstream keys and on-disk caches are blanked before src.config is imported,
+so tests use the offline fallbacks and never touch a developer's .env files.
+"""
+import os
+
+os.environ.update({
+    'COHERE_API_KEY': '',
+    'AWS_JWT_TOKEN': '',
+    'COHERE_CACHE_PATH': '',
+    'INVESTEASE_INDEX_PATH': '',
+    'TIMELINE_STORE': 'memory'
+})
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app():
+    from run import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
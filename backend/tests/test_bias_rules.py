@@ -0,0 +1,71 @@
+import pickle
+import random
+
+import pytest
+
+from src.services.bias_rules import BiasRuleEngine, CompiledBiasRules
+
+WORDS = ['Save', 'my', 'allowance', 'INVEST', 'spend', 'lemonade', 'side', 'pokemon', 'cards',
+         'bike', 'saved', 'inside', 'spending', 'lemonadeside', 'investsave', 'Pokémon', '']
+
+
+def substring_bias(choices):
+    """The simulator's original hard-coded bias loop"""
+    bias = 1.0
+    for choice in choices:
+        lc = choice.lower()
+        if 'save' in lc:
+            bias += 0.15
+        if 'invest' in lc:
+            bias += 0.2
+        if 'spend' in lc:
+            bias -= 0.2
+        if 'lemonade' in lc or 'side' in lc:
+            bias += 0.05
+        if 'pokemon' in lc:
+            bias -= 0.05
+    return bias
+
+
+def test_default_rules_match_the_substring_loop_exactly():
+    rng = random.Random(5)
+    rules = BiasRuleEngine()
+    for _ in range(2000):
+        choices = [' '.join(rng.choices(WORDS, k=rng.randint(0, 4)))
+                   for _ in range(rng.randint(0, 5))]
+        assert rules.bias(choices) == substring_bias(choices)
+
+
+def test_keyword_inside_a_longer_keyword_fires_both_rules():
+    rules = CompiledBiasRules([
+        {'name': 'spend', 'keywords': ['spend'], 'delta': -0.2},
+        {'name': 'overspend', 'keywords': ['overspend'], 'delta': -0.1}
+    ])
+    assert rules.choice_deltas('Overspending at the mall') == (-0.2, -0.1)
+    assert rules.choice_deltas('spend wisely') == (-0.2,)
+    # A rule fires once per choice however many keywords match
+    assert CompiledBiasRules([{'keywords': ['a', 'b'], 'delta': 1}]).bias(['ab ab']) == 2.0
+
+
+@pytest.mark.parametrize('rule, message', [
+    ({'keywords': [], 'delta': 1}, 'non-empty list of keywords'),
+    ({'keywords': ['save', ''], 'delta': 1}, 'non-empty list of keywords'),
+    ({'keywords': ['save']}, 'numeric delta'),
+    ({'keywords': ['save'], 'delta': 'lots'}, 'numeric delta')
+])
+def test_malformed_rules_are_rejected(rule, message):
+    with pytest.raises(ValueError, match=message):
+        CompiledBiasRules([rule])
+
+
+def test_swap_and_pickle_keep_rule_sets_consistent():
+    engine = BiasRuleEngine()
+    before = engine.current
+    engine.swap([{'name': 'saving', 'keywords': ['save'], 'delta': 0.5}])
+    assert engine.bias(['Save it']) == 1.5
+    assert before.bias(['Save it']) == 1.15
+    assert engine.version != before.version
+
+    copy = pickle.loads(pickle.dumps(engine.current))
+    assert copy.version == engine.version
+    assert copy.bias(['Save it']) == 1.5
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from src.services.timeline_store import (
+    BoundedTimelineStore,
+    InMemoryTimelineStore,
+    SQLiteTimelineStore
+)
+from tests.test_timeline_store import GRADES, STYLES, make_record
+
+FILTERS = [
+    {},
+    {'owner': 'Kid 1'},
+    {'grade_level': '5th Grade', 'learning_style': 'visual'},
+    {'owner': 'Kid 2', 'grade_level': '3rd Grade'},
+    {'owner': 'Nobody'}
+]
+
+
+def varied_record(i, version=0):
+    return make_record(i, owner=f'Kid {(i + version) % 4}', grade_level=GRADES[(i + version) % 3],
+                       learning_style=STYLES[i % 2])
+
+
+def fill(stores, rng, count=200):
+    """Same saves (including re-saves) and reads against every store"""
+    order = list(range(count))
+    rng.shuffle(order)
+    for i in order:
+        for store in stores:
+            store.save(varied_record(i))
+        if rng.random() < 0.3:
+            timeline_id = f'timeline-{rng.randrange(count):04d}'
+            for store in stores:
+                store.get(timeline_id)
+    for i in rng.sample(range(count), 20):
+        for store in stores:
+            store.save(varied_record(i, version=1))
+
+
+def all_pages(store, limit, **filters):
+    pages = []
+    after = None
+    while True:
+        page, has_more = store.query(after=after, limit=limit, **filters)
+        pages.append(page)
+        if not has_more:
+            return pages
+        after = (page[-1]['createdAt'], page[-1]['id'])
+
+
+@pytest.fixture
+def spill(tmp_path):
+    store = SQLiteTimelineStore(str(tmp_path / 'spill.db'), pool_size=2)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize('budget', [
+    {'max_entries': 5},
+    {'max_bytes': 60_000},
+    {'max_entries': 3, 'max_bytes': 40_000}
+])
+def test_bounded_store_pages_and_reads_like_the_memory_store(spill, budget):
+    bounded = BoundedTimelineStore(spill, **budget)
+    reference = InMemoryTimelineStore()
+    fill([bounded, reference], random.Random(1))
+
+    stats = bounded.stats()
+    assert stats['evictions'] > 0
+    if budget.get('max_entries'):
+        assert stats['inMemory'] <= budget['max_entries']
+    if budget.get('max_bytes'):
+        assert stats['spilledSummaries'] > 0
+        assert stats['approxMemoryBytes'] <= budget['max_bytes']
+
+    assert len(bounded) == len(reference) == 200
+    for filters in FILTERS:
+        for limit in (1, 7, 50):
+            assert all_pages(bounded, limit, **filters) == all_pages(reference, limit, **filters)
+    for record in reference.list():
+        assert bounded.get(record.id).to_storage() == record.to_storage()
+    assert sorted(r.id for r in bounded.list()) == sorted(r.id for r in reference.list())
+
+
+def test_saves_older_than_the_spilled_summaries_go_straight_to_the_spill_store(spill):
+    bounded = BoundedTimelineStore(spill, max_bytes=30_000)
+    reference = InMemoryTimelineStore()
+    for i in range(100, 200):
+        for store in (bounded, reference):
+            store.save(varied_record(i))
+    assert bounded.stats()['spilledSummaries'] > 0
+
+    # An older timeline and an update to a spilled one
+    for store in (bounded, reference):
+        store.save(varied_record(5))
+        store.save(varied_record(100, version=2))
+
+    assert len(bounded) == len(reference) == 101
+    for filters in FILTERS:
+        assert all_pages(bounded, 9, **filters) == all_pages(reference, 9, **filters)
+    assert bounded.get('timeline-0100').owner == reference.get('timeline-0100').owner
+
+
+def test_evicted_records_are_reloaded_and_kept_within_the_entry_budget(spill):
+    bounded = BoundedTimelineStore(spill, max_entries=2)
+    for i in range(10):
+        bounded.save(varied_record(i))
+
+    for i in range(10):
+        assert bounded.get(f'timeline-{i:04d}').id == f'timeline-{i:04d}'
+        assert bounded.stats()['inMemory'] <= 2
+    stats = bounded.stats()
+    # Every record is written to the spill store once; clean reloads aren't rewritten
+    assert stats['spills'] == 10
+    assert stats['reloads'] == 10
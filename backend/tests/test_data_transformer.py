@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cohere
+import pytest
+
+from benchmarks.standins import StandinProfile, start_cohere_standin
+from src.services import data_transformer
+from src.services.data_transformer import DataTransformer, _request_options
+from src.services.generation_cache import GenerationCache
+from src.services.resilience import CircuitBreaker, deadline
+from src.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def failing_cohere(monkeypatch):
+    server = start_cohere_standin(StandinProfile(error_rate=1.0, error_status=503))
+    monkeypatch.setattr(data_transformer, 'cohere_breaker', CircuitBreaker('cohere-test'))
+    transformer = DataTransformer(cache=GenerationCache(maxsize=0))
+    transformer.cohere_client = cohere.Client('test-key', base_url=server.base_url)
+    yield server, transformer
+    server.shutdown()
+
+
+def test_request_options_use_remaining_deadline_without_sdk_retries():
+    with deadline(2):
+        options, _ = _request_options()
+    assert options['max_retries'] == 0
+    assert 0 < options['timeout'] <= 2
+
+
+def test_failed_generate_is_one_upstream_attempt_and_one_breaker_failure(failing_cohere):
+    server, transformer = failing_cohere
+    with pytest.raises(Exception):
+        transformer._generate_uncached('hello', max_tokens=10, temperature=0.9)
+    assert server.stats()['requests'] == 1
+    assert data_transformer.cohere_breaker.failures == 1
+
+
+def test_streamed_adventure_chunks_are_readable_story_text(monkeypatch):
+    server = start_cohere_standin(StandinProfile(), token_ms=0)
+    events = []
+    monkeypatch.setattr(data_transformer, 'emit_to_room',
+                        lambda event, data, room: events.append((event, data)))
+    transformer = DataTransformer(cache=GenerationCache(maxsize=0))
+    transformer.cohere_client = cohere.Client('test-key', base_url=server.base_url)
+    try:
+        adventures = transformer.translate_rbc_simulation_to_kid_adventures(
+            {'results': []}, {'name': 'Emma'}, room='sid-1')
+    finally:
+        server.shutdown()
+
+    chunks = [data for event, data in events if event == 'adventure-chunk']
+    assert len(chunks) > 1
+    streamed = {}
+    for chunk in chunks:
+        assert '"' not in chunk['text'] and '{' not in chunk['text']
+        streamed[chunk['field']] = streamed.get(chunk['field'], '') + chunk['text']
+    adventure = adventures['adventures'][0]
+    assert streamed == {
+        'adventure_name': adventure['adventure_name'],
+        'story': adventure['story'],
+        'learning_point': adventure['learning_point'],
+        'overall_story': adventures['overall_story']
+    }
+    assert events[-1] == ('adventure-complete', {'kid_adventures': adventures})
+
+
+def test_concurrent_identical_generates_reach_cohere_once(monkeypatch):
+    server = start_cohere_standin(StandinProfile(latency='fixed:200'))
+    monkeypatch.setattr(data_transformer, 'generation_flight', SingleFlight())
+    transformer = DataTransformer(cache=GenerationCache(maxsize=0))
+    transformer.cohere_client = cohere.Client('test-key', base_url=server.base_url)
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            texts = list(pool.map(
+                lambda _: transformer._generate('Analyze this child', max_tokens=50, temperature=0.3),
+                range(6)))
+    finally:
+        server.shutdown()
+
+    assert server.stats()['requests'] == 1
+    assert len(set(texts)) == 1
+    assert data_transformer.generation_flight.stats()['shared'] == 5
@@ -0,0 +1,36 @@
+import threading
+
+from src.services.generation_cache import GenerationCache
+
+
+def test_memory_then_disk_tier(tmp_path):
+    path = str(tmp_path / 'cohere.db')
+    key = GenerationCache.key('command-light', 'prompt', 0.3, 100)
+    GenerationCache(path=path).put(key, '{"age": 12}')
+
+    cache = GenerationCache(path=path)
+    assert cache.get(key) == '{"age": 12}'
+    assert cache.get(key) == '{"age": 12}'
+    stats = cache.stats()
+    assert (stats['diskHits'], stats['memory']['hits']) == (1, 1)
+
+
+def test_creative_temperatures_are_not_cacheable():
+    cache = GenerationCache(max_temperature=0.5)
+    assert cache.cacheable(0.5)
+    assert not cache.cacheable(0.9)
+
+
+def test_bypass_counter_is_exact_across_threads():
+    cache = GenerationCache()
+
+    def bypass():
+        for _ in range(5000):
+            cache.record_bypass()
+
+    threads = [threading.Thread(target=bypass) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()['bypasses'] == 40000
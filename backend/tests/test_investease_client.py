@@ -0,0 +1,133 @@
+import contextlib
+import io
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from benchmarks.standins import (
+    InvesteaseStandinHandler,
+    StandinProfile,
+    StandinServer,
+    start_investease_standin
+)
+from src.config import Config
+from src.services.client_email_index import ClientEmailIndex
+from src.services.client_state_cache import ClientStateCache
+from src.services.investease_client import InvesteaseClient
+
+
+@pytest.fixture
+def standin():
+    server = start_investease_standin(StandinProfile())
+    yield server
+    server.shutdown()
+
+
+def make_client(standin, index=None, cache_size=1024):
+    return InvesteaseClient(base_url=standin.base_url, jwt_token='test-token',
+                            email_index=index if index is not None else ClientEmailIndex(),
+                            client_state=ClientStateCache(maxsize=cache_size))
+
+
+def register(client, email='ann@example.com', cash=1000):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return client.create_complete_client_with_portfolios(
+            {'name': 'Ann', 'email': email, 'cash': cash})
+
+
+@pytest.mark.parametrize('cache_size', [1024, 0])
+def test_repeat_registrations_top_up_from_the_current_balance(standin, cache_size):
+    client = make_client(standin, cache_size=cache_size)
+    results = [register(client) for _ in range(3)]
+    assert [len(result['data']['portfolios_created']) for result in results] == [3, 3, 3]
+    assert len({result['data']['client_id'] for result in results}) == 1
+
+
+def test_index_persists_only_email_to_client_id(standin, tmp_path):
+    path = str(tmp_path / 'index.db')
+    result = register(make_client(standin, index=ClientEmailIndex(path=path)))
+    client_id = str(result['data']['client_id'])
+
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute('SELECT * FROM clients').fetchall()
+    assert rows == [('ann@example.com', client_id)]
+    assert ClientEmailIndex(path=path).get('ann@example.com') == client_id
+
+
+def test_lookup_of_a_deleted_client_unindexes_it(standin):
+    index = ClientEmailIndex()
+    index.sync([])
+    index.put('gone@example.com', 'missing-id')
+    client = make_client(standin, index=index)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert client.find_client_by_email('gone@example.com') is None
+    assert index.get('gone@example.com') is None
+
+
+class CountingHandler(InvesteaseStandinHandler):
+    """Stand-in that counts TCP connections and peak in-flight requests"""
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections = getattr(self.server, 'connections', 0) + 1
+        super().setup()
+
+    def _begin(self):
+        with self.server.lock:
+            self.server.in_flight = getattr(self.server, 'in_flight', 0) + 1
+            self.server.peak = max(getattr(self.server, 'peak', 0), self.server.in_flight)
+        try:
+            return super()._begin()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+
+@pytest.fixture
+def counting_standin():
+    server = StandinServer(('127.0.0.1', 0), CountingHandler, StandinProfile(latency='fixed:50'))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def test_sequential_calls_reuse_one_pooled_connection(counting_standin):
+    client = make_client(counting_standin)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(10):
+            assert client.get_client('missing', use_cache=False)['status_code'] == 404
+    assert counting_standin.stats()['requests'] == 10
+    assert counting_standin.connections == 1
+
+
+def test_portfolios_are_created_concurrently_up_to_the_limit(counting_standin, monkeypatch):
+    monkeypatch.setattr(Config, 'INVESTEASE_PORTFOLIO_CONCURRENCY', 3)
+    client = make_client(counting_standin)
+    configs = [{'type': portfolio_type, 'amount': 10 * (i + 1)}
+               for i, portfolio_type in enumerate(['conservative', 'balanced', 'growth'] * 3)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        client_id = client.create_client({'name': 'Ann', 'email': 'ann@example.com',
+                                          'cash': 1000})['data']['id']
+        counting_standin.peak = 0
+        started = time.perf_counter()
+        results = client.create_portfolios(client_id, configs)
+        elapsed = time.perf_counter() - started
+
+    assert [result['data']['type'] for result in results] == [c['type'] for c in configs]
+    assert [result['data']['initialAmount'] for result in results] == [c['amount'] for c in configs]
+    assert counting_standin.peak == 3
+    # Three rounds of 50 ms rather than nine
+    assert elapsed < 0.35
+
+
+def test_state_cache_saves_upstream_reads_on_repeat_registrations(standin):
+    requests_by_cache = {}
+    for cache_size in (1024, 0):
+        before = standin.stats()['requests']
+        client = make_client(standin, cache_size=cache_size)
+        for _ in range(3):
+            register(client, email=f'cache-{cache_size}@example.com')
+        requests_by_cache[cache_size] = standin.stats()['requests'] - before
+    assert requests_by_cache[1024] < requests_by_cache[0]
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from src.routes import jobs as jobs_routes, timelines as timeline_routes
+from src.services.job_queue import JobQueue, JobQueueFull
+from src.services.timeline_service import timeline_service
+
+
+def wait_until_done(job, timeout=5):
+    stop = time.monotonic() + timeout
+    while not job.done:
+        assert time.monotonic() < stop
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def blocked_queue():
+    """One worker held busy by a running job, with room for two more"""
+    jobs = JobQueue(workers=1, depth=2)
+    release = threading.Event()
+    running = jobs.submit(lambda progress: release.wait(5))
+    stop = time.monotonic() + 5
+    while running.status != 'running':
+        assert time.monotonic() < stop
+        time.sleep(0.001)
+    yield jobs, release
+    release.set()
+
+
+def test_submit_rejects_when_the_queue_is_full(blocked_queue):
+    jobs, _ = blocked_queue
+    jobs.submit(lambda progress: 1)
+    jobs.submit(lambda progress: 2)
+
+    with pytest.raises(JobQueueFull):
+        jobs.submit(lambda progress: 3)
+    stats = jobs.stats()
+    assert (stats['queued'], stats['running'], stats['tracked']) == (2, 1, 3)
+
+
+def test_queued_jobs_run_once_a_worker_frees_up(blocked_queue):
+    jobs, release = blocked_queue
+    queued = jobs.submit(lambda progress: 'later')
+    assert queued.status == 'queued'
+    release.set()
+    wait_until_done(queued)
+    assert queued.to_dict()['result'] == 'later'
+
+
+def test_job_records_progress_results_and_errors():
+    jobs = JobQueue(workers=2, depth=4)
+
+    def steps(progress):
+        progress('analyze', 'done')
+        progress('register', 'done')
+        return {'ok': True}
+
+    def broken(progress):
+        raise RuntimeError('upstream down')
+
+    ok = jobs.submit(steps)
+    failed = jobs.submit(broken)
+    wait_until_done(ok)
+    wait_until_done(failed)
+
+    assert ok.to_dict()['status'] == 'succeeded'
+    assert ok.to_dict()['progress'] == {'analyze': 'done', 'register': 'done'}
+    assert ok.to_dict()['result'] == {'ok': True}
+    assert failed.to_dict()['status'] == 'failed'
+    assert failed.to_dict()['error'] == 'upstream down'
+    assert 'result' not in failed.to_dict()
+
+
+def test_finished_jobs_beyond_retention_are_forgotten():
+    jobs = JobQueue(workers=1, depth=10, retention=2)
+    finished = []
+    for i in range(3):
+        job = jobs.submit(lambda progress, i=i: i)
+        wait_until_done(job)
+        finished.append(job)
+    jobs.submit(lambda progress: 'new')
+    assert jobs.get(finished[0].id) is None
+    assert jobs.get(finished[2].id) is finished[2]
+
+
+def test_async_create_answers_503_when_the_queue_is_full(client, monkeypatch, blocked_queue):
+    jobs, _ = blocked_queue
+    jobs.submit(lambda progress: 1)
+    jobs.submit(lambda progress: 2)
+    monkeypatch.setattr(timeline_routes, 'job_queue', jobs)
+
+    response = client.post('/api/timelines/create-with-registration?async=1', json={'name': 'Ann'})
+
+    assert response.status_code == 503
+    assert 'Job queue is full' in response.get_json()['error']
+    assert jobs.stats()['tracked'] == 3
+
+
+def test_async_create_answers_202_and_the_job_can_be_polled(client, monkeypatch):
+    jobs = JobQueue(workers=1, depth=2)
+    monkeypatch.setattr(timeline_routes, 'job_queue', jobs)
+    monkeypatch.setattr(jobs_routes, 'job_queue', jobs)
+    monkeypatch.setattr(timeline_service, 'create_complete_timeline',
+                        lambda data, legacy, progress, horizon: {'name': data['name']})
+
+    response = client.post('/api/timelines/create-with-registration?async=1', json={'name': 'Ann'})
+
+    assert response.status_code == 202
+    job_id = response.get_json()['jobId']
+    assert response.headers['Location'] == f'/api/jobs/{job_id}'
+    wait_until_done(jobs.get(job_id))
+    polled = client.get(f'/api/jobs/{job_id}').get_json()
+    assert (polled['status'], polled['result']) == ('succeeded', {'name': 'Ann'})
+    assert client.get('/api/jobs/missing').status_code == 404
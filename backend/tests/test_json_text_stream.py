@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from src.services.json_text_stream import JSONTextStream
+
+DOCUMENT = {
+    'adventures': [{
+        'adventure_name': "Emma's Turtle \"Savings\" Adventure",
+        'emoji': '🐢',
+        'story': 'Steady grew $1000 into $1080!\nThat is $80 more coins.',
+        'tags': ['slow', 'steady']
+    }],
+    'overall_story': 'Emma learned patience 🐷'
+}
+
+
+def collect(stream, chunks):
+    text = {}
+    for chunk in chunks:
+        for field, piece in stream.feed(chunk):
+            text[field] = text.get(field, '') + piece
+    return text
+
+
+@pytest.mark.parametrize('ensure_ascii', [False, True])
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 1000])
+def test_string_values_survive_any_chunking(ensure_ascii, size):
+    raw = '```json\n' + json.dumps(DOCUMENT, ensure_ascii=ensure_ascii) + '\n```'
+    chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+
+    text = collect(JSONTextStream(['adventure_name', 'story', 'overall_story', 'tags']), chunks)
+
+    assert text == {
+        'adventure_name': DOCUMENT['adventures'][0]['adventure_name'],
+        'story': DOCUMENT['adventures'][0]['story'],
+        'tags': 'slowsteady',
+        'overall_story': DOCUMENT['overall_story']
+    }
+
+
+def test_keys_and_unlisted_fields_are_not_emitted():
+    pieces = JSONTextStream(['story']).feed('{"emoji": "🐢", "story": "Once", "n": 3}')
+    assert pieces == [('story', 'Once')]
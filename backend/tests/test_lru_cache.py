@@ -0,0 +1,62 @@
+import threading
+
+from src.services.lru_cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('src.services.lru_cache.time.monotonic', lambda: now[0])
+    cache = LRUCache(maxsize=10, ttl=30)
+    cache.put('a', 1)
+    now[0] += 29
+    assert cache.get('a') == 1
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cached_values_are_copies():
+    cache = LRUCache()
+    value = {'cash': 10, 'portfolios': []}
+    cache.put('client', value)
+    value['portfolios'].append('p')
+    cached = cache.get('client')
+    cached['cash'] = 0
+    assert cache.get('client') == {'cash': 10, 'portfolios': []}
+
+
+def test_zero_size_disables_the_cache():
+    cache = LRUCache(maxsize=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert cache.get_or_compute('a', lambda: 2) == 2
+    assert cache.stats()['size'] == 0
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = LRUCache()
+    cache.put('hit', 1)
+
+    def lookups():
+        for _ in range(2000):
+            cache.get('hit')
+            cache.get('miss')
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats['hits'] == stats['misses'] == 16000
@@ -0,0 +1,104 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.services import market_simulator, timeline_service
+from src.services.market_simulator import (
+    EVENT_TYPES,
+    simulate_timeline,
+    simulate_timeline_arrays,
+    simulate_timelines,
+    simulate_wealth_curve
+)
+from src.services.timeline_service import TimelineService
+from src.services.timeline_store import InMemoryTimelineStore
+
+CHOICES = [
+    [],
+    ['Save my allowance'],
+    ['Invest in the lemonade stand', 'Spend on pokemon cards'],
+    ['Spend on snacks', 'Spend on pokemon cards', 'Buy a video game'],
+    ['Save for a bike', 'Invest birthday money', 'Start a side project', 'Save my allowance']
+]
+
+
+def random_batch(count, rng):
+    seeds = [f'{rng.getrandbits(64):016x}' for _ in range(count)]
+    seeds += ['', 'seed', 'ünïcode-🐢']
+    choices_list = [rng.choice(CHOICES) for _ in seeds]
+    return seeds, choices_list
+
+
+@pytest.mark.parametrize('batch_seed', range(5))
+def test_batch_matches_scalar_for_many_seeds(batch_seed):
+    seeds, choices_list = random_batch(2000, random.Random(batch_seed))
+
+    scalar = [simulate_timeline(seed, choices) for seed, choices in zip(seeds, choices_list)]
+
+    assert simulate_timelines(seeds, choices_list) == scalar
+
+
+def test_arrays_match_scalar_fields():
+    seeds, choices_list = random_batch(500, random.Random(42))
+    arrays = simulate_timeline_arrays(seeds, choices_list)
+
+    for idx, (seed, choices) in enumerate(zip(seeds, choices_list)):
+        expected = simulate_timeline(seed, choices)
+        count = int(arrays['event_count'][idx])
+        assert round(float(arrays['multiplier'][idx]), 3) == expected['multiplier']
+        assert float(arrays['emotional'][idx]) == expected['emotional']
+        assert count == len(expected['events'])
+        assert [EVENT_TYPES[t] for t in arrays['event_type'][idx][:count]] == \
+            [event['type'] for event in expected['events']]
+        assert arrays['event_impact'][idx][:count].tolist() == \
+            [event['impact'] for event in expected['events']]
+        assert (arrays['event_type'][idx][count:] == -1).all()
+
+
+def test_batch_matches_scalar_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(market_simulator, 'BATCH_CHUNK_SIZE', 7)
+    seeds, choices_list = random_batch(100, random.Random(7))
+
+    for size in (1, 6, 7, 8, 50, len(seeds)):
+        scalar = [simulate_timeline(s, c) for s, c in zip(seeds[:size], choices_list[:size])]
+        assert simulate_timelines(seeds[:size], choices_list[:size]) == scalar
+
+
+@pytest.mark.parametrize('months, steps_per_month', [(1, 1), (12, 1), (120, 4), (1200, 1)])
+def test_wealth_curves_match_for_batch_and_scalar_anchors(months, steps_per_month):
+    seeds, choices_list = random_batch(50, random.Random(months))
+    batch = simulate_timelines(seeds, choices_list)
+
+    for seed, choices, simulation in zip(seeds, choices_list, batch):
+        from_batch = simulate_wealth_curve(seed, choices, months, steps_per_month, simulation)
+        from_scalar = simulate_wealth_curve(seed, choices, months, steps_per_month)
+        assert np.array_equal(from_batch.values, from_scalar.values)
+        assert np.array_equal(from_batch.event_steps, from_scalar.event_steps)
+        assert from_batch.values[-1] == pytest.approx(simulation['multiplier'])
+
+
+def test_simulate_bulk_over_executor_matches_scalar(monkeypatch):
+    monkeypatch.setattr(timeline_service, 'BULK_CHUNK_SIZE', 64)
+    service = TimelineService(store=InMemoryTimelineStore())
+    service.simulation_executor = ThreadPoolExecutor(max_workers=3)
+    seeds, choices_list = random_batch(300, random.Random(3))
+    try:
+        results = service.simulate_bulk(seeds, choices_list)
+    finally:
+        service.simulation_executor.shutdown()
+
+    assert results == [simulate_timeline(s, c) for s, c in zip(seeds, choices_list)]
+    # Cached results are replayed unchanged
+    assert service.simulate_bulk(seeds[:10], choices_list[:10]) == results[:10]
+
+
+@pytest.mark.parametrize('arguments', [{'paths': 0}, {'bins': 0}, {'months': 0}])
+def test_engine_passes_explicit_zero_arguments_on_to_validation(arguments):
+    engine = market_simulator.SimulatorEngine()
+    with pytest.raises(ValueError):
+        if 'months' in arguments:
+            engine.wealth_curve('seed', [], **arguments)
+        else:
+            engine.distribution('seed', [], **arguments)
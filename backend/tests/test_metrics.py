@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from src.services.metrics import Registry, upstream_status
+
+
+def parse(text):
+    """Sample lines as {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = value
+    return samples
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = Registry()
+    stage = registry.histogram('stage_seconds', 'Stage latency', labels=('stage',),
+                               buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        stage.observe(value, 'analyze')
+
+    text = registry.render()
+    samples = parse(text)
+    assert '# TYPE stage_seconds histogram' in text
+    assert samples['stage_seconds_bucket{stage="analyze",le="0.1"}'] == '2'
+    assert samples['stage_seconds_bucket{stage="analyze",le="1"}'] == '3'
+    assert samples['stage_seconds_bucket{stage="analyze",le="+Inf"}'] == '4'
+    assert samples['stage_seconds_sum{stage="analyze"}'] == '3.65'
+    assert samples['stage_seconds_count{stage="analyze"}'] == '4'
+
+
+def test_counter_labels_are_escaped_and_counts_are_exact_under_threads():
+    registry = Registry()
+    responses = registry.counter('responses_total', 'Responses', labels=('status',))
+
+    def hammer():
+        for _ in range(1000):
+            responses.inc('a "quoted"\nvalue')
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert parse(registry.render()) == {'responses_total{status="a \\"quoted\\"\\nvalue"}': '8000'}
+    with pytest.raises(ValueError):
+        responses.inc()
+
+
+def test_gauges_read_at_scrape_time_and_a_failing_gauge_is_skipped():
+    registry = Registry()
+    depth = {'queued': 1}
+    registry.gauge('queue_jobs', 'Jobs', lambda: {('queued',): depth['queued']}, labels=('state',))
+    registry.gauge('broken', 'Always fails', lambda: 1 / 0)
+
+    assert parse(registry.render()) == {'queue_jobs{state="queued"}': '1'}
+    depth['queued'] = 5
+    assert parse(registry.render()) == {'queue_jobs{state="queued"}': '5'}
+    with pytest.raises(ValueError):
+        registry.counter('queue_jobs', 'Duplicate')
+
+
+def test_upstream_status_prefers_the_http_status():
+    class HTTPError(Exception):
+        status_code = 503
+
+    assert upstream_status(HTTPError()) == 503
+    assert upstream_status(TimeoutError()) == 'TimeoutError'
+
+
+def test_metrics_endpoint_reports_stage_timings_and_gauges(client):
+    client.post('/api/timelines/', json={'name': 'Ann', 'choices': ['save']})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    samples = parse(text)
+    assert int(samples['timeline_store_entries']) >= 1
+    assert 'job_queue_jobs{state="queued"}' in samples
+    assert '# TYPE pipeline_stage_duration_seconds histogram' in text
+    assert int(samples['mock_fallbacks_total{kind="profile_analysis"}']) >= 1
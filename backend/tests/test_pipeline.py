@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from src.services.async_investease_client import BackgroundLoop
+from src.services.pipeline import Pipeline
+from src.services.resilience import deadline, remaining_time
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def test_stages_receive_dependency_results(executor):
+    results, timings = (Pipeline(executor)
+                        .add('a', lambda: 2)
+                        .add('b', lambda: 3)
+                        .add('sum', lambda a, b: a + b, deps=['a', 'b'])
+                        .run())
+    assert results == {'a': 2, 'b': 3, 'sum': 5}
+    assert set(timings['stages']) == {'a', 'b', 'sum'}
+
+
+def test_coroutine_stage_runs_on_the_loop_with_the_callers_deadline(executor):
+    loop = BackgroundLoop().get_loop()
+
+    async def register(transform):
+        await asyncio.sleep(0)
+        return threading.current_thread().name, transform, remaining_time(None)
+
+    with deadline(5):
+        results, _ = (Pipeline(executor, loop=loop)
+                      .add('transform', lambda: 'profile')
+                      .add('register', register, deps=['transform'])
+                      .run())
+    thread, transform, remaining = results['register']
+    assert thread == 'investease-loop'
+    assert transform == 'profile'
+    assert 0 < remaining <= 5
+
+
+def test_coroutine_stage_needs_a_loop(executor):
+    async def register():
+        return None
+
+    with pytest.raises(ValueError):
+        Pipeline(executor).add('register', register)
+
+
+def test_first_stage_error_is_raised(executor):
+    def fail():
+        raise RuntimeError('upstream down')
+
+    with pytest.raises(RuntimeError, match='upstream down'):
+        Pipeline(executor).add('ok', lambda: 1).add('fail', fail).run()
@@ -0,0 +1,206 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services import resilience
+from src.services.resilience import (
+    CircuitBreaker,
+    CircuitOpen,
+    DeadlineExceeded,
+    deadline,
+    deadline_timeouts,
+    remaining_time
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+
+def fail():
+    raise ConnectionError('upstream down')
+
+
+def test_breaker_opens_after_consecutive_failures_and_rejects_calls(clock):
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == 'closed'
+
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == 'open'
+
+    calls = []
+    with pytest.raises(CircuitOpen):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.stats() == {'state': 'open', 'consecutiveFailures': 3, 'trips': 1, 'rejected': 1}
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == 'closed'
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+
+    clock.now += 29.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    # The trial slot is taken until the trial reports back
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_for_another_reset_timeout(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now += 30
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == 'open'
+    assert breaker.trips == 2
+
+    clock.now += 29
+    with pytest.raises(CircuitOpen):
+        breaker.call(lambda: 'ok')
+    clock.now += 1
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_ignored_and_cancelled_errors_free_the_trial_without_a_verdict(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now += 30
+
+    def timeout():
+        raise TimeoutError('cut short by our deadline')
+
+    with pytest.raises(TimeoutError):
+        breaker.call(timeout, ignore=(TimeoutError,))
+    assert breaker.state == 'half_open'
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(breaker.call_async(cancelled))
+    assert breaker.state == 'half_open'
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_is_failure_results_count_as_failures(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2)
+    for _ in range(2):
+        assert breaker.call(lambda: 503, is_failure=lambda status: status >= 500) == 503
+    assert breaker.state == 'open'
+
+
+def test_concurrent_calls_in_half_open_send_a_single_trial(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now += 30
+
+    release = threading.Event()
+    trials = []
+
+    def trial():
+        trials.append(1)
+        release.wait(5)
+        return 'ok'
+
+    def attempt():
+        try:
+            return breaker.call(trial)
+        except CircuitOpen:
+            return 'rejected'
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(attempt) for _ in range(8)]
+        while not trials:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(trials) == 1
+    assert results.count('ok') == 1 and results.count('rejected') == 7
+
+
+def test_remaining_time_caps_defaults_by_the_deadline():
+    assert remaining_time(5) == 5
+    assert remaining_time(None) is None
+    with deadline(2):
+        assert 1.9 < remaining_time(5) <= 2
+        assert remaining_time(0.5) == 0.5
+        assert 1.9 < remaining_time(None) <= 2
+
+
+def test_nested_deadline_can_only_shorten_the_outer_one():
+    with deadline(1):
+        with deadline(10):
+            assert remaining_time(None) <= 1
+        with deadline(0.2):
+            assert remaining_time(None) <= 0.2
+        assert remaining_time(None) > 0.2
+    assert remaining_time(None) is None
+
+
+def test_expired_deadline_raises_before_the_call():
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            remaining_time(5)
+
+
+def test_deadline_follows_the_context_into_pool_threads():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with deadline(2):
+            context = contextvars.copy_context()
+            inherited = pool.submit(context.run, remaining_time, None).result()
+        plain = pool.submit(remaining_time, None).result()
+    assert 1.9 < inherited <= 2
+    assert plain is None
+
+
+def test_deadline_timeouts_ignore_timeouts_only_when_the_deadline_clipped_them():
+    assert deadline_timeouts(TimeoutError, 5, 10) == ((5, 10), ())
+    with deadline(2):
+        (short, long), ignore = deadline_timeouts(TimeoutError, 1, 10)
+    assert short == 1 and long <= 2
+    assert ignore is TimeoutError
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.resilience import DeadlineExceeded, deadline
+from src.services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    stop = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < stop
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def upstream():
+        calls.append(1)
+        release.wait(5)
+        return {'answer': 42}
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        futures = [pool.submit(flight.do, 'key', upstream) for _ in range(10)]
+        wait_for(lambda: flight.stats()['shared'] == 9)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'inFlight': 0, 'leaders': 1, 'shared': 9}
+
+
+def test_different_keys_and_later_calls_are_not_shared():
+    flight = SingleFlight()
+    calls = []
+    assert flight.do('a', lambda: calls.append('a') or 'a') == 'a'
+    assert flight.do('b', lambda: calls.append('b') or 'b') == 'b'
+    assert flight.do('a', lambda: calls.append('a') or 'a') == 'a'
+    assert calls == ['a', 'b', 'a']
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def upstream():
+        release.wait(5)
+        raise ConnectionError('upstream down')
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, 'key', upstream) for _ in range(4)]
+        wait_for(lambda: flight.stats()['shared'] == 3)
+        release.set()
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result()
+    assert flight.stats()['inFlight'] == 0
+
+
+def test_follower_gives_up_at_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=('key', lambda: release.wait(5)))
+    leader.start()
+    wait_for(lambda: flight.stats()['inFlight'] == 1)
+
+    started = time.monotonic()
+    with deadline(0.1), pytest.raises(DeadlineExceeded):
+        flight.do('key', lambda: 'never called')
+    assert time.monotonic() - started < 1
+
+    release.set()
+    leader.join()
+
+
+def test_async_callers_share_one_task():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'shared'
+
+    async def main():
+        return await asyncio.gather(*[flight.do('key', upstream) for _ in range(5)])
+
+    assert asyncio.run(main()) == ['shared'] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {'inFlight': 0, 'leaders': 1, 'shared': 4}
+
+
+def test_async_follower_timeout_does_not_cancel_the_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.2)
+        return 'done'
+
+    async def impatient():
+        with deadline(0.05):
+            return await flight.do('key', upstream)
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do('key', upstream))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await impatient()
+        return await leader
+
+    assert asyncio.run(main()) == 'done'
@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.fixture
+def timeline(client):
+    response = client.post('/api/timelines/', json={
+        'name': 'Ann', 'choices': ['Save my allowance', 'Spend on snacks'],
+        'simulationMonths': 36, 'stepsPerMonth': 2})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_distribution_is_reproducible_and_consistent(client, timeline):
+    url = f"/api/timelines/{timeline['id']}/distribution?paths=5000&bins=10"
+    first = client.get(url).get_json()
+
+    assert client.get(url).get_json() == first
+    assert first['paths'] == 5000
+    assert sum(first['histogram']['counts']) == 5000
+    assert len(first['histogram']['binEdges']) == 11
+    bands = [first['percentiles'][f'p{p}'] for p in (5, 25, 50, 75, 95)]
+    assert bands == sorted(bands)
+    assert 0 <= first['probabilityBelowOne'] <= 1
+
+
+@pytest.mark.parametrize('query', ['paths=0', 'paths=100001', 'bins=0', 'bins=101', 'paths=many'])
+def test_distribution_rejects_bad_arguments(client, timeline, query):
+    response = client.get(f"/api/timelines/{timeline['id']}/distribution?{query}")
+    assert response.status_code == 400
+
+
+def test_series_starts_at_one_and_ends_at_the_timeline_multiplier(client, timeline):
+    series = client.get(f"/api/timelines/{timeline['id']}/series?points=25").get_json()
+
+    assert series['months'] == 36 and series['stepsPerMonth'] == 2
+    assert series['totalPoints'] == 36 * 2 + 1
+    assert series['points'] == len(series['month']) == len(series['wealth']) == 25
+    assert series['month'][0] == 0 and series['month'][-1] == 36
+    assert series['wealth'][0] == 1.0
+    assert series['wealth'][-1] == pytest.approx(timeline['simulated']['multiplier'], abs=1e-4)
+    assert len(series['events']) == len(timeline['simulated']['events'])
+    assert client.get(f"/api/timelines/{timeline['id']}/series?points=25").get_json() == series
+
+
+@pytest.mark.parametrize('query', ['points=1', 'points=2001', 'points=lots'])
+def test_series_rejects_bad_points(client, timeline, query):
+    assert client.get(f"/api/timelines/{timeline['id']}/series?{query}").status_code == 400
+
+
+@pytest.mark.parametrize('path', ['', '/distribution', '/series'])
+def test_unknown_timeline_is_a_404(client, path):
+    assert client.get(f'/api/timelines/no-such-timeline{path}').status_code == 404
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from src.services.timeline_record import TimelineRecord
+
+ENHANCED_PROFILE = {
+    'name': 'Ann',
+    'learningStyle': 'visual',
+    'financialGoals': ['save for bike'],
+    'gradeLevel': '5th Grade',
+    'age': 10,
+    'parentPhone': '+1-555-123-4567'
+}
+INVESTEASE = {
+    'client': {'id': 'c-1', 'name': 'Ann', 'cash': 900},
+    'client_id': 'c-1',
+    'portfolios': [{'id': 'p-1', 'type': 'balanced'}, {'id': 'p-2', 'type': 'growth'}],
+    'simulation_results': {'results': [{'portfolioId': 'p-1', 'growth': 0.08}]}
+}
+
+
+def complete_record(**profile_changes):
+    return TimelineRecord.from_pipeline(
+        id='t-1', owner='Ann', name="Ann's Learning Timeline", choices=['save'],
+        profile_text='Likes bikes', created_at='2025-01-01T00:00:00',
+        simulated={'multiplier': 1.2, 'emotional': 0.36, 'events': []},
+        analysis={'tags': ['curious'], 'summary': 'Curious'},
+        investease=INVESTEASE, kid_adventures={'adventures': []},
+        enhanced_profile=dict(ENHANCED_PROFILE, **profile_changes),
+        learning_style='visual', financial_goals=['save for bike'], grade_level='5th Grade')
+
+
+def test_shared_profile_fields_are_stored_once_and_rebuilt():
+    record = complete_record()
+    assert record.profile_extras == {'age': 10, 'parentPhone': '+1-555-123-4567'}
+    assert record.enhanced_profile() == ENHANCED_PROFILE
+
+
+def test_profile_values_that_differ_from_the_record_are_kept():
+    record = complete_record(learningStyle='hands-on')
+    assert record.profile_extras['learningStyle'] == 'hands-on'
+    assert record.enhanced_profile() == dict(ENHANCED_PROFILE, learningStyle='hands-on')
+
+
+def test_legacy_view_adds_the_duplicate_fields_only_when_asked():
+    record = complete_record()
+    current = record.to_dict()
+    legacy = record.to_dict(legacy=True)
+
+    assert 'enhancedProfile' not in current and 'investeaseClient' not in current
+    assert current['totalPortfoliosCreated'] == 2
+    assert legacy == dict(current, **{
+        'profileAnalysis': record.analysis,
+        'enhancedProfile': ENHANCED_PROFILE,
+        'investeaseClient': INVESTEASE['client'],
+        'investeasePortfolios': INVESTEASE['portfolios'],
+        'investeaseSimulation': INVESTEASE['simulation_results'],
+        'investeaseClientId': 'c-1'
+    })
+
+
+@pytest.mark.parametrize('legacy', [False, True])
+def test_storage_round_trip_through_json_keeps_every_view(legacy):
+    record = complete_record()
+    restored = TimelineRecord.from_storage(json.loads(json.dumps(record.to_storage())))
+    assert restored == record
+    assert restored.to_dict(legacy=legacy) == record.to_dict(legacy=legacy)
+
+
+def test_simple_timelines_have_no_pipeline_fields():
+    record = TimelineRecord(
+        id='t-2', owner='Bo', name="Bo's Timeline", choices=[], profile_text='',
+        created_at='2025-01-01T00:00:00', simulated=None, analysis=None)
+    assert not record.is_complete
+    assert record.to_dict(legacy=True) == record.to_dict()
+    assert 'rbc_investease' not in record.to_dict()
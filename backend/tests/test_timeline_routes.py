@@ -0,0 +1,86 @@
+import pytest
+
+from src.services.job_queue import job_queue
+from src.services.timeline_service import timeline_service
+from tests.test_timeline_store import make_record
+
+CREATE_ROUTES = [
+    '/api/timelines/',
+    '/api/timelines/create-with-registration',
+    '/api/timelines/create-with-registration?async=1'
+]
+
+
+@pytest.mark.parametrize('route', CREATE_ROUTES)
+@pytest.mark.parametrize('horizon, message', [
+    ({'simulationMonths': 0}, 'simulationMonths must be between'),
+    ({'stepsPerMonth': 10_000}, 'stepsPerMonth must be between'),
+    ({'simulationMonths': None}, 'must be integers'),
+    ({'stepsPerMonth': 'daily'}, 'must be integers')
+])
+def test_invalid_horizon_is_a_400(client, route, horizon, message):
+    tracked = job_queue.stats()['tracked']
+    response = client.post(route, json=dict({'name': 'Ann'}, **horizon))
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+    assert job_queue.stats()['tracked'] == tracked
+
+
+def test_create_validates_the_horizon_once_and_leaves_the_simulation_cache_alone(client,
+                                                                                  monkeypatch):
+    calls = []
+    validate = timeline_service.simulation_horizon
+
+    def counted(data):
+        calls.append(data)
+        return validate(data)
+
+    monkeypatch.setattr(timeline_service, 'simulation_horizon', counted)
+    cached = timeline_service.simulation_cache.stats()['size']
+
+    response = client.post('/api/timelines/', json={
+        'name': 'Ann', 'choices': ['save'], 'simulationMonths': 24, 'stepsPerMonth': 4})
+
+    assert response.status_code == 200
+    timeline = response.get_json()
+    assert (timeline['simulationMonths'], timeline['stepsPerMonth']) == (24, 4)
+    assert len(calls) == 1
+    assert timeline_service.simulation_cache.stats()['size'] == cached
+
+
+@pytest.mark.parametrize('query, message', [
+    ('limit=0', 'limit must be at least 1'),
+    ('limit=-5', 'limit must be at least 1'),
+    ('limit=ten', 'limit must be an integer'),
+    ('cursor=not-a-cursor', 'Invalid cursor'),
+    ('cursor=%E2%9C%A8', 'Invalid cursor'),
+    ('cursor=WzFd', 'Invalid cursor')
+])
+def test_invalid_list_arguments_are_a_400(client, query, message):
+    response = client.get(f'/api/timelines/?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': message}
+
+
+def test_list_pages_newest_first_through_the_next_cursor_header(client):
+    owner = 'Route Pager'
+    for i in range(7):
+        timeline_service.store.save(make_record(1000 + i, owner=owner))
+
+    seen = []
+    query = f'owner={owner}&limit=3'
+    while True:
+        response = client.get(f'/api/timelines/?{query}')
+        assert response.status_code == 200
+        seen.extend(summary['id'] for summary in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        query = f'owner={owner}&limit=3&cursor={cursor}'
+
+    assert seen == [f'timeline-{i:04d}' for i in range(1006, 999, -1)]
+
+
+def test_next_cursor_header_is_exposed_to_cors_clients(client):
+    response = client.get('/api/timelines/?limit=1', headers={'Origin': 'http://localhost:5173'})
+    assert 'X-Next-Cursor' in response.headers['Access-Control-Expose-Headers']
@@ -0,0 +1,70 @@
+import contextlib
+import io
+
+import cohere
+import pytest
+
+from benchmarks.standins import StandinProfile, start_cohere_standin, start_investease_standin
+from src.services import timeline_service as timeline_service_module
+from src.services.client_email_index import ClientEmailIndex
+from src.services.client_state_cache import ClientStateCache
+from src.services.data_transformer import DataTransformer
+from src.services.generation_cache import GenerationCache
+from src.services.investease_client import InvesteaseClient
+from src.services.timeline_service import TimelineService
+from src.services.timeline_store import InMemoryTimelineStore
+
+COHERE_MS = 200
+
+
+@pytest.fixture
+def service(monkeypatch):
+    cohere_server = start_cohere_standin(StandinProfile(latency=f'fixed:{COHERE_MS}'))
+    investease_server = start_investease_standin(StandinProfile())
+    investease = InvesteaseClient(base_url=investease_server.base_url, jwt_token='test-token',
+                                  email_index=ClientEmailIndex(), client_state=ClientStateCache())
+    monkeypatch.setattr(timeline_service_module, 'register_client_with_investease',
+                        lambda data, room=None: investease.create_complete_client_with_portfolios(
+                            data, room=room))
+
+    service = TimelineService(store=InMemoryTimelineStore())
+    service.data_transformer = DataTransformer(cache=GenerationCache(maxsize=0))
+    service.data_transformer.cohere_client = cohere.Client(
+        'test-key', base_url=cohere_server.base_url)
+    yield service
+    cohere_server.shutdown()
+    investease_server.shutdown()
+
+
+def test_cohere_stages_run_concurrently_and_registration_waits_for_transform(service):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = service.create_complete_timeline({
+            'name': 'Ann', 'email': 'ann@example.com', 'cashAmount': 1000,
+            'profileText': 'Loves bikes', 'choices': ['Save my allowance']})
+
+    stages = result['pipelineTimings']['stages']
+    transform, analyze, register = stages['transform'], stages['analyze'], stages['register']
+    assert transform['durationMs'] >= COHERE_MS and analyze['durationMs'] >= COHERE_MS
+    # Both Cohere calls start together instead of one after the other
+    assert analyze['startMs'] < transform['startMs'] + transform['durationMs']
+    assert transform['startMs'] < analyze['startMs'] + analyze['durationMs']
+    assert register['startMs'] >= transform['startMs'] + transform['durationMs']
+    assert result['pipelineTimings']['totalMs'] < 2 * COHERE_MS + register['durationMs']
+
+    timeline = result['timeline']
+    assert service.store.get(timeline['id']).is_complete
+    assert timeline['gradeLevel'] == '7th Grade'
+    assert timeline['analysis']['tags'] == ['curious', 'creative']
+    assert timeline['totalPortfoliosCreated'] == 3
+
+
+def test_stage_progress_is_reported(service):
+    events = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.create_complete_timeline(
+            {'name': 'Bo', 'email': 'bo@example.com'},
+            progress=lambda stage, status: events.append((stage, status)))
+
+    for stage in ('transform', 'analyze', 'register', 'simulate'):
+        assert events.index((stage, 'started')) < events.index((stage, 'finished'))
+    assert events.index(('transform', 'finished')) < events.index(('register', 'started'))
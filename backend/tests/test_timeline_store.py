@@ -0,0 +1,147 @@
+import itertools
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from src.services.timeline_record import TimelineRecord
+from src.services.timeline_store import InMemoryTimelineStore, SQLiteTimelineStore
+
+GRADES = ['3rd Grade', '5th Grade', '7th Grade']
+STYLES = ['visual', 'hands-on']
+
+
+def make_record(i, owner='Kid', grade_level=None, learning_style=None):
+    return TimelineRecord(
+        id=f'timeline-{i:04d}',
+        owner=owner,
+        name=f"{owner}'s Timeline",
+        choices=['save'],
+        profile_text='Likes saving',
+        created_at=f'2024-01-01T00:{i // 60:02d}:{i % 60:02d}',
+        simulated={'multiplier': 1.1, 'emotional': 0.2, 'events': []},
+        analysis=None,
+        simulation_months=12,
+        steps_per_month=1,
+        grade_level=grade_level,
+        learning_style=learning_style
+    )
+
+
+def open_fds():
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else 0
+
+
+def test_sqlite_store_connections_stay_bounded_across_threads(tmp_path):
+    store = SQLiteTimelineStore(str(tmp_path / 'timelines.db'), pool_size=4)
+    fds_before = open_fds()
+    errors = []
+
+    def request(i):
+        try:
+            store.save(make_record(i))
+            assert store.get(f'timeline-{i:04d}').id == f'timeline-{i:04d}'
+            store.query(limit=5)
+        except Exception as e:
+            errors.append(e)
+
+    # One short-lived thread per request, like the threaded dev server
+    for batch in range(0, 300, 30):
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(batch, batch + 30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
+    assert len(store) == 300
+    assert store.stats()['connections'] <= 4
+    # Each connection holds the db, WAL and shm files at most
+    assert open_fds() - fds_before <= 4 * 3
+    store.close()
+
+
+def test_sqlite_store_reopens_after_close(tmp_path):
+    store = SQLiteTimelineStore(str(tmp_path / 'timelines.db'), pool_size=1)
+    store.save(make_record(1))
+    store.close()
+    assert store.get('timeline-0001').owner == 'Kid'
+    store.close()
+
+
+def test_sqlite_store_count_follows_inserts_upserts_and_clear(tmp_path):
+    path = str(tmp_path / 'timelines.db')
+    store = SQLiteTimelineStore(path, pool_size=2)
+    for i in range(10):
+        store.save(make_record(i))
+    for i in range(3):
+        store.save(make_record(i, owner='Renamed'))
+    assert len(store) == 10
+    assert store.stats()['entries'] == 10
+
+    # Another process's store on the same file sees the same count
+    other = SQLiteTimelineStore(path, pool_size=1)
+    other.save(make_record(10))
+    assert len(store) == 11
+
+    store.clear()
+    assert len(store) == len(other) == 0
+    store.close()
+    other.close()
+
+
+def test_sqlite_store_counts_existing_rows_once_when_opened(tmp_path):
+    path = str(tmp_path / 'timelines.db')
+    conn = sqlite3.connect(path)
+    conn.execute(SQLiteTimelineStore.SCHEMA[0])
+    conn.executemany('INSERT INTO timelines (id, data, summary) VALUES (?, ?, ?)',
+                     [(f'old-{i}', '{}', '{}') for i in range(7)])
+    conn.commit()
+    conn.close()
+
+    store = SQLiteTimelineStore(path)
+    assert len(store) == 7
+    store.save(make_record(1))
+    assert len(SQLiteTimelineStore(path)) == 8
+    store.close()
+
+
+def filtered_store():
+    store = InMemoryTimelineStore()
+    for i in range(240):
+        store.save(make_record(i, owner=f'Kid {i % 4}', grade_level=GRADES[i % 3],
+                               learning_style=STYLES[i % 2]))
+    # Re-saved records move between index values
+    for i in range(0, 240, 7):
+        store.save(make_record(i, owner='Kid 0', grade_level=GRADES[0],
+                               learning_style=STYLES[1]))
+    return store
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'owner': 'Kid 0'},
+    {'owner': 'Kid 0', 'grade_level': '3rd Grade'},
+    {'grade_level': '5th Grade', 'learning_style': 'visual'},
+    {'owner': 'Kid 1', 'grade_level': '3rd Grade', 'learning_style': 'hands-on'},
+    {'owner': 'Kid 2', 'learning_style': 'hands-on'},
+    {'owner': 'Nobody', 'grade_level': '3rd Grade'}
+])
+def test_memory_query_pages_through_the_filter_intersection(filters):
+    store = filtered_store()
+    fields = {'owner': 'owner', 'grade_level': 'gradeLevel', 'learning_style': 'learningStyle'}
+    expected = sorted(
+        (summary for summary in store._summaries.values()
+         if all(summary[fields[name]] == value for name, value in filters.items())),
+        key=lambda summary: (summary['createdAt'], summary['id']), reverse=True)
+
+    pages = []
+    after = None
+    for _ in itertools.count():
+        page, has_more = store.query(after=after, limit=9, **filters)
+        pages.extend(page)
+        if not has_more:
+            break
+        after = (page[-1]['createdAt'], page[-1]['id'])
+    assert pages == expected
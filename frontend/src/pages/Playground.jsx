@@ -8,14 +8,39 @@ const API = import.meta.env.VITE_API_BASE || "http://localhost:4000/api";
 
 export default function Playground() {
 	const [timelines, setTimelines] = useState([]);
+	// X-Next-Cursor of the last page loaded; older timelines load on request
+	const [nextCursor, setNextCursor] = useState(null);
+	const [loadingMore, setLoadingMore] = useState(false);
 
 	useEffect(() => {
+		// The list is paginated newest first: show the first page only
+		let cancelled = false;
 		axios
 			.get(`${API}/timelines/`)
-			.then((r) => setTimelines(r.data))
-			.catch(() => setTimelines([]));
+			.then((r) => {
+				if (cancelled) return;
+				setTimelines(r.data);
+				setNextCursor(r.headers["x-next-cursor"] || null);
+			})
+			.catch(() => !cancelled && setTimelines([]));
+		return () => {
+			cancelled = true;
+		};
 	}, []);
 
+	const loadMoreTimelines = () => {
+		if (!nextCursor || loadingMore) return;
+		setLoadingMore(true);
+		axios
+			.get(`${API}/timelines/`, { params: { cursor: nextCursor } })
+			.then((r) => {
+				setTimelines((loaded) => [...loaded, ...r.data]);
+				setNextCursor(r.headers["x-next-cursor"] || null);
+			})
+			.catch(() => {})
+			.finally(() => setLoadingMore(false));
+	};
+
 	return (
 		<div
 			style={{
@@ -96,6 +121,7 @@ export default function Playground() {
 								style={{ fontSize: "2em", fontWeight: "bold" }}
 							>
 								{timelines.length}
+								{nextCursor ? "+" : ""}
 							</div>
 							<div
 								style={{
@@ -124,6 +150,7 @@ export default function Playground() {
 								style={{ fontSize: "2em", fontWeight: "bold" }}
 							>
 								{timelines.length}
+								{nextCursor ? "+" : ""}
 							</div>
 							<div style={{ fontSize: "0.9em" }}>
 								📚 Your Stories
@@ -642,6 +669,33 @@ export default function Playground() {
 									<TimelineCard timeline={t} />
 								</div>
 							))}
+							{nextCursor && (
+								<div
+									style={{
+										gridColumn: "1 / -1",
+										textAlign: "center",
+									}}
+								>
+									<button
+										onClick={loadMoreTimelines}
+										disabled={loadingMore}
+										style={{
+											background: "#8B4513",
+											color: "white",
+											border: "none",
+											padding: "10px 20px",
+											borderRadius: 25,
+											cursor: loadingMore
+												? "wait"
+												: "pointer",
+										}}
+									>
+										{loadingMore
+											? "Loading..."
+											: "📜 Load older stories"}
+									</button>
+								</div>
+							)}
 						</div>
 					) : (
 						<div